@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the policy for sampling the current and the magnetic field quickly
+while the power supply is sweeping, and slowly while it holds.
+
+A variable is sampled every ``fast_interval`` seconds from the moment a
+sweep starts, or from the moment its rate of change crosses its threshold.
+Once it has stayed below its threshold for ``settle_time`` seconds, the
+interval doubles every ``decay_time`` seconds until it is back at its
+baseline. The fast interval is never shorter than the minimum command gap of
+the instrument that makes the read.
+"""
+import logging
+import math
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple, Type
+from quantities import Quantity, amperes, gauss, s
+from mr_freeze.resources.abstract_store import Variable
+from mr_freeze.resources.application_state import Current, MagneticField
+from mr_freeze.samples import SampleRecord
+
+log = logging.getLogger(__name__)
+
+
+class AdaptiveSampling(object):
+    """
+    Decides how often to sample each variable that it adapts. Readings are
+    fed to it with :meth:`observe`, and sweeps are reported to it with
+    :meth:`sweep_started`
+    """
+    THRESHOLDS = {
+        Current: 0.01 * amperes / s,
+        MagneticField: 1.0 * gauss / s
+    }  # type: Dict[Type[Variable], Quantity]
+
+    _MAXIMUM_DOUBLINGS = 64
+
+    def __init__(
+            self,
+            fast_interval: float=1.0,
+            thresholds: Optional[Mapping[Type[Variable], Quantity]]=None,
+            settle_time: float=30.0,
+            decay_time: float=10.0,
+            clock: Callable[[], float]=monotonic
+    ) -> None:
+        """
+
+        :param fast_interval: The time in seconds between samples of a
+            variable that is changing
+        :param thresholds: The rate of change of each variable above which
+            it is sampled quickly. The variables in this mapping are the ones
+            that are adapted. By default, these are ``THRESHOLDS``
+        :param settle_time: The time in seconds for which a variable must
+            stay below its threshold before its sampling slows down
+        :param decay_time: The time in seconds between doublings of the
+            interval while it returns to its baseline
+        :param clock: The clock on which the times are kept. This should
+            only be overwritten during testing
+        """
+        self.fast_interval = fast_interval
+        self.thresholds = dict(
+            self.THRESHOLDS if thresholds is None else thresholds
+        )  # type: Dict[Type[Variable], Quantity]
+        self.settle_time = settle_time
+        self.decay_time = decay_time
+        self.clock = clock
+
+        self._fast_until = {}  # type: Dict[Type[Variable], float]
+        self._last = {}  # type: Dict[Type[Variable], Tuple[float, Quantity]]
+        self._lock = Lock()
+
+    @property
+    def variables(self) -> Tuple[Type[Variable], ...]:
+        """
+
+        :return: The variables whose sampling is adapted
+        """
+        return tuple(self.thresholds)
+
+    def sweep_started(self) -> None:
+        """
+        Sample every adapted variable quickly, until it settles
+        """
+        with self._lock:
+            fast_until = self.clock() + self.settle_time
+            for variable in self.thresholds:
+                self._fast_until[variable] = fast_until
+        log.debug("Sweep started. Sampling %s quickly", self.variables)
+
+    def observe(self, records: Iterable[SampleRecord]) -> None:
+        """
+        Sample quickly each adapted variable whose rate of change since its
+        last reading is above its threshold
+
+        :param records: New readings, oldest first
+        """
+        with self._lock:
+            for record in records:
+                for reading in record.readings:
+                    if reading.variable in self.thresholds and reading.ok:
+                        self._observe(
+                            reading.variable, reading.monotonic,
+                            reading.value
+                        )
+
+    def fast_interval_for(
+            self, variable: Type[Variable], minimum: float=0.0
+    ) -> float:
+        """
+
+        :param variable: An adapted variable
+        :param minimum: The shortest interval that the instrument allows
+        :return: The time in seconds between samples of the variable while
+            it is changing
+        """
+        return max(self.fast_interval, minimum)
+
+    def interval(
+            self,
+            variable: Type[Variable],
+            baseline: float,
+            minimum: float=0.0
+    ) -> float:
+        """
+
+        :param variable: A variable
+        :param baseline: The variable's interval while it holds
+        :param minimum: The shortest interval that the instrument allows
+        :return: The time in seconds until the variable is next sampled
+        """
+        fast = self.fast_interval_for(variable, minimum)
+        with self._lock:
+            fast_until = self._fast_until.get(variable)
+
+        if variable not in self.thresholds or fast_until is None or \
+                fast >= baseline:
+            return baseline
+
+        settled_for = self.clock() - fast_until
+        if settled_for < 0:
+            return fast
+
+        doublings = min(
+            math.floor(settled_for / self.decay_time) + 1,
+            self._MAXIMUM_DOUBLINGS
+        )
+        return min(baseline, fast * 2 ** doublings)
+
+    def intervals(
+            self,
+            baselines: Mapping[Type[Variable], float],
+            minimums: Mapping[Type[Variable], float]
+    ) -> Dict[Type[Variable], float]:
+        """
+
+        :param baselines: The interval of each variable while it holds
+        :param minimums: The shortest interval that each variable's
+            instrument allows
+        :return: The interval of each variable now
+        """
+        return {
+            variable: self.interval(
+                variable, baseline, minimums.get(variable, 0.0)
+            ) for variable, baseline in baselines.items()
+        }
+
+    def _observe(
+            self, variable: Type[Variable], when: float, value: Quantity
+    ) -> None:
+        """
+        Compare a reading with the last one. Must be called with the lock
+        held
+
+        :param variable: The variable that was read
+        :param when: The time of the reading on the monotonic clock
+        :param value: The value that was read
+        """
+        last = self._last.get(variable)
+        self._last[variable] = (when, value)
+        if last is None or when <= last[0]:
+            return
+
+        threshold = self.thresholds[variable]
+        try:
+            rate = abs(float(
+                ((value - last[1]) / ((when - last[0]) * s)).rescale(
+                    threshold.units
+                )
+            ))
+        except (ValueError, TypeError):
+            return
+
+        if rate >= float(threshold):
+            if self._fast_until.get(variable, float('-inf')) < when:
+                log.debug("%s is changing at %s. Sampling it quickly",
+                          variable.__name__, rate)
+            self._fast_until[variable] = when + self.settle_time
+
+    def __repr__(self) -> str:
+        return "%s(fast_interval=%s, settle_time=%s, decay_time=%s)" % (
+            self.__class__.__name__, self.fast_interval, self.settle_time,
+            self.decay_time
+        )
+
+
+adaptive_sampling = AdaptiveSampling()
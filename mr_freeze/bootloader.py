@@ -4,27 +4,35 @@ Module responsible for starting the application.
 """
 import logging
 import sys
-import time
-import schedule
 from PyQt4 import QtGui
-from PyQt4.QtCore import QThread
-from multiprocessing import cpu_count
-from typing import Iterable
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Type
 from quantities import Quantity
+from mr_freeze.adaptive_sampling import AdaptiveSampling, adaptive_sampling
 from mr_freeze.devices.lakeshore_475 import Lakeshore475
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
 from mr_freeze.cli_argument_parser import parser
 from mr_freeze.config_file_parser import ConfigFileParser
+from mr_freeze.executors import InstrumentAffineExecutor
+from mr_freeze.resources.abstract_store import Variable
 from mr_freeze.resources.application_state import Store, CSVDirectory
+from mr_freeze.resources.application_state import Current, MagneticField
+from mr_freeze.resources.application_state import LiquidHeliumLevel
+from mr_freeze.resources.application_state import LiquidNitrogenLevel
 from mr_freeze.ui.ui_loader import Main as GUI
 from mr_freeze.measurement_loop import MeasurementLoop
+from mr_freeze.sweep_limits import SweepLimitWriter
+from mr_freeze.overrun import OverrunGuard, OverrunPolicy
 from mr_freeze.resources.application_state import LowerSweepCurrent
 from mr_freeze.resources.application_state import UpperSweepCurrent
 from mr_freeze.resources.application_state import PowerSupply
-from mr_freeze.tasks.set_lower_sweep_current import SetLowerSweepCurrent
-from mr_freeze.tasks.set_upper_sweep_current import SetUpperSweepCurrent
+from mr_freeze.tasks.report_current import ReportCurrent
+from mr_freeze.tasks.report_liquid_helium_level import ReportLiquidHeliumLevel
+from mr_freeze.tasks.report_liquid_nitrogen_level \
+    import ReportLiquidNitrogenLevel
+from mr_freeze.tasks.report_magnetic_field import ReportMagneticField
+from mr_freeze.workers import InstrumentWorker, RemoteAdapter, WorkerSpec, \
+    WorkerSupervisor, adapter_settings
 
 log = logging.getLogger(__name__)
 
@@ -33,16 +41,23 @@ class Application(object):
     """
     Base class for the application
     """
-    _executor = ThreadPoolExecutor(5 * cpu_count())
+    _executor = InstrumentAffineExecutor()
     _store = Store(_executor)
 
     def __init__(self, command_line_arguments: Iterable[str]=sys.argv[1:]):
         self.config_file_parser = ConfigFileParser()
         self._cli_arguments = parser.parse_args(command_line_arguments)
+        self._executor.task_timeout = self._task_timeout
 
         self._gaussmeter = self._configure_gaussmeter()
         self._level_meter = self._configure_level_meter()
         self._power_supply = self._configure_power_supply()
+        self._supervisor = None  # type: Optional[WorkerSupervisor]
+        if self._isolate_instruments:
+            self._supervisor = self._configure_workers()
+        self._sweep_limits = SweepLimitWriter(
+            self._power_supply, self._executor
+        )
         self._app = QtGui.QApplication(sys.argv)
         self._gui = GUI(self._store)
         self._add_control_listeners_to_store(self._store)
@@ -64,7 +79,10 @@ class Application(object):
             power_supply=self._power_supply,
             store=self._store,
             executor=self._executor,
-            sample_interval_in_seconds=10
+            sample_interval_in_seconds=self._sample_interval,
+            sample_intervals=self._sample_intervals,
+            overrun_guard=self._overrun_guard,
+            sampling=self._sampling
         )
         loop.run()
 
@@ -74,11 +92,12 @@ class Application(object):
 
         :return: The exit code for the application
         """
-        loop_thread = self._MeasurementLoopThread()
-
-        if not self._gui_only_mode:
+        if self._gui_only_mode:
+            pass
+        elif self._supervisor is not None:
+            self._supervisor.start()
+        else:
             self.start_loop()
-            loop_thread.start()
 
         self._gui.show()
 
@@ -135,6 +154,96 @@ class Application(object):
 
         return self.config_file_parser.power_supply_address
 
+    @property
+    def _sample_interval(self) -> float:
+        """
+
+        :return: The time in seconds between measurements of variables that
+            are not measured at a rate of their own
+        """
+        try:
+            return self._cli_arguments.sample_interval
+        except AttributeError:
+            return self.config_file_parser.sample_interval
+
+    @property
+    def _sample_intervals(self) -> Dict[Type[Variable], float]:
+        """
+
+        :return: The time in seconds between measurements of each variable
+            that is measured at a rate of its own
+        """
+        arguments = {
+            Current: 'current_sample_interval',
+            MagneticField: 'magnetic_field_sample_interval',
+            LiquidHeliumLevel: 'liquid_helium_sample_interval',
+            LiquidNitrogenLevel: 'liquid_nitrogen_sample_interval'
+        }
+        intervals = {}  # type: Dict[Type[Variable], float]
+
+        for variable, argument in arguments.items():
+            interval = getattr(self._cli_arguments, argument, None)
+            if interval is None:
+                interval = getattr(self.config_file_parser, argument)
+            if interval is not None:
+                intervals[variable] = interval
+
+        return intervals
+
+    @property
+    def _sampling(self) -> Optional[AdaptiveSampling]:
+        """
+
+        :return: The policy that samples the current and the field quickly
+            while the magnet sweeps, or ``None`` if no sweep sample interval
+            was given
+        """
+        interval = getattr(self._cli_arguments, 'sweep_sample_interval', None)
+        if interval is None:
+            interval = self.config_file_parser.sweep_sample_interval
+        if interval is None:
+            return None
+
+        adaptive_sampling.fast_interval = interval
+        return adaptive_sampling
+
+    @property
+    def _task_timeout(self) -> float:
+        """
+
+        :return: The time in seconds that a task has to finish before it is
+            dropped or interrupted
+        """
+        try:
+            return self._cli_arguments.task_timeout
+        except AttributeError:
+            return self.config_file_parser.task_timeout
+
+    @property
+    def _overrun_guard(self) -> OverrunGuard:
+        """
+
+        :return: The guard that limits the measurements in progress for each
+            instrument
+        """
+        return OverrunGuard(
+            OverrunPolicy(self._cli_arguments.overrun_policy),
+            max_in_flight=self._cli_arguments.max_in_flight,
+            max_queued=self._cli_arguments.max_queued
+        )
+
+    @property
+    def _isolate_instruments(self) -> bool:
+        """
+
+        :return: True if each instrument is to be run by a worker process of
+            its own
+        """
+        try:
+            return self._cli_arguments.isolate_instruments
+        except AttributeError:
+            return self.config_file_parser.isolate_instruments
+
     @property
     def _gui_only_mode(self) -> bool:
         """
@@ -173,14 +282,12 @@ class Application(object):
     def _handle_lower_sweep_current_change(
             self, new_current: Quantity
     ) -> None:
-        task = SetLowerSweepCurrent(new_current, self._power_supply)
-        task(self._executor)
+        self._sweep_limits.set_lower(new_current)
 
     def _handle_upper_sweep_current_change(
             self, new_current: Quantity
     ) -> None:
-        task = SetUpperSweepCurrent(new_current, self._power_supply)
-        task(self._executor)
+        self._sweep_limits.set_upper(new_current)
 
     @staticmethod
     def _make_argument_not_found_message(argument, config_file):
@@ -189,6 +296,42 @@ class Application(object):
         Using argument from file %s
         """ % (argument, config_file)
 
+    def _configure_workers(self) -> WorkerSupervisor:
+        """
+        Make a worker for each instrument. The power supply is replaced by a
+        stand-in that sends control commands to its worker
+
+        :return: The supervisor that runs the workers
+        """
+        intervals = self._sample_intervals
+
+        def interval(variable: Type[Variable]) -> float:
+            return intervals.get(variable, self._sample_interval)
+
+        power_supply = InstrumentWorker(WorkerSpec(
+            "power supply", Cryomagnetics4G,
+            adapter_settings(self._power_supply),
+            ((ReportCurrent, {}, interval(Current)),)
+        ))
+        level_meter = InstrumentWorker(WorkerSpec(
+            "level meter", CryomagneticsLM510,
+            adapter_settings(self._level_meter),
+            (
+                (ReportLiquidNitrogenLevel, {}, interval(LiquidNitrogenLevel)),
+                (ReportLiquidHeliumLevel, {}, interval(LiquidHeliumLevel))
+            )
+        ))
+        gaussmeter = InstrumentWorker(WorkerSpec(
+            "gaussmeter", Lakeshore475,
+            adapter_settings(self._gaussmeter),
+            ((ReportMagneticField, {}, interval(MagneticField)),)
+        ))
+
+        self._power_supply = RemoteAdapter(power_supply)
+        return WorkerSupervisor(
+            (power_supply, level_meter, gaussmeter), self._store
+        )
+
     def _configure_gaussmeter(self) -> Lakeshore475:
         gaussmeter = Lakeshore475()
         gaussmeter.port_name = self._gaussmeter_address
@@ -203,17 +346,3 @@ class Application(object):
         meter = Cryomagnetics4G()
         meter.port_name = self._power_supply_address
         return meter
-
-    class _MeasurementLoopThread(QThread):
-        """
-        Runs the measurement loop in a separate thread
-        """
-        def run(self) -> None:
-            """
-            Run the scheduler
-            :return:
-            """
-            log.info("Starting instrument measurement thread")
-            while True:
-                schedule.run_pending()
-                time.sleep(1)
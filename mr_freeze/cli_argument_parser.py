@@ -4,9 +4,28 @@ Parses command line arguments given to the application
 """
 import argparse
 from mr_freeze.config_file_parser import ConfigFileParser
+from mr_freeze.overrun import OverrunPolicy
 
 loader = ConfigFileParser()
 
+
+def positive_float(value: str) -> float:
+    """
+
+    :param value: The value given on the command line
+    :return: The value as a number
+    :raises: :exc:`argparse.ArgumentTypeError` if the value is not a
+        positive number
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("%s is not a number" % value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError("%s must be positive" % value)
+    return number
+
+
 parser = argparse.ArgumentParser(
     description="Log variables from the instrument rack"
 )
@@ -51,6 +70,72 @@ parser.add_argument(
     default=loader.sample_interval
 )
 
+parser.add_argument(
+    '--current-sample-interval', type=positive_float,
+    help="The time in seconds between measurements of the magnet current. "
+         "By default, the current is measured every sample interval",
+    default=loader.current_sample_interval
+)
+
+parser.add_argument(
+    '--magnetic-field-sample-interval', type=positive_float,
+    help="The time in seconds between measurements of the magnetic field. "
+         "By default, the field is measured every sample interval",
+    default=loader.magnetic_field_sample_interval
+)
+
+parser.add_argument(
+    '--liquid-helium-sample-interval', type=positive_float,
+    help="The time in seconds between measurements of the liquid helium "
+         "level. Each measurement boils off some helium. By default, the "
+         "level is measured every sample interval",
+    default=loader.liquid_helium_sample_interval
+)
+
+parser.add_argument(
+    '--liquid-nitrogen-sample-interval', type=positive_float,
+    help="The time in seconds between measurements of the liquid nitrogen "
+         "level. By default, the level is measured every sample interval",
+    default=loader.liquid_nitrogen_sample_interval
+)
+
+parser.add_argument(
+    '--sweep-sample-interval', type=positive_float,
+    help="The time in seconds between measurements of the magnet current "
+         "and the magnetic field while the magnet sweeps. By default, they "
+         "are measured at their own intervals during sweeps as well",
+    default=loader.sweep_sample_interval
+)
+
+parser.add_argument(
+    '--overrun-policy', type=str,
+    choices=[policy.value for policy in OverrunPolicy],
+    help="What to do with measurements that fall due while their "
+         "instrument is still busy: skip them, coalesce them into one "
+         "waiting measurement, or queue them",
+    default=loader.overrun_policy.value
+)
+
+parser.add_argument(
+    '--max-in-flight', type=int,
+    help="The number of measurements of an instrument that can be in "
+         "progress at once",
+    default=loader.max_in_flight
+)
+
+parser.add_argument(
+    '--max-queued', type=int,
+    help="The number of measurements that can wait for a busy instrument "
+         "when the overrun policy is queue",
+    default=loader.max_queued
+)
+
+parser.add_argument(
+    '--isolate-instruments', action='store_true',
+    help="Run each instrument in a worker process of its own",
+    default=loader.isolate_instruments
+)
+
 parser.add_argument(
     '--gui-only-mode', type=bool,
     help="Used only for testing, run if the GUI needs to be run without "
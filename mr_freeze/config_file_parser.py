@@ -8,6 +8,7 @@ from configparser import ConfigParser
 from typing import Optional, Mapping
 from mr_freeze.exceptions import NoConfigFileError, BadConfigParameter
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
+from mr_freeze.overrun import OverrunPolicy
 from mr_freeze import APPLICATION_DIRECTORY
 
 log = logging.getLogger(__name__)
@@ -35,7 +36,19 @@ class ConfigFileParser(object):
     _CSV_OUTPUT_DIRECTORY_KEY = "CSV_OUTPUT_DIRECTORY"
     _PIPE_OUTPUT_FILE_KEY = "PIPE_OUTPUT_FILE"
     _SAMPLE_INTERVAL_KEY = "SAMPLE_INTERVAL"
+    _CURRENT_SAMPLE_INTERVAL_KEY = "CURRENT_SAMPLE_INTERVAL"
+    _MAGNETIC_FIELD_SAMPLE_INTERVAL_KEY = "MAGNETIC_FIELD_SAMPLE_INTERVAL"
+    _LIQUID_HELIUM_SAMPLE_INTERVAL_KEY = "LIQUID_HELIUM_SAMPLE_INTERVAL"
+    _LIQUID_NITROGEN_SAMPLE_INTERVAL_KEY = "LIQUID_NITROGEN_SAMPLE_INTERVAL"
     _TASK_TIMEOUT_KEY = "TASK_TIMEOUT"
+    _OVERRUN_POLICY_KEY = "OVERRUN_POLICY"
+    _MAX_IN_FLIGHT_KEY = "MAX_IN_FLIGHT_PER_INSTRUMENT"
+    _MAX_QUEUED_KEY = "MAX_QUEUED_MEASUREMENTS"
+    _ISOLATE_INSTRUMENTS_KEY = "ISOLATE_INSTRUMENTS"
+    _SWEEP_SAMPLE_INTERVAL_KEY = "SWEEP_SAMPLE_INTERVAL"
+
+    _TRUE_VALUES = ("yes", "true", "on", "1")
+    _FALSE_VALUES = ("no", "false", "off", "0")
 
     def __init__(self) -> None:
         self._config_file_parser = ConfigParser()
@@ -195,6 +208,65 @@ class ConfigFileParser(object):
                 "converted to an integer" % from_file
             )
 
+    @property
+    def current_sample_interval(self) -> Optional[float]:
+        """
+
+        :return: The time in seconds between measurements of the current, or
+            ``None`` if the current is measured every ``SAMPLE_INTERVAL``
+        """
+        return self._variable_sample_interval(
+            self._CURRENT_SAMPLE_INTERVAL_KEY
+        )
+
+    @property
+    def magnetic_field_sample_interval(self) -> Optional[float]:
+        """
+
+        :return: The time in seconds between measurements of the magnetic
+            field, or ``None`` if the field is measured every
+            ``SAMPLE_INTERVAL``
+        """
+        return self._variable_sample_interval(
+            self._MAGNETIC_FIELD_SAMPLE_INTERVAL_KEY
+        )
+
+    @property
+    def liquid_helium_sample_interval(self) -> Optional[float]:
+        """
+
+        :return: The time in seconds between measurements of the liquid
+            helium level, or ``None`` if the level is measured every
+            ``SAMPLE_INTERVAL``
+        """
+        return self._variable_sample_interval(
+            self._LIQUID_HELIUM_SAMPLE_INTERVAL_KEY
+        )
+
+    @property
+    def liquid_nitrogen_sample_interval(self) -> Optional[float]:
+        """
+
+        :return: The time in seconds between measurements of the liquid
+            nitrogen level, or ``None`` if the level is measured every
+            ``SAMPLE_INTERVAL``
+        """
+        return self._variable_sample_interval(
+            self._LIQUID_NITROGEN_SAMPLE_INTERVAL_KEY
+        )
+
+    @property
+    def sweep_sample_interval(self) -> Optional[float]:
+        """
+
+        :return: The time in seconds between measurements of the current and
+            the magnetic field while the magnet sweeps, or ``None`` if they
+            are measured at their own intervals during sweeps as well
+        """
+        return self._variable_sample_interval(
+            self._SWEEP_SAMPLE_INTERVAL_KEY
+        )
+
     @property
     def task_timeout(self) -> int:
         """
@@ -209,3 +281,121 @@ class ConfigFileParser(object):
                 "The parameter %s for sample interval could not be"
                 "converted to an integer" % from_file
             )
+
+    @property
+    def overrun_policy(self) -> OverrunPolicy:
+        """
+
+        :return: What to do with measurements that fall due while their
+            instrument is still busy. By default, they are skipped
+        """
+        from_file = self.config_file.get(
+            self._OVERRUN_POLICY_KEY, OverrunPolicy.SKIP.value
+        )
+
+        try:
+            return OverrunPolicy(from_file.lower())
+        except ValueError:
+            raise BadConfigParameter(
+                "The overrun policy %s is not one of %s" % (
+                    from_file, [policy.value for policy in OverrunPolicy]
+                )
+            )
+
+    @property
+    def max_in_flight(self) -> int:
+        """
+
+        :return: The number of measurements of an instrument that can be in
+            progress at once. By default, this is 1
+        """
+        return self._positive_integer(self._MAX_IN_FLIGHT_KEY, 1)
+
+    @property
+    def max_queued(self) -> int:
+        """
+
+        :return: The number of measurements that can wait for a busy
+            instrument when the overrun policy is ``queue``. By default,
+            this is 1
+        """
+        return self._positive_integer(self._MAX_QUEUED_KEY, 1)
+
+    @property
+    def isolate_instruments(self) -> bool:
+        """
+
+        :return: ``True`` if each instrument is to be run by a worker process
+            of its own. By default, instruments are run by threads in the
+            application's process
+        :raises: :exc:`BadConfigParameter` if the value is not yes or no
+        """
+        from_file = self.config_file.get(self._ISOLATE_INSTRUMENTS_KEY, "no")
+
+        if from_file.lower() in self._TRUE_VALUES:
+            return True
+        if from_file.lower() in self._FALSE_VALUES:
+            return False
+        raise BadConfigParameter(
+            "The parameter %s for %s is not yes or no" % (
+                from_file, self._ISOLATE_INSTRUMENTS_KEY
+            )
+        )
+
+    def _positive_integer(self, key: str, default: int) -> int:
+        """
+
+        :param key: The key of the parameter
+        :param default: The value to use if the key is not in the file
+        :return: The value of the parameter
+        :raises: :exc:`BadConfigParameter` if the value is not a positive
+            integer
+        """
+        from_file = self.config_file.get(key)
+        if from_file is None:
+            return default
+
+        try:
+            value = int(from_file)
+        except ValueError:
+            raise BadConfigParameter(
+                "The parameter %s for %s could not be converted to an "
+                "integer" % (from_file, key)
+            )
+
+        if value < 1:
+            raise BadConfigParameter(
+                "The parameter %s for %s must be at least 1" % (
+                    from_file, key
+                )
+            )
+
+        return value
+
+    def _variable_sample_interval(self, key: str) -> Optional[float]:
+        """
+
+        :param key: The key of the sample interval for one variable
+        :return: The interval in seconds, or ``None`` if the key is not in
+            the configuration file
+        :raises: :exc:`BadConfigParameter` if the interval is not a positive
+            number
+        """
+        from_file = self.config_file.get(key)
+        if from_file is None:
+            return None
+
+        try:
+            interval = float(from_file)
+        except ValueError:
+            raise BadConfigParameter(
+                "The parameter %s for %s could not be converted to a "
+                "number" % (from_file, key)
+            )
+
+        if interval <= 0:
+            raise BadConfigParameter(
+                "The parameter %s for %s must be positive" % (from_file, key)
+            )
+
+        return interval
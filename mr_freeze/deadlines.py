@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Keeps track of the deadline of the task running on each thread. Code that
+talks to an instrument calls :func:`check_deadline` at each I/O boundary, so
+that a task that has run out of time stops at the next read or write
+instead of carrying on with a hung instrument.
+
+Deadlines are times on the monotonic clock of ``watchdog``. The watchdog is
+a :class:`TimerQueue` on which tasks arrange to be interrupted when their
+deadline passes.
+"""
+from contextlib import contextmanager
+from threading import local
+from typing import Iterator, Optional
+from mr_freeze.exceptions import TaskTimeoutError
+from mr_freeze.timers import TimerQueue
+
+watchdog = TimerQueue()
+
+_state = local()
+
+
+def current_deadline() -> Optional[float]:
+    """
+
+    :return: The deadline of the task running on this thread, or ``None``
+        if it has no deadline
+    """
+    return getattr(_state, 'deadline', None)
+
+
+def remaining() -> Optional[float]:
+    """
+
+    :return: The time in seconds left before the deadline of the task
+        running on this thread, or ``None`` if it has no deadline. This is
+        negative once the deadline has passed
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return None
+    return deadline - watchdog.clock()
+
+
+def check_deadline(action: str='continue') -> None:
+    """
+
+    :param action: What the task was about to do, for the error message
+    :raises: :exc:`TaskTimeoutError` if the deadline of the task running on
+        this thread has passed
+    """
+    time_left = remaining()
+    if time_left is not None and time_left <= 0:
+        raise TaskTimeoutError(
+            "Deadline passed %.3f s ago, so could not %s" % (
+                -time_left, action
+            )
+        )
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[float]) -> Iterator[None]:
+    """
+    Set the deadline of the task running on this thread for the duration of
+    the ``with`` block
+
+    :param deadline: The deadline, or ``None`` for no deadline
+    """
+    previous = current_deadline()
+    _state.deadline = deadline
+    try:
+        yield
+    finally:
+        _state.deadline = previous
@@ -5,14 +5,33 @@ the funky logic is captured
 """
 import abc
 import logging
-import re
+from functools import lru_cache
+from time import monotonic
+from typing import Optional
 from instruments.abstract_instruments import Instrument as _Instrument
 from threading import Lock
-from mr_freeze.exceptions import NoEchoedCommandFoundError
+from mr_freeze.deadlines import check_deadline, remaining
+from mr_freeze.exceptions import NoEchoedCommandFoundError, \
+    DeviceBusyError, TaskTimeoutError
+from mr_freeze.metrics import LatencyHistogram, CommandMetrics
 
 log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=256)
+def _expected_echo(command, terminator):
+    """
+
+    :param str command: The command sent to the device
+    :param str terminator: The terminator that ends the echo
+    :return: The echo that the device should return for this command, as
+        both text and bytes
+    :rtype: Tuple[str, bytes]
+    """
+    echo = command + terminator
+    return echo, echo.encode('utf-8')
+
+
 class AbstractCryomagneticsDevice(_Instrument, metaclass=abc.ABCMeta):
     """
     Base class for devices that use Cryomagnetics instruments to
@@ -24,18 +43,51 @@ class AbstractCryomagneticsDevice(_Instrument, metaclass=abc.ABCMeta):
     ``\\r\\n`` as the terminator for the read response, then it is ambiguous
     when the message ends.
 
-    To solve this problem, a maximum message size of 140 characters is
-    defined in ``MAXIMUM_MESSAGE_SIZE``. It is assumed that this is enough
-    space for the output of a single command.
+    To solve this problem, the response is read frame by frame. The echoed
+    command is read first, since its length is known in advance. If the
+    command is a query (it contains a ``?``), the device is read until the
+    ``\\r\\n`` that closes the response arrives. Commands that are not
+    queries only wait for their echo. This means that a query returns as
+    soon as the device has finished answering, instead of waiting for the
+    serial timeout to expire.
+
+    Bytes that arrive before the echo of a command (for instance, the late
+    response to a query that timed out) are discarded. Bytes that arrive
+    after the end of a frame are kept, and are considered to be the start of
+    the next frame. A maximum message size of 140 characters is defined in
+    ``MAXIMUM_MESSAGE_SIZE``. No more than this many characters are read
+    for a single command.
 
     A querying lock in ``_querying_lock`` is also defined. This lock is
-    acquired when querying and released after the response has been received.
+    acquired when querying and released after the response has been
+    received, even if writing or reading failed. If the lock cannot be
+    acquired within ``query_lock_timeout`` seconds, a
+    :exc:`DeviceBusyError` is raised. Set ``query_lock_timeout`` to
+    ``None`` to wait forever. The time spent waiting for the lock and the
+    time for which it was held are recorded in the ``lock_wait_time`` and
+    ``lock_hold_time`` histograms.
+
+    Queries respect the deadline of the task that sends them. A query is not
+    sent once the deadline has passed, the wait for the querying lock ends
+    at the deadline, and a read that comes back empty after the deadline
+    raises :exc:`TaskTimeoutError` instead of returning a partial frame.
+
+    The latency, bytes sent and received, and errors of every command are
+    recorded in ``command_metrics``.
 
     Queries are thread-safe.
     """
 
     MAXIMUM_MESSAGE_SIZE = 140
 
+    FRAME_TERMINATOR = '\r\n'
+
+    _read_buffer = ''  # type: str
+
+    last_query_latency = None  # type: Optional[float]
+
+    query_lock_timeout = 10.0  # type: Optional[float]
+
     def __init__(self, filelike):
         """
         Create an instance of this device
@@ -45,6 +97,9 @@ class AbstractCryomagneticsDevice(_Instrument, metaclass=abc.ABCMeta):
         super().__init__(filelike)
         self._filelike = filelike
         self._querying_lock = Lock()  # type: Lock
+        self.lock_wait_time = LatencyHistogram()  # type: LatencyHistogram
+        self.lock_hold_time = LatencyHistogram()  # type: LatencyHistogram
+        self.command_metrics = CommandMetrics()  # type: CommandMetrics
 
     @property
     def terminator(self):
@@ -61,64 +116,214 @@ class AbstractCryomagneticsDevice(_Instrument, metaclass=abc.ABCMeta):
 
         :param str cmd: The command to send
         :param int size: Ordinarily, this would represent the number of
-            characters to read, but since this is fixed to
-            ``MAXIMUM_MESSAGE_SIZE``, this parameter has no semantic
-            meaning. It is here to provide a consistent API for using
-            instruments.
+            characters to read, but since the size of the response is
+            determined by the framing of the message, this parameter has no
+            semantic meaning. It is here to provide a consistent API for
+            using instruments.
 
         :return The response from the device
         :rtype: str
+        :raises: :exc:`DeviceBusyError` if the querying lock could not be
+            acquired within ``query_lock_timeout`` seconds
+        :raises: :exc:`TaskTimeoutError` if the deadline of the task sending
+            the query passed
+        """
+        try:
+            check_deadline("send command %r" % cmd)
+        except TaskTimeoutError as error:
+            self.command_metrics.record_error(cmd, error)
+            raise
+
+        waiting_since = monotonic()
+        timeout = -1 if self.query_lock_timeout is None else \
+            self.query_lock_timeout
+
+        time_left = remaining()
+        if time_left is not None:
+            time_left = max(time_left, 0)
+            timeout = time_left if timeout < 0 else min(timeout, time_left)
+
+        if not self._querying_lock.acquire(timeout=timeout):
+            self.lock_wait_time.record(monotonic() - waiting_since)
+            if time_left is not None and timeout == time_left:
+                error = TaskTimeoutError(
+                    "Deadline passed while waiting for the querying lock "
+                    "of <%r> to send command %s" % (self, repr(cmd))
+                )  # type: Exception
+            else:
+                error = DeviceBusyError(
+                    "Could not acquire the querying lock of <%r> within %s s "
+                    "to send command %s" % (
+                        self, self.query_lock_timeout, repr(cmd)
+                    )
+                )
+            self.command_metrics.record_error(cmd, error)
+            raise error
+
+        started_at = monotonic()
+        self.lock_wait_time.record(started_at - waiting_since)
+        message = cmd + self.terminator
+
+        try:
+            self.write(message)
+            log.debug("wrote command %s", repr(message))
+            response = self._read_frame(cmd)
+            self.last_query_latency = monotonic() - started_at
+            log.debug(r"received response %s in %.4f s",
+                      repr(response), self.last_query_latency)
+        except Exception as error:
+            self.command_metrics.record_error(cmd, error)
+            raise
+        finally:
+            self._querying_lock.release()
+            self.lock_hold_time.record(monotonic() - started_at)
+
+        self.command_metrics.record(
+            cmd, self.last_query_latency, len(message), len(response)
+        )
+
+        try:
+            return self.parse_query(cmd, response)
+        except NoEchoedCommandFoundError as error:
+            self.command_metrics.record_error(cmd, error)
+            raise
+
+    def _read_frame(self, command):
+        """
+        Read the echo of a command, and the response to the command if one is
+        expected. Partial reads are accumulated until the frame is complete,
+        the device stops responding, or ``MAXIMUM_MESSAGE_SIZE`` characters
+        have been read.
+
+        :param str command: The command that was sent to the device
+        :return: The frame that was read. If the echo of the command could
+            not be found, everything that was read is returned, so that the
+            parser can report the bad echo
+        :rtype: str
         """
-        self._querying_lock.acquire()
-        self.write(cmd + self.terminator)
-        log.debug("wrote command %s", repr(cmd + self.terminator))
-        response = self.read(size=self.MAXIMUM_MESSAGE_SIZE)
-        log.debug(r"received response %s", repr(response))
-        self._querying_lock.release()
+        echo, _ = _expected_echo(command, self.FRAME_TERMINATOR)
+        expects_response = self._expects_response(command)
 
-        return self.parse_query(cmd, response)
+        buffer = self._read_buffer
+        self._read_buffer = ''
+
+        while True:
+            echo_start = buffer.find(echo)
+
+            if echo_start >= 0:
+                frame_end = self._find_frame_end(
+                    buffer, echo_start + len(echo), expects_response
+                )
+                if frame_end is not None:
+                    break
+                characters_to_read = 1
+            else:
+                characters_to_read = max(len(echo) - len(buffer), 1)
+
+            if len(buffer) >= self.MAXIMUM_MESSAGE_SIZE:
+                return buffer
+
+            chunk = self.read(size=characters_to_read)
+            if not chunk:
+                check_deadline("finish reading the reply to %r" % command)
+                return buffer
+            buffer += chunk
+
+        if echo_start > 0:
+            log.debug("discarded stale characters %s before echo of %s",
+                      repr(buffer[:echo_start]), repr(command))
+
+        self._read_buffer = buffer[frame_end:]
+        return buffer[echo_start:frame_end]
+
+    def _find_frame_end(self, buffer, response_start, expects_response):
+        """
+
+        :param str buffer: The characters read so far
+        :param int response_start: The index in the buffer at which the
+            response to the command starts
+        :param bool expects_response: True if the frame is only complete
+            once the response has been read
+        :return: The index one past the end of the frame, or ``None`` if the
+            frame is not yet complete
+        :rtype: Optional[int]
+        """
+        terminator_index = buffer.find(self.FRAME_TERMINATOR, response_start)
+
+        if terminator_index >= 0:
+            return terminator_index + len(self.FRAME_TERMINATOR)
+        if not expects_response:
+            return response_start
+        return None
+
+    @staticmethod
+    def _expects_response(command):
+        """
+
+        :param str command: The command sent to the device
+        :return: True if the device answers the command with a response
+            line after the echo
+        :rtype: bool
+        """
+        return '?' in command
 
     def parse_query(self, command, response):
         """
         After receiving the response from the device, extract the echoed
         command and the device response. Check that the echoed command
-        matches the command sent to the device, and return the response
+        matches the command sent to the device, and return the response.
+
+        The response is parsed in a single pass, without building any
+        regular expressions. The echo that is expected for each command is
+        cached, so that repeated queries do not need to rebuild it.
 
-        :param command: The command which was sent to the device
-        :param response: The response from the device
+        :param str command: The command which was sent to the device
+        :param response: The response from the device. This can be a
+            :class:`str`, or a bytes-like object such as :class:`bytes` or
+            :class:`memoryview`
         :return: The response from the device, or None if the response is none
         :rtype: Union[None, str]
         :raises: :exc:`NoEchoedCommandFoundError` if the echo did not find
             a valid command
         """
-        log.debug("Query parser for <%s> received command %s and response %s",
-                  self.__repr__(), repr(command), repr(response))
+        log.debug("Query parser for <%r> received command %r and response %r",
+                  self, command, response)
 
-        echoed_command = re.search(
-            r"^{0}(?={1})".format(re.escape(command), '\r\n'),
-            response
-        )
-        response_from_device = re.search(
-            r"(?<={0}).*(?={0}$)".format('\r\n'),
-            response
-        )
+        text_echo, binary_echo = _expected_echo(command, self.FRAME_TERMINATOR)
 
-        log.debug(
-            "Query parser for <%s> parsed echoed command %s and response %s",
-            self.__repr__(), echoed_command, response_from_device
-        )
+        if isinstance(response, str):
+            echo, terminator = text_echo, self.FRAME_TERMINATOR
+        else:
+            response = bytes(response)
+            echo, terminator = binary_echo, self.FRAME_TERMINATOR.encode()
 
-        if echoed_command is None:
+        if not response.startswith(echo):
             raise NoEchoedCommandFoundError(
                 "Expected Command: {0}; Device Response: {1}".format(
                     command, response
                 )
             )
 
-        if response_from_device is None:
+        response_end = len(response) - len(terminator)
+
+        if response_end < len(echo) or not response.endswith(terminator):
+            return None
+
+        response_start = response.rfind(
+            terminator, len(echo) - len(terminator), response_end
+        ) + len(terminator)
+        response_from_device = response[response_start:response_end]
+
+        if terminator[-1:] in response_from_device:
             return None
 
-        return response_from_device.group(0)
+        if not isinstance(response_from_device, str):
+            response_from_device = response_from_device.decode('utf-8')
+
+        log.debug("Query parser for <%r> parsed response %r",
+                  self, response_from_device)
+
+        return response_from_device
 
     def __repr__(self):
         """
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Contains InstrumentKit communicators that wrap another communicator. These
+are put between an InstrumentKit instrument and the communicator that talks
+to the hardware, in order to watch the traffic without changing it.
+"""
+from time import monotonic
+from typing import Any, Callable
+from instruments.abstract_instruments.comm import AbstractCommunicator
+from mr_freeze.metrics import CommandMetrics
+
+
+class DelegatingCommunicator(AbstractCommunicator):
+    """
+    Passes every call through to another communicator. Subclasses override
+    the calls that they need to watch.
+    """
+    def __init__(self, communicator: AbstractCommunicator) -> None:
+        """
+
+        :param communicator: The communicator that talks to the instrument
+        """
+        super().__init__()
+        self.communicator = communicator
+
+    @property
+    def address(self):
+        return self.communicator.address
+
+    @address.setter
+    def address(self, new_address):
+        self.communicator.address = new_address
+
+    @property
+    def terminator(self):
+        return self.communicator.terminator
+
+    @terminator.setter
+    def terminator(self, new_terminator):
+        self.communicator.terminator = new_terminator
+
+    @property
+    def timeout(self):
+        return self.communicator.timeout
+
+    @timeout.setter
+    def timeout(self, new_timeout):
+        self.communicator.timeout = new_timeout
+
+    def close(self) -> None:
+        self.communicator.close()
+
+    def flush_input(self) -> None:
+        self.communicator.flush_input()
+
+    def write_raw(self, msg: bytes) -> None:
+        self.communicator.write_raw(msg)
+
+    def read_raw(self, size: int=-1) -> bytes:
+        return self.communicator.read_raw(size)
+
+    def _sendcmd(self, msg: str) -> None:
+        self.communicator.sendcmd(msg)
+
+    def _query(self, msg: str, size: int=-1) -> str:
+        return self.communicator.query(msg, size)
+
+    def __repr__(self) -> str:
+        return "%s(communicator=%r)" % (
+            self.__class__.__name__, self.communicator
+        )
+
+
+class MeteredCommunicator(DelegatingCommunicator):
+    """
+    Records the latency, byte counts and errors of every command and query
+    in a :class:`CommandMetrics`
+    """
+    def __init__(
+            self,
+            communicator: AbstractCommunicator,
+            command_metrics: CommandMetrics,
+            clock: Callable[[], float]=monotonic
+    ) -> None:
+        """
+
+        :param communicator: The communicator that talks to the instrument
+        :param command_metrics: The metrics in which commands are recorded
+        :param clock: The clock used to time commands. This should only be
+            overwritten during testing
+        """
+        super().__init__(communicator)
+        self.command_metrics = command_metrics
+        self._clock = clock
+
+    def _sendcmd(self, msg: str) -> None:
+        started_at = self._clock()
+
+        try:
+            super()._sendcmd(msg)
+        except Exception as error:
+            self.command_metrics.record_error(msg, error)
+            raise
+
+        self.command_metrics.record(
+            msg, self._clock() - started_at, bytes_out=len(msg)
+        )
+
+    def _query(self, msg: str, size: int=-1) -> str:
+        started_at = self._clock()
+
+        try:
+            response = super()._query(msg, size)
+        except Exception as error:
+            self.command_metrics.record_error(msg, error)
+            raise
+
+        self.command_metrics.record(
+            msg, self._clock() - started_at,
+            bytes_out=len(msg), bytes_in=len(response)
+        )
+        return response
+
+
+def cancel_read(communicator: Any) -> bool:
+    """
+    Make a read that is blocking on a serial port return early, with the
+    bytes read so far. The communicators that wrap the serial port are
+    looked through to find it. This can be called from any thread.
+
+    :param communicator: The communicator of an instrument
+    :return: ``True`` if a serial port was found, and it supports cancelling
+        reads
+    """
+    while True:
+        if isinstance(communicator, DelegatingCommunicator):
+            communicator = communicator.communicator
+        elif hasattr(communicator, '_conn'):
+            connection = communicator._conn
+            break
+        elif hasattr(communicator, '_file'):
+            communicator = communicator._file
+        else:
+            return False
+
+    cancel = getattr(connection, 'cancel_read', None)
+    if cancel is None:
+        return False
+
+    cancel()
+    return True
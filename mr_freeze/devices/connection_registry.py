@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Keeps track of the connections to instruments that are open in this
+process. Connections are identified by the port to which the instrument is
+attached, and by the instrument's address on that port. Instruments that
+are attached directly to a serial port have no address.
+
+Adapters that ask for a connection that is already open share the open
+connection, and all of its locks, instead of opening a second one. Each
+adapter that opens a connection is an owner of that connection. The
+connection is closed when its last owner closes it.
+
+Adapters say what kind of instrument they expect to find on the port, which
+is the class that they use to open it. Asking for a connection to one kind
+of instrument on a port and address that has another kind open raises
+:exc:`PortInUseError`, instead of handing out the wrong instrument.
+
+The command metrics of every open instrument can be read at runtime with
+:meth:`ConnectionRegistry.command_metrics`.
+"""
+import logging
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+from mr_freeze.exceptions import PortInUseError
+from mr_freeze.metrics import CommandMetrics
+
+log = logging.getLogger(__name__)
+
+ConnectionKey = Tuple[str, Optional[Hashable]]
+
+
+class ConnectionRegistry(object):
+    """
+    A registry of open instrument connections, keyed by port and address
+    """
+    def __init__(self) -> None:
+        self._connections = {}  # type: Dict[ConnectionKey, Any]
+        self._owners = {}  # type: Dict[ConnectionKey, Set[object]]
+        self._kinds = {}  # type: Dict[ConnectionKey, Optional[Hashable]]
+        self._lock = Lock()
+
+    def open(
+            self,
+            port: str,
+            address: Optional[Hashable],
+            opener: Callable[[], Any],
+            owner: object,
+            kind: Optional[Hashable]=None
+    ) -> Any:
+        """
+        Get the connection to the instrument at a port and address. If no
+        connection is open, ``opener`` is called to open one.
+
+        :param port: The port to which the instrument is attached
+        :param address: The address of the instrument on the port, or
+            ``None`` if the instrument is the only one on the port
+        :param opener: A function that takes no arguments, and returns a
+            newly-opened connection to the instrument
+        :param owner: The object that will own the connection. The owner
+            must close the connection once it no longer needs it
+        :param kind: The kind of instrument that the owner expects, or
+            ``None`` to accept whatever instrument is open
+        :return: The connection
+        :raises: :exc:`PortInUseError` if a different kind of instrument is
+            open on the port and address
+        """
+        key = (port, address)
+
+        with self._lock:
+            if key not in self._connections:
+                log.debug("Opening connection on port %s, address %s",
+                          port, address)
+                self._connections[key] = opener()
+                self._owners[key] = set()
+                self._kinds[key] = kind
+            elif kind is not None and \
+                    self._kinds[key] not in (None, kind):
+                raise PortInUseError(
+                    "Port %s, address %s is already open to %r, not %r" % (
+                        port, address, self._kinds[key], kind
+                    )
+                )
+            else:
+                log.debug("Reusing connection on port %s, address %s",
+                          port, address)
+
+            self._owners[key].add(owner)
+            return self._connections[key]
+
+    def close(
+            self,
+            port: str,
+            address: Optional[Hashable],
+            owner: object
+    ) -> None:
+        """
+        Give up ownership of a connection. If there are no owners left,
+        the connection is closed. The port itself is only closed if no other
+        instrument on the same port is still open.
+
+        :param port: The port to which the instrument is attached
+        :param address: The address of the instrument on the port
+        :param owner: The object that owned the connection
+        """
+        key = (port, address)
+
+        with self._lock:
+            owners = self._owners.get(key)
+            if owners is None:
+                return
+
+            owners.discard(owner)
+            if owners:
+                return
+
+            connection = self._connections.pop(key)
+            del self._owners[key]
+            del self._kinds[key]
+            port_still_used = any(
+                open_port == port for open_port, _ in self._connections
+            )
+
+        log.debug("Closing connection on port %s, address %s",
+                  port, address)
+        if not port_still_used:
+            self._close_connection(connection)
+
+    def is_open(self, port: str, address: Optional[Hashable]) -> bool:
+        """
+
+        :param port: The port to which the instrument is attached
+        :param address: The address of the instrument on the port
+        :return: ``True`` if a connection to the instrument is open
+        """
+        with self._lock:
+            return (port, address) in self._connections
+
+    def owner_count(self, port: str, address: Optional[Hashable]) -> int:
+        """
+
+        :param port: The port to which the instrument is attached
+        :param address: The address of the instrument on the port
+        :return: The number of owners of the connection
+        """
+        with self._lock:
+            return len(self._owners.get((port, address), ()))
+
+    def command_metrics(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+
+        :return: A dictionary mapping each open connection that keeps
+            command metrics to the summary of those metrics. Connections are
+            named by their port, followed by ``@`` and their address if they
+            have one
+        """
+        with self._lock:
+            open_connections = dict(self._connections)
+
+        return {
+            port if address is None else "%s@%s" % (port, address):
+                connection.command_metrics.summary()
+            for (port, address), connection in open_connections.items()
+            if isinstance(
+                getattr(connection, 'command_metrics', None), CommandMetrics
+            )
+        }
+
+    @staticmethod
+    def _close_connection(connection: Any) -> None:
+        """
+        Close the communicator of an InstrumentKit instrument. InstrumentKit
+        0.3.1 calls ``Serial.shutdown`` before closing a serial port, but
+        pyserial 3 has no such method. The port is still closed, so the
+        resulting ``AttributeError`` is logged and ignored.
+
+        :param connection: The instrument to close
+        """
+        communicator = getattr(connection, '_file', None)
+        if communicator is None:
+            return
+
+        try:
+            communicator.close()
+        except (AttributeError, OSError) as error:
+            log.warning("Error closing communicator %r: %r",
+                        communicator, error)
+
+    def __repr__(self) -> str:
+        return "%s()" % self.__class__.__name__
+
+
+connections = ConnectionRegistry()  # type: ConnectionRegistry
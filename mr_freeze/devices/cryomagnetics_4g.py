@@ -5,8 +5,11 @@ Implements a Cryomagnetics 4G Power supply for InstrumentKit
 from contextlib import contextmanager
 from mr_freeze.devices.abstract_cryomagnetics_device \
     import AbstractCryomagneticsDevice
+from mr_freeze.devices.response_cache import ResponseCache
 import quantities as pq
+from threading import RLock, get_ident
 from time import sleep
+from typing import Optional
 import re
 import logging
 
@@ -15,7 +18,16 @@ log = logging.getLogger(__name__)
 
 class Cryomagnetics4G(AbstractCryomagneticsDevice):
     """
-    Base class for a Cryomagnetics 4G Superconducting Magnet Power supply
+    Base class for a Cryomagnetics 4G Superconducting Magnet Power supply.
+
+    Responses to settings that rarely change are kept in ``response_cache``
+    for the number of seconds given in ``RESPONSE_TIME_TO_LIVE``. Setting a
+    value on the power supply also updates the cache.
+
+    Commands that need the power supply to rest first wait for
+    ``instrument_measurement_timeout`` before they are sent, unless they are
+    sent in a remote session. The commands of a session are sent back to
+    back.
     """
     CHANNELS = {1, 2}
 
@@ -33,6 +45,28 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
 
     instrument_measurement_timeout = 0.5
 
+    RESPONSE_TIME_TO_LIVE = {
+        "ULIM?": 60.0,
+        "LLIM?": 60.0,
+        "UNITS?": 60.0,
+        "PSHTR?": 5.0
+    }
+
+    def __init__(self, filelike):
+        """
+        Create an instance of the power supply
+
+        :param filelike: The communicator to use for making calls to the device
+        """
+        super().__init__(filelike)
+        self._remote_mode_lock = RLock()  # type: RLock
+        self._remote_session_depth = 0  # type: int
+        self._remote_session_owner = None  # type: Optional[int]
+        self._cached_unit = None  # type: Optional[str]
+        self.response_cache = ResponseCache(
+            self.RESPONSE_TIME_TO_LIVE
+        )  # type: ResponseCache
+
     @property
     def terminator(self):
         """
@@ -50,9 +84,16 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
         into the magnet in amperes, but it can also convert the current to a
         predicted magnetic field using a particular relation.
 
+        The unit that was last read from or written to the device is
+        remembered, so that the unit is only changed when it needs to be.
+        The remembered unit is forgotten if the device reports a value in a
+        different unit. Since it is stored on this instance, it is also
+        forgotten whenever the connection to the device is reopened.
+
         :return: The units in which the power supply expresses its measurement
         """
-        response = self.query("UNITS?")
+        response = self._cached_query("UNITS?")
+        self._cached_unit = response if response in self.UNITS else None
         return self.UNITS[response]
 
     @unit.setter
@@ -60,23 +101,53 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
         """
         Set the unit to either amperes or gauss. The valid units to which
         this value can be set are the keys in the ``UNITS`` dictionary of
-        this object
+        this object. If the device is known to be in this unit already,
+        nothing is sent.
 
         :param str unit_to_set: The unit to set
         :raises: :exc:`ValueError` if the unit cannot be set
         """
         if unit_to_set not in self.UNITS.keys():
             raise ValueError("Attempted to set unit to an invalid value")
+        if unit_to_set == self._cached_unit:
+            return
+        self._cached_unit = None
+        self.response_cache.invalidate("UNITS?")
         self.query("UNITS %s" % unit_to_set)
+        self._cached_unit = unit_to_set
+        self.response_cache.put("UNITS?", unit_to_set)
 
     @property
     def current(self):
         """
+        If the power supply reports the current in some unit other than
+        amperes, for instance because the unit was changed on the front
+        panel, the unit is set back to amperes and the current is read again.
 
         :return: The current in amperes being sent out of the power supply
         """
-        self.unit = self.REVERSE_UNITS[pq.amp]
-        sleep(self.instrument_measurement_timeout)
+        current = self._read_current_in_amperes()
+
+        if current.units != pq.amp:
+            log.debug("power supply reported current %s in wrong unit",
+                      current)
+            self._cached_unit = None
+            self.response_cache.invalidate("UNITS?")
+            current = self._read_current_in_amperes()
+
+        return current
+
+    def _read_current_in_amperes(self):
+        """
+        Set the unit to amperes if the device is not known to be in amperes
+        already, and read the output current
+
+        :return: The current read from the device
+        :rtype: Quantity
+        """
+        if self._cached_unit != self.REVERSE_UNITS[pq.amp]:
+            self.unit = self.REVERSE_UNITS[pq.amp]
+            self._rest()
 
         return self.parse_current_response(self.query("IOUT?"))
 
@@ -87,20 +158,24 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
         :return: The sweep current upper limit
         :rtype Quantity
         """
-        sleep(self.instrument_measurement_timeout)
-
-        return self.parse_current_response(self.query("ULIM?"))
+        return self.parse_current_response(
+            self._cached_query("ULIM?", wait_before_query=True)
+        )
 
     @upper_sweep_current.setter
     def upper_sweep_current(self, new_current):
-        sleep(self.instrument_measurement_timeout)
+        self._rest()
         if new_current.units != pq.A:
             raise ValueError("Unable to set current. Units are not amperes")
 
+        self.response_cache.invalidate("ULIM?")
+
         with self._requires_remote_mode():
             log.debug("Setting upper sweep current to %f", float(new_current))
             self.query("ULIM %2.4f" % float(new_current))
 
+        self.response_cache.put("ULIM?", "%2.4fA" % float(new_current))
+
     @property
     def lower_sweep_current(self):
         """
@@ -108,27 +183,31 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
         :return: The lower limit of the sweep current
         :rtype Quantity
         """
-        sleep(self.instrument_measurement_timeout)
-
-        return self.parse_current_response(self.query("LLIM?"))
+        return self.parse_current_response(
+            self._cached_query("LLIM?", wait_before_query=True)
+        )
 
     @lower_sweep_current.setter
     def lower_sweep_current(self, new_current):
-        sleep(self.instrument_measurement_timeout)
+        self._rest()
         if new_current.units != pq.A:
             raise ValueError("Unable to set current. Units are not amperes")
 
+        self.response_cache.invalidate("LLIM?")
+
         with self._requires_remote_mode():
             log.debug("Setting lower sweep current ot %f", float(new_current))
             self.query("LLIM %2.4f" % float(new_current))
 
+        self.response_cache.put("LLIM?", "%2.4fA" % float(new_current))
+
     @property
     def persistent_heater_on(self):
         """
 
         :return: True if the persistent heater is on, and False if not
         """
-        return bool(int(self.query("PSHTR?")))
+        return bool(int(self._cached_query("PSHTR?")))
 
     @property
     def persistent_heater_off(self):
@@ -144,7 +223,7 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
 
         :param fast: Set to true if a fast sweep is desired
         """
-        log.debug("sweeping to %s", self.upper_sweep_current)
+        log.debug("sweeping to %s", self.response_cache.peek("ULIM?"))
 
         with self._requires_remote_mode():
             if fast:
@@ -157,7 +236,7 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
 
         :param fast: Set to true if a fast sweep is desired
         """
-        log.debug("sweeping to %s", self.lower_sweep_current)
+        log.debug("sweeping to %s", self.response_cache.peek("LLIM?"))
 
         with self._requires_remote_mode():
             if fast:
@@ -188,6 +267,28 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
         with self._requires_remote_mode():
             self.query("SWEEP PAUSE")
 
+    def _cached_query(self, command, wait_before_query=False):
+        """
+        Return the cached response to a command if it has one that has not
+        expired. Otherwise, query the device and cache the response.
+
+        :param str command: The command to send
+        :param bool wait_before_query: If ``True``, let the device rest
+            before querying it. No time is spent waiting if the response is
+            cached.
+        :return: The response to the command
+        :rtype: str
+        """
+        response = self.response_cache.get(command)
+
+        if response is None:
+            if wait_before_query:
+                self._rest()
+            response = self.query(command)
+            self.response_cache.put(command, response)
+
+        return response
+
     @staticmethod
     def parse_current_response(response):
         """
@@ -210,14 +311,51 @@ class Cryomagnetics4G(AbstractCryomagneticsDevice):
         return return_value
 
     @contextmanager
+    def remote_session(self):
+        """
+        Put the power supply into remote mode for the duration of the
+        ``with`` block, and return it to local mode afterwards. Sessions are
+        re-entrant. Only the outermost session sends ``REMOTE`` and
+        ``LOCAL``, so that many commands can be sent under a single
+        ``REMOTE`` ... ``LOCAL`` exchange. For example, the following sends
+        ``REMOTE`` and ``LOCAL`` once instead of three times
+
+        .. code-block:: python
+
+            with power_supply.remote_session():
+                power_supply.upper_sweep_current = 1 * pq.A
+                power_supply.lower_sweep_current = 0 * pq.A
+                power_supply.sweep_up()
+
+        While a session is open, other threads that require remote mode wait
+        for the session to end.
+        """
+        with self._remote_mode_lock:
+            if self._remote_session_depth == 0:
+                self.query("REMOTE")
+                self._remote_session_owner = get_ident()
+            self._remote_session_depth += 1
+            try:
+                yield
+            finally:
+                self._remote_session_depth -= 1
+                if self._remote_session_depth == 0:
+                    self._remote_session_owner = None
+                    self.query("LOCAL")
+
+    def _rest(self):
+        """
+        Wait for ``instrument_measurement_timeout`` before a command, unless
+        this thread has a remote session open
+        """
+        if self._remote_session_owner != get_ident():
+            sleep(self.instrument_measurement_timeout)
+
     def _requires_remote_mode(self):
         """
         For queries that require remote mode in order to operate,
         this method ensures that remote mode is entered, and then local mode is
-        returned after the method is complete
+        returned after the method is complete. If a remote session is
+        already open, the command joins that session.
         """
-        self.query("REMOTE")
-        try:
-            yield
-        finally:
-            self.query("LOCAL")
+        return self.remote_session()
@@ -11,32 +11,60 @@ from further business logic.
     the device should go through this adapter layer.
 """
 import numpy as np
-from typing import Optional
+from contextlib import contextmanager
+from typing import Optional, Tuple
 from quantities import Quantity, gauss, amperes
 from mr_freeze.exceptions import NoEchoedCommandFoundError
+from mr_freeze.devices.communicators import cancel_read
+from mr_freeze.devices.connection_registry import ConnectionRegistry, \
+    connections
 from mr_freeze.devices.cryomagnetics_4g import Cryomagnetics4G as \
     _Cryomagnetics4G
+from mr_freeze.devices.single_flight import SingleFlight
 
 
 class Cryomagnetics4G(object):
     """
-    Provide the abstraction layer
-    """
-    _port = '/dev/ttyUSB0'
-    _baud_rate = 9600
-    _managed_instance = None
+    Provide the abstraction layer. The connection to the power supply is
+    opened the first time that it is needed, or when :meth:`open` is
+    called. Adapters attached to the same port share one connection.
+
+    The power supply needs ``minimum_command_gap`` seconds of rest after
+    each measurement before it answers the next one reliably.
 
+    The properties that say how to connect to the device are named in
+    ``connection_settings``.
+
+    Callers that ask for the current while another caller is reading it get
+    that caller's reading, through ``single_flight``.
+    """
     null_value = np.nan * gauss
+    minimum_command_gap = 0.3  # type: float
+    connection_settings = ('port_name', 'baud_rate')  # type: Tuple[str, ...]
 
-    def __init__(self, constructor=_Cryomagnetics4G):
+    def __init__(
+            self,
+            constructor=_Cryomagnetics4G,
+            registry: ConnectionRegistry=connections,
+            single_flight: bool=True
+    ):
         """
 
         :param constructor: The class to use for creating an instance of
         the power supply. By default, this is the implementation of
         Cryomagnetics 4G power supply provided by InstrumentKit. This value
         should only be overwritten during testing
+        :param registry: The registry that keeps track of open connections
+        :param single_flight: If ``True``, callers that ask for the current
+            at the same time share one read
         """
+        self.single_flight = SingleFlight(single_flight)
         self._constructor = constructor
+        self._registry = registry
+        self._port = '/dev/ttyUSB0'  # type: str
+        self._baud_rate = 9600  # type: int
+        self._managed_instance = None  # type: Optional[_Cryomagnetics4G]
+        self._open_port = None  # type: Optional[str]
 
     @property
     def port_name(self) -> str:
@@ -51,8 +79,11 @@ class Cryomagnetics4G(object):
         """
 
         :param new_port: The desired port that the power supply will be
-            attached to
+            attached to. If a connection to another port is open, it is
+            closed
         """
+        if new_port != self._port:
+            self.close()
         self._port = new_port
 
     @property
@@ -70,10 +101,60 @@ class Cryomagnetics4G(object):
     def baud_rate(self, baud: int):
         """
 
-        :param baud: The new desired baud rate
+        :param baud: The new desired baud rate. If a connection at another
+            baud rate is open, it is closed
         """
+        if baud != self._baud_rate:
+            self.close()
         self._baud_rate = baud
 
+    @property
+    def is_open(self) -> bool:
+        """
+
+        :return: True if this adapter has a connection to the power supply
+        """
+        return self._managed_instance is not None
+
+    def open(self) -> _Cryomagnetics4G:
+        """
+        Open a connection to the power supply, or share the connection if
+        one is already open on this port
+
+        :return: The power supply
+        """
+        if self._managed_instance is None:
+            port = self.port_name
+            self._managed_instance = self._registry.open(
+                port, None,
+                lambda: self._constructor.open_serial(
+                    port=port, baud=self.baud_rate
+                ),
+                self, kind=self._constructor
+            )
+            self._open_port = port
+        return self._managed_instance
+
+    def close(self) -> None:
+        """
+        Give up this adapter's connection to the power supply. The
+        connection is closed once no other adapter is using it
+        """
+        if self._open_port is not None:
+            self._registry.close(self._open_port, None, self)
+        self._managed_instance = None
+        self._open_port = None
+
+    def interrupt(self) -> None:
+        """
+        Make a read that is blocking on the power supply's port return early.
+        The query that was reading stops, and the connection stays open for
+        the next query
+        """
+        instance = self._managed_instance
+        if instance is not None:
+            cancel_read(instance._file)
+
     @property
     def _power_supply(self) -> Optional[_Cryomagnetics4G]:
         """
@@ -81,9 +162,7 @@ class Cryomagnetics4G(object):
         :return: The power supply with the required parameters
         """
         if self._managed_instance is None:
-            self._managed_instance = self._constructor.open_serial(
-                port=self.port_name, baud=self.baud_rate
-            )
+            self.open()
         return self._managed_instance
 
     @property
@@ -92,6 +171,13 @@ class Cryomagnetics4G(object):
 
         :return: The current that the power supply has measured
         """
+        return self.single_flight.do("current", self._read_current)
+
+    def _read_current(self) -> Quantity:
+        """
+
+        :return: The current, read from the power supply
+        """
         try:
             current = self._power_supply.current
         except NoEchoedCommandFoundError:
@@ -143,6 +229,86 @@ class Cryomagnetics4G(object):
         self._assert_valid_current(new_current)
         self._power_supply.lower_sweep_current = new_current
 
+    @property
+    def cached_upper_sweep_current(self) -> Quantity:
+        """
+
+        :return: The upper sweep current held in the power supply's response
+            cache, or ``null_value`` if it is not held. The power supply is
+            not asked for it
+        """
+        return self._cached_current("ULIM?")
+
+    @property
+    def cached_lower_sweep_current(self) -> Quantity:
+        """
+
+        :return: The lower sweep current held in the power supply's response
+            cache, or ``null_value`` if it is not held. The power supply is
+            not asked for it
+        """
+        return self._cached_current("LLIM?")
+
+    def _cached_current(self, command: str) -> Quantity:
+        """
+
+        :param command: The query whose cached response is required
+        :return: The current in the cached response, or ``null_value``
+        """
+        response = self._power_supply.response_cache.peek(command)
+        if response is None:
+            return self.null_value
+        return self._power_supply.parse_current_response(response)
+
+    def set_sweep_limits(
+            self,
+            upper: Optional[Quantity]=None,
+            lower: Optional[Quantity]=None
+    ) -> None:
+        """
+        Set the sweep limits under one ``REMOTE`` ... ``LOCAL`` exchange,
+        in an order that never leaves the lower limit above the upper one.
+        The upper limit is set first if it is not below the lower limit held
+        in the power supply's response cache. If that lower limit is not
+        known, the upper limit is set first only if the new lower limit is
+        above the present upper limit, which is read from the cache, or from
+        the power supply if it is not cached
+
+        :param upper: The new upper sweep current, or ``None`` to leave it
+        :param lower: The new lower sweep current, or ``None`` to leave it
+        :raises: ``ValueError`` if a current is out of range, in which case
+            neither limit is set
+        """
+        limits = [
+            (name, current) for name, current in (
+                ('upper_sweep_current', upper),
+                ('lower_sweep_current', lower)
+            ) if current is not None
+        ]
+        for _, current in limits:
+            self._assert_valid_current(current)
+        if not limits:
+            return
+
+        with self.remote_session():
+            if len(limits) == 2 and not self._upper_first(upper, lower):
+                limits.reverse()
+            for name, current in limits:
+                setattr(self._power_supply, name, current)
+
+    def _upper_first(self, upper: Quantity, lower: Quantity) -> bool:
+        """
+
+        :param upper: The new upper sweep current
+        :param lower: The new lower sweep current
+        :return: ``True`` if the upper limit must be set before the lower
+            one
+        """
+        present_lower = float(self.cached_lower_sweep_current)
+        if not np.isnan(present_lower):
+            return float(upper) >= present_lower
+        return float(lower) > float(self.upper_sweep_current)
+
     def sweep_up(self, fast: bool=False) -> None:
         """
         Sweep the current up to the high limit
@@ -164,7 +330,7 @@ class Cryomagnetics4G(object):
 
         :param fast: True if the sweep is to be fast
         """
-        self._power_supply.sweep_zero(fast)
+        self._power_supply.sweep_to_zero(fast)
 
     def pause_sweep(self) -> None:
         """
@@ -172,6 +338,16 @@ class Cryomagnetics4G(object):
         """
         self._power_supply.pause_sweep()
 
+    @contextmanager
+    def remote_session(self):
+        """
+        Keep the power supply in remote mode for the duration of a ``with``
+        block, so that several control commands share one ``REMOTE`` ...
+        ``LOCAL`` exchange. Sessions can be nested.
+        """
+        with self._power_supply.remote_session():
+            yield
+
     @staticmethod
     def _assert_valid_current(current: Quantity) -> None:
         """
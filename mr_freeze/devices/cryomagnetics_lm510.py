@@ -7,21 +7,38 @@ import abc
 from six import add_metaclass
 from mr_freeze.exceptions import InvalidChannelError, DataNotReadyError
 from threading import Lock
+from time import monotonic
 from mr_freeze.devices.abstract_cryomagnetics_device \
     import AbstractCryomagneticsDevice
 import quantities as pq
 import re
 import logging
+from typing import Optional, Set, Tuple
 
 log = logging.getLogger(__name__)
 log.setLevel(logging.DEBUG)
 
+_Snapshot = Tuple[float, bytes]
+
 
 class CryomagneticsLM510(AbstractCryomagneticsDevice):
     """
     Represents a Cryomagnetics LM-510 liquid cryogen level monitor. Like all
     devices in InstrumentKit, the channels on this device are indexed starting
     from 0. Channel 1 is therefore 0, and Channel 2 is 1.
+
+    The status byte is read at most once every ``status_byte_freshness``
+    seconds. All channel readiness checks made within this window share the
+    same reading. Starting a measurement on a channel with ``MEAS n`` makes
+    the next check of that channel read the status byte again, while the
+    other channel keeps using the reading. Reading a measurement with
+    ``MEAS?`` does not change the status byte. A reset, or a ``MEAS``
+    without a channel, forces every check to read the status byte again.
+    Set ``status_byte_freshness`` to ``0`` to read the status byte on every
+    check.
+
+    Each level meter has its own locks, so level meters on different ports
+    can make measurements at the same time.
     """
     INSTRUMENT_TO_INDEX_CHANNELS = {
         1: 0,
@@ -32,8 +49,9 @@ class CryomagneticsLM510(AbstractCryomagneticsDevice):
         1: 2
     }
 
-    channel_measurement_lock = Lock()  # type: Lock
-    querying_lock = Lock()  # type: Lock
+    status_byte_freshness = 1.0  # type: float
+
+    _START_MEASUREMENT = re.compile(r"^MEAS(?:\s+(\d+))?\s*$")
 
     UNITS = {
         "cm": pq.cm,
@@ -42,6 +60,47 @@ class CryomagneticsLM510(AbstractCryomagneticsDevice):
         "percent": pq.percent
     }
 
+    def __init__(self, filelike):
+        """
+        Create an instance of the level meter
+
+        :param filelike: The communicator to use for making calls to the device
+        """
+        super().__init__(filelike)
+        self.channel_measurement_lock = Lock()  # type: Lock
+        self.querying_lock = self._querying_lock  # type: Lock
+        self._status_byte_lock = Lock()  # type: Lock
+        self._status_byte_snapshot = None  # type: Optional[_Snapshot]
+        self._stale_channels = set()  # type: Set[int]
+
+    def query(self, cmd, size=-1):
+        """
+        Query the device. Commands that start a measurement change the
+        status byte, so the snapshot of the status byte is discarded for
+        the measured channel after these commands, or for every channel
+        after a reset.
+
+        :param str cmd: The command to send
+        :param int size: Not used. See
+            :meth:`AbstractCryomagneticsDevice.query`
+        :return: The response from the device
+        :rtype: str
+        """
+        try:
+            return super().query(cmd, size)
+        finally:
+            measurement = self._START_MEASUREMENT.match(cmd)
+            if cmd == "*RST" or (
+                measurement is not None and not measurement.group(1)
+            ):
+                self.invalidate_status_byte()
+            elif measurement is not None:
+                self.invalidate_status_byte(
+                    self.INSTRUMENT_TO_INDEX_CHANNELS.get(
+                        int(measurement.group(1))
+                    )
+                )
+
     @property
     def default_channel(self):
         """
@@ -82,8 +141,49 @@ class CryomagneticsLM510(AbstractCryomagneticsDevice):
         :return: The current value of the status byte
         :rtype: bytes
         """
-        byte_as_string = self.query("*STB?")
-        return bytes([int(byte_as_string)])
+        return self.status_byte_for_channel(None)
+
+    def status_byte_for_channel(self, channel):
+        """
+        Get the status byte for checking one channel. A snapshot of the
+        status byte is used if it is fresh, and no measurement has been
+        started on the channel since it was taken
+
+        :param channel: The index of the channel to check, or ``None`` if
+            the snapshot must be current for every channel
+        :return: The status byte
+        :rtype: bytes
+        """
+        with self._status_byte_lock:
+            snapshot = self._status_byte_snapshot
+            stale = bool(self._stale_channels) if channel is None else \
+                channel in self._stale_channels
+
+            if snapshot is not None and not stale and \
+                    monotonic() - snapshot[0] < self.status_byte_freshness:
+                return snapshot[1]
+
+            byte_as_string = self.query("*STB?")
+            status_byte = bytes([int(byte_as_string)])
+            self._status_byte_snapshot = (monotonic(), status_byte)
+            self._stale_channels.clear()
+
+        return status_byte
+
+    def invalidate_status_byte(self, channel=None):
+        """
+        Discard the snapshot of the status byte, so that the next readiness
+        check reads the status byte from the device
+
+        :param channel: The index of the channel whose readiness changed, or
+            ``None`` to discard the snapshot for every channel
+        """
+        with self._status_byte_lock:
+            if channel is None:
+                self._status_byte_snapshot = None
+                self._stale_channels.clear()
+            else:
+                self._stale_channels.add(channel)
 
     def reset(self):
         """
@@ -147,10 +247,24 @@ class CryomagneticsLM510(AbstractCryomagneticsDevice):
             :return: ``True`` if the channel is ready, otherwise ``False``
             :rtype: bool
             """
-            status_byte = self.instrument.status_byte
+            return self.is_data_ready(
+                self.instrument.status_byte_for_channel(self.channel_number),
+                self.channel_number
+            )
+
+        @classmethod
+        def is_data_ready(cls, status_byte, channel_number):
+            """
+
+            :param bytes status_byte: The status byte of the instrument
+            :param int channel_number: The index of the channel to check
+            :return: ``True`` if the status byte says that the channel is
+                ready, otherwise ``False``
+            :rtype: bool
+            """
             return (int(status_byte[0]) &
-                    self._CHANNEL_NUMBER_TO_DATA_READY_BIT_INDEX[
-                        self.channel_number
+                    cls._CHANNEL_NUMBER_TO_DATA_READY_BIT_INDEX[
+                        channel_number
                     ]) > 0
 
         @property
@@ -5,34 +5,68 @@ provides a layer of abstraction between the InstrumentKit implementation of
 the device, and a working device
 """
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from numpy import nan
 from quantities import Quantity, cm
 from instruments.abstract_instruments import Instrument as _Instrument
 from mr_freeze.exceptions import DeviceCommunicationError
+from mr_freeze.devices.communicators import cancel_read
+from mr_freeze.devices.connection_registry import ConnectionRegistry, \
+    connections
 from mr_freeze.devices.cryomagnetics_lm510 import CryomagneticsLM510 as \
     _CryomagneticsLM510
+from mr_freeze.devices.single_flight import SingleFlight
 
 log = logging.getLogger(__name__)
 
 
 class CryomagneticsLM510(object):
     """
-    Adapter layer for the Cryomagnetics LM 510 level meter
-    """
-    _port = '/dev/ttyUSB0'  # type: str
-    _baud_rate = 9600  # type: int
-    _timeout_in_seconds = 3.0  # type: float
-    _managed_instance = None  # type: _Instrument
-    _constructor = _CryomagneticsLM510  # type: _Instrument
+    Adapter layer for the Cryomagnetics LM 510 level meter. The connection
+    to the level meter is opened the first time that it is needed, or when
+    :meth:`open` is called. Adapters attached to the same port share one
+    connection.
+
+    The level meter needs ``minimum_command_gap`` seconds of rest after
+    each measurement before it answers the next one reliably.
 
+    The properties that say how to connect to the device are named in
+    ``connection_settings``.
+    """
     null_value = nan * cm
+    minimum_command_gap = 0.3  # type: float
+    connection_settings = (
+        'port_name', 'baud_rate', 'timeout_in_seconds'
+    )  # type: Tuple[str, ...]
 
     INDEX_TO_INSTRUMENT_CHANNELS = \
         _CryomagneticsLM510.INDEX_TO_INSTRUMENT_CHANNELS
 
     ALLOWED_CHANNELS = INDEX_TO_INSTRUMENT_CHANNELS.values()
 
+    def __init__(
+            self,
+            constructor=_CryomagneticsLM510,
+            registry: ConnectionRegistry=connections,
+            single_flight: bool=True
+    ) -> None:
+        """
+
+        :param constructor: The class to use for creating an instance of
+            the level meter. This should only be overwritten during testing
+        :param registry: The registry that keeps track of open connections
+        :param single_flight: If ``True``, callers that ask for a channel's
+            measurement at the same time share one read
+        """
+        self.single_flight = SingleFlight(single_flight)
+        self._constructor = constructor  # type: _Instrument
+        self._registry = registry
+        self._port = '/dev/ttyUSB0'  # type: str
+        self._baud_rate = 9600  # type: int
+        self._timeout_in_seconds = 3.0  # type: float
+        self._managed_instance = None  # type: Optional[_Instrument]
+        self._open_port = None  # type: Optional[str]
+
     @property
     def port_name(self) -> str:
         """
@@ -45,8 +79,11 @@ class CryomagneticsLM510(object):
     def port_name(self, new_port_name: str):
         """
 
-        :param str new_port_name: The desired port name for the device
+        :param str new_port_name: The desired port name for the device. If
+            a connection to another port is open, it is closed
         """
+        if new_port_name != self._port:
+            self.close()
         self._port = new_port_name
 
     @property
@@ -62,8 +99,11 @@ class CryomagneticsLM510(object):
     def baud_rate(self, new_baud_rate: int):
         """
 
-        :param int new_baud_rate: The desired baud rate
+        :param int new_baud_rate: The desired baud rate. If a connection
+            at another baud rate is open, it is closed
         """
+        if new_baud_rate != self._baud_rate:
+            self.close()
         self._baud_rate = new_baud_rate
 
     @property
@@ -85,6 +125,53 @@ class CryomagneticsLM510(object):
         """
         self._timeout_in_seconds = new_timeout
 
+    @property
+    def is_open(self) -> bool:
+        """
+
+        :return: True if this adapter has a connection to the level meter
+        """
+        return self._managed_instance is not None
+
+    def open(self) -> _CryomagneticsLM510:
+        """
+        Open a connection to the level meter, or share the connection if
+        one is already open on this port
+
+        :return: The level meter
+        """
+        if self._managed_instance is None:
+            port = self.port_name
+            self._managed_instance = self._registry.open(
+                port, None,
+                lambda: self._constructor.open_serial(
+                    port=port, baud=self.baud_rate
+                ),
+                self, kind=self._constructor
+            )
+            self._open_port = port
+        return self._managed_instance
+
+    def close(self) -> None:
+        """
+        Give up this adapter's connection to the level meter. The
+        connection is closed once no other adapter is using it
+        """
+        if self._open_port is not None:
+            self._registry.close(self._open_port, None, self)
+        self._managed_instance = None
+        self._open_port = None
+
+    def interrupt(self) -> None:
+        """
+        Make a read that is blocking on the level meter's port return early.
+        The query that was reading stops, and the connection stays open for
+        the next query
+        """
+        instance = self._managed_instance
+        if instance is not None:
+            cancel_read(instance._file)
+
     @property
     def _level_meter(self) -> Optional[_CryomagneticsLM510]:
         """
@@ -92,9 +179,7 @@ class CryomagneticsLM510(object):
         :return: An instance of the level meter with the desired parameters
         """
         if self._managed_instance is None:
-            self._managed_instance = self._constructor.open_serial(
-                port=self.port_name, baud=self.baud_rate
-            )
+            self.open()
         return self._managed_instance
 
     @property
@@ -117,7 +202,19 @@ class CryomagneticsLM510(object):
         """
 
         :param int channel_number: The channel on which to measure
-        :return:
+        :return: The measurement, shared with any other caller measuring
+            the channel at the same time
+        """
+        return self.single_flight.do(
+            "channel_%d_measurement" % (channel_number + 1),
+            lambda: self._read_measurement(channel_number)
+        )
+
+    def _read_measurement(self, channel_number) -> Quantity:
+        """
+
+        :param int channel_number: The channel on which to measure
+        :return: The measurement, read from the level meter
         """
         channel = self._level_meter[channel_number]
 
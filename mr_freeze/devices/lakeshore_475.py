@@ -2,19 +2,58 @@
 Contains methods for working with the Lakeshore 475 Gaussmeter
 """
 from quantities import Quantity
-from typing import Optional
+from typing import Optional, Tuple
 from instruments.lakeshore import Lakeshore475 as _Lakeshore475
 from time import sleep
+from mr_freeze.deadlines import check_deadline
+from mr_freeze.devices.communicators import MeteredCommunicator, \
+    cancel_read
+from mr_freeze.devices.connection_registry import ConnectionRegistry, \
+    connections
+from mr_freeze.devices.single_flight import SingleFlight
+from mr_freeze.metrics import CommandMetrics
 
 
 class Lakeshore475(object):
     """
-    Adapter layer for IK's Lakeshore 475 implementation
+    Adapter layer for IK's Lakeshore 475 implementation. The connection to
+    the magnetometer is opened the first time that it is needed, or when
+    :meth:`open` is called. Adapters with the same port and GPIB address
+    share one connection.
+
+    The magnetometer needs ``minimum_command_gap`` seconds of rest after
+    each measurement before it answers the next one reliably.
+
+    The properties that say how to connect to the device are named in
+    ``connection_settings``.
+
+    Callers that ask for the field while another caller is reading it get
+    that caller's reading, through ``single_flight``.
     """
-    _port = '/dev/ttyUSB0'
-    _address = 12
-    _managed_instance = None
-    _constructor = _Lakeshore475
+    minimum_command_gap = 0.3  # type: float
+    connection_settings = ('port_name', 'address')  # type: Tuple[str, ...]
+
+    def __init__(
+            self,
+            constructor=_Lakeshore475,
+            registry: ConnectionRegistry=connections,
+            single_flight: bool=True
+    ) -> None:
+        """
+
+        :param constructor: The class to use for creating an instance of
+            the magnetometer. This should only be overwritten during testing
+        :param registry: The registry that keeps track of open connections
+        :param single_flight: If ``True``, callers that ask for the field at
+            the same time share one read
+        """
+        self.single_flight = SingleFlight(single_flight)
+        self._constructor = constructor
+        self._registry = registry
+        self._port = '/dev/ttyUSB0'  # type: str
+        self._address = 12  # type: int
+        self._managed_instance = None  # type: Optional[_Lakeshore475]
+        self._open_key = None  # type: Optional[Tuple[str, int]]
 
     @property
     def port_name(self) -> str:
@@ -28,9 +67,12 @@ class Lakeshore475(object):
     def port_name(self, new_port_name: str) -> None:
         """
 
-        :param new_port_name: The new port
+        :param new_port_name: The new port. If a connection to another port
+            is open, it is closed
         :return:
         """
+        if new_port_name != self._port:
+            self.close()
         self._port = new_port_name
 
     @property
@@ -45,26 +87,88 @@ class Lakeshore475(object):
     def address(self, new_address: int) -> None:
         """
 
-        :param new_address: The desired address
+        :param new_address: The desired address. If a connection to
+            another address is open, it is closed
         :return:
         """
+        if new_address != self._address:
+            self.close()
         self._address = new_address
 
     @property
-    def _magnetometer(self) -> Optional[_Lakeshore475]:
+    def is_open(self) -> bool:
         """
 
-        :return: The instance of the magnetometer that this adapter manages, or
-            None if there is no instance.
+        :return: True if this adapter has a connection to the magnetometer
+        """
+        return self._managed_instance is not None
+
+    def open(self) -> _Lakeshore475:
+        """
+        Open a connection to the magnetometer, or share the connection if
+        one is already open on this port and address
+
+        :return: The magnetometer
+        """
+        if self._managed_instance is None:
+            key = (self.port_name, self.address)
+            self._managed_instance = self._registry.open(
+                key[0], key[1], lambda: self._open_gpibusb(*key), self,
+                kind=self._constructor
+            )
+            self._open_key = key
+        return self._managed_instance
+
+    def close(self) -> None:
+        """
+        Give up this adapter's connection to the magnetometer. The
+        connection is closed once no other adapter is using it
+        """
+        if self._open_key is not None:
+            self._registry.close(self._open_key[0], self._open_key[1], self)
+        self._managed_instance = None
+        self._open_key = None
+
+    def interrupt(self) -> None:
+        """
+        Make a read that is blocking on the magnetometer's port return early.
+        The query that was reading stops, and the connection stays open for
+        the next query
+        """
+        instance = self._managed_instance
+        if instance is not None:
+            cancel_read(instance._file)
+
+    def _open_gpibusb(self, port: str, address: int) -> _Lakeshore475:
+        """
+
+        :param port: The port to which the GPIB-USB adapter is attached
+        :param address: The GPIB address of the magnetometer
+        :return: A newly-opened magnetometer. The latency, byte counts and
+            errors of its queries are recorded in its ``command_metrics``
 
         .. note::
             The 1 second delay is required for the gaussmeter to reset
             itself and accept commands
         """
+        magnetometer = self._constructor.open_gpibusb(
+            port=port, gpib_address=address)
+        magnetometer.command_metrics = CommandMetrics()
+        magnetometer._file = MeteredCommunicator(
+            magnetometer._file, magnetometer.command_metrics
+        )
+        sleep(1)
+        return magnetometer
+
+    @property
+    def _magnetometer(self) -> Optional[_Lakeshore475]:
+        """
+
+        :return: The instance of the magnetometer that this adapter manages, or
+            None if there is no instance.
+        """
         if self._managed_instance is None:
-            self._managed_instance = self._constructor.open_gpibusb(
-                port=self.port_name, gpib_address=self.address)
-            sleep(1)
+            self.open()
 
         return self._managed_instance
 
@@ -73,7 +177,17 @@ class Lakeshore475(object):
         """
 
         :return: The measured magnetic field from the Gaussmeter
+        :raises: :exc:`TaskTimeoutError` if the deadline of the task reading
+            the field has passed
+        """
+        return self.single_flight.do("field", self._read_field)
+
+    def _read_field(self) -> Quantity:
+        """
+
+        :return: The field, read from the Gaussmeter
         """
+        check_deadline("read the magnetic field")
         try:
             return self._magnetometer.field
         except ValueError:
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a cache for responses to queries whose answers change slowly. A
+response is kept for a time to live that is configured per command. Once
+this time has elapsed, the next query for that command goes to the device.
+"""
+from collections import Counter
+from threading import Lock
+from time import monotonic
+from typing import Callable, Dict, Optional, Tuple
+
+
+class ResponseCache(object):
+    """
+    Caches responses by the command that produced them. Only commands with a
+    time to live in ``time_to_live`` are cached. The number of hits and
+    misses for each command are counted in ``hits`` and ``misses``.
+    """
+    def __init__(
+            self,
+            time_to_live: Dict[str, float],
+            clock: Callable[[], float]=monotonic
+    ) -> None:
+        """
+
+        :param time_to_live: A dictionary mapping each command that can be
+            cached to the number of seconds for which its response is valid
+        :param clock: The clock used to decide whether a response has
+            expired. This should only be overwritten during testing
+        """
+        self.time_to_live = dict(time_to_live)  # type: Dict[str, float]
+        self.hits = Counter()  # type: Counter
+        self.misses = Counter()  # type: Counter
+
+        self._clock = clock
+        self._responses = {}  # type: Dict[str, Tuple[float, str]]
+        self._lock = Lock()
+
+    def get(self, command: str) -> Optional[str]:
+        """
+
+        :param command: The command whose response is required
+        :return: The cached response, or ``None`` if there is no valid
+            response in the cache. A hit or a miss is counted for commands
+            that can be cached
+        """
+        if command not in self.time_to_live:
+            return None
+
+        response = self.peek(command)
+
+        if response is None:
+            self.misses[command] += 1
+        else:
+            self.hits[command] += 1
+
+        return response
+
+    def peek(self, command: str) -> Optional[str]:
+        """
+
+        :param command: The command whose response is required
+        :return: The cached response, or ``None`` if there is no valid
+            response in the cache. Hits and misses are not counted
+        """
+        with self._lock:
+            entry = self._responses.get(command)
+
+            if entry is None:
+                return None
+
+            expires_at, response = entry
+            if self._clock() >= expires_at:
+                del self._responses[command]
+                return None
+
+            return response
+
+    def put(self, command: str, response: Optional[str]) -> None:
+        """
+        Store a response. Responses to commands that are not in
+        ``time_to_live``, and empty responses, are ignored.
+
+        :param command: The command that produced the response
+        :param response: The response to cache
+        """
+        if command not in self.time_to_live or response is None:
+            return
+
+        with self._lock:
+            self._responses[command] = (
+                self._clock() + self.time_to_live[command], response
+            )
+
+    def invalidate(self, command: Optional[str]=None) -> None:
+        """
+
+        :param command: The command whose response is to be forgotten. If
+            this is ``None``, all responses are forgotten
+        """
+        with self._lock:
+            if command is None:
+                self._responses.clear()
+            else:
+                self._responses.pop(command, None)
+
+    def __repr__(self) -> str:
+        return "%s(time_to_live=%s)" % (
+            self.__class__.__name__, self.time_to_live
+        )
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a guard that stops callers from making the same read from a device
+at the same time. The GUI, the measurement loop and the control listeners
+can all ask an adapter for the same reading at nearly the same moment. With
+the guard, the first caller makes the read, and the others wait for its
+result, instead of each making a round trip to the device.
+"""
+from collections import Counter
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable
+from mr_freeze.deadlines import check_deadline, remaining
+from mr_freeze.exceptions import TaskTimeoutError
+
+
+class SingleFlight(object):
+    """
+    Shares the result of a call among the callers that ask for it while it
+    is in flight. Calls are told apart by a key. A caller that gets the
+    result of another caller's call is counted as a hit in ``hits``, and a
+    caller that makes the call is counted as a miss in ``misses``.
+
+    If the call raises, its callers get the same exception. If the call
+    ran out of time, its waiting callers make the call again, since their
+    own deadlines may not have passed. A waiting caller waits no longer than
+    the time left before its own deadline.
+    """
+    def __init__(self, enabled: bool=True) -> None:
+        """
+
+        :param enabled: If ``False``, every caller makes its own call
+        """
+        self.enabled = enabled
+        self.hits = Counter()  # type: Counter
+        self.misses = Counter()  # type: Counter
+
+        self._calls = {}  # type: Dict[Hashable, Future]
+        self._lock = Lock()
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """
+
+        :param key: The name of the call
+        :param function: The function that makes the call
+        :return: The result of the call
+        :raises: :exc:`TaskTimeoutError` if the caller's deadline passed
+            while it was waiting for another caller's call
+        """
+        if not self.enabled:
+            return function()
+
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = Future()
+                    self.misses[key] += 1
+                    leading = True
+                else:
+                    leading = False
+
+            if leading:
+                return self._call(key, call, function)
+
+            try:
+                result = call.result(remaining())
+            except FutureTimeoutError:
+                check_deadline("wait for %s" % key)
+                continue
+            except TaskTimeoutError:
+                continue
+
+            with self._lock:
+                self.hits[key] += 1
+            return result
+
+    def summary(self) -> Dict[Hashable, Dict[str, int]]:
+        """
+
+        :return: A dictionary mapping each key to its hits and misses
+        """
+        with self._lock:
+            return {
+                key: {"hits": self.hits[key], "misses": self.misses[key]}
+                for key in set(self.hits) | set(self.misses)
+            }
+
+    def _call(
+            self, key: Hashable, call: Future, function: Callable[[], Any]
+    ) -> Any:
+        """
+        Make a call, and hand its result to the callers waiting for it
+
+        :param key: The name of the call
+        :param call: The future on which the callers are waiting
+        :param function: The function that makes the call
+        :return: The result of the call
+        """
+        try:
+            result = function()
+        except BaseException as error:
+            self._finish(key)
+            call.set_exception(error)
+            raise
+
+        self._finish(key)
+        call.set_result(result)
+        return result
+
+    def _finish(self, key: Hashable) -> None:
+        """
+        Let the next caller with this key make a new call
+
+        :param key: The name of the call that finished
+        """
+        with self._lock:
+            del self._calls[key]
+
+    def __repr__(self) -> str:
+        return "%s(enabled=%s)" % (self.__class__.__name__, self.enabled)
@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Records the traffic between the application and an instrument to a trace
+file, and plays trace files back in place of the instrument.
+
+A :class:`RecordingCommunicator` sits between an InstrumentKit instrument
+and its communicator, and writes every exchange to a trace. A
+:class:`ReplayCommunicator` takes the place of the communicator, and answers
+each exchange from a trace, waiting as long as the instrument took to
+answer. The adapters accept a :class:`RecordingConstructor` or a
+:class:`ReplayConstructor` as their ``constructor``, so that a recording or
+replaying instrument can be put under an adapter without changing it.
+
+A trace file starts with ``MAGIC``, followed by one record per exchange.
+Each record is a header packed with ``RECORD_HEADER``, holding the kind of
+exchange, the time at which it started relative to the start of the
+recording, its duration in seconds, and the lengths of the request and the
+response. The request and the response follow the header.
+"""
+import logging
+import struct
+from collections import deque
+from enum import Enum
+from threading import Lock
+from time import monotonic, sleep
+from typing import BinaryIO, Callable, Deque, Iterable, Iterator, List, \
+    NamedTuple
+from instruments.abstract_instruments.comm import AbstractCommunicator
+from mr_freeze.devices.communicators import DelegatingCommunicator
+from mr_freeze.exceptions import TraceMismatchError
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"MFTRACE\x01"
+RECORD_HEADER = struct.Struct("<BddII")
+
+NO_DELAY = float('inf')
+
+
+class ExchangeKind(Enum):
+    """
+    The communicator methods whose traffic is recorded
+    """
+    WRITE = 1
+    READ = 2
+    SENDCMD = 3
+    QUERY = 4
+
+
+TraceEvent = NamedTuple('TraceEvent', [
+    ('kind', ExchangeKind),
+    ('started_at', float),
+    ('duration', float),
+    ('request', bytes),
+    ('response', bytes)
+])
+
+
+class TraceWriter(object):
+    """
+    Writes trace events to a binary stream. Writes from several threads are
+    serialized.
+    """
+    def __init__(self, stream: BinaryIO) -> None:
+        """
+
+        :param stream: The stream to which the trace is written
+        """
+        self._stream = stream
+        self._lock = Lock()
+        self._stream.write(MAGIC)
+
+    def write(self, event: TraceEvent) -> None:
+        """
+
+        :param event: The event to append to the trace
+        """
+        record = RECORD_HEADER.pack(
+            event.kind.value, event.started_at, event.duration,
+            len(event.request), len(event.response)
+        ) + event.request + event.response
+
+        with self._lock:
+            self._stream.write(record)
+
+    def flush(self) -> None:
+        """
+        Flush the underlying stream
+        """
+        with self._lock:
+            self._stream.flush()
+
+
+def read_trace(stream: BinaryIO) -> Iterator[TraceEvent]:
+    """
+
+    :param stream: A stream holding a trace
+    :return: An iterator over the events in the trace
+    :raises: ``ValueError`` if the stream does not hold a trace
+    """
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Stream %r does not hold a trace" % stream)
+
+    while True:
+        header = stream.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+
+        kind, started_at, duration, request_length, response_length = \
+            RECORD_HEADER.unpack(header)
+
+        yield TraceEvent(
+            ExchangeKind(kind), started_at, duration,
+            stream.read(request_length), stream.read(response_length)
+        )
+
+
+class RecordingCommunicator(DelegatingCommunicator):
+    """
+    Passes everything through to another communicator, and records each
+    exchange with its timing
+    """
+    def __init__(
+            self,
+            communicator: AbstractCommunicator,
+            writer: TraceWriter,
+            clock: Callable[[], float]=monotonic
+    ) -> None:
+        """
+
+        :param communicator: The communicator that talks to the instrument
+        :param writer: The writer to which exchanges are recorded
+        :param clock: The clock used to time exchanges. This should only be
+            overwritten during testing
+        """
+        super().__init__(communicator)
+        self._writer = writer
+        self._clock = clock
+        self._recording_started_at = clock()
+
+    def close(self) -> None:
+        self._writer.flush()
+        super().close()
+
+    def write_raw(self, msg: bytes) -> None:
+        def exchange() -> bytes:
+            super(RecordingCommunicator, self).write_raw(msg)
+            return b""
+
+        self._record(ExchangeKind.WRITE, msg, exchange)
+
+    def read_raw(self, size: int=-1) -> bytes:
+        return self._record(
+            ExchangeKind.READ, str(size).encode('utf-8'),
+            lambda: super(RecordingCommunicator, self).read_raw(size)
+        )
+
+    def _sendcmd(self, msg: str) -> None:
+        def exchange() -> bytes:
+            super(RecordingCommunicator, self)._sendcmd(msg)
+            return b""
+
+        self._record(ExchangeKind.SENDCMD, msg.encode('utf-8'), exchange)
+
+    def _query(self, msg: str, size: int=-1) -> str:
+        response = self._record(
+            ExchangeKind.QUERY, msg.encode('utf-8'),
+            lambda: super(RecordingCommunicator, self)._query(
+                msg, size
+            ).encode('utf-8')
+        )
+        return response.decode('utf-8')
+
+    def _record(
+            self,
+            kind: ExchangeKind,
+            request: bytes,
+            exchange: Callable[[], bytes]
+    ) -> bytes:
+        """
+        Carry out an exchange with the instrument, and record it
+
+        :param kind: The kind of exchange
+        :param request: The request sent to the instrument
+        :param exchange: A function that carries out the exchange, and
+            returns the response
+        :return: The response
+        """
+        started_at = self._clock()
+        response = exchange()
+        finished_at = self._clock()
+
+        self._writer.write(TraceEvent(
+            kind, started_at - self._recording_started_at,
+            finished_at - started_at, request, response
+        ))
+        return response
+
+
+class ReplayCommunicator(AbstractCommunicator):
+    """
+    Answers exchanges from a trace. Each exchange is matched to the next
+    event in the trace with the same kind and request. Events that are
+    skipped over are discarded, so that code which sends fewer commands
+    than the recorded code can still be replayed. Each exchange takes the
+    recorded duration divided by ``speed``.
+
+    The bytes read after a write are treated as a stream, since the reads
+    that split them up depend on the code doing the reading. A read returns
+    at most ``size`` bytes of what the instrument sent in reply to the
+    writes so far, or nothing if the instrument sent nothing more.
+    """
+    def __init__(
+            self,
+            events: Iterable[TraceEvent],
+            speed: float=1.0,
+            sleep: Callable[[float], None]=sleep
+    ) -> None:
+        """
+
+        :param events: The events of the trace to replay
+        :param speed: The factor by which the replay is faster than the
+            recording. Use ``NO_DELAY`` to replay without waiting
+        :param sleep: The function used to wait. This should only be
+            overwritten during testing
+        """
+        super().__init__()
+        self.speed = speed
+        self.address = None
+        self.terminator = "\n"
+        self.timeout = None
+
+        self._events = list(events)  # type: List[TraceEvent]
+        self._position = 0
+        self._pending_reads = deque()  # type: Deque[List]
+        self._sleep = sleep
+        self._lock = Lock()
+
+    @property
+    def address(self):
+        return self._address
+
+    @address.setter
+    def address(self, new_address):
+        self._address = new_address
+
+    @property
+    def terminator(self):
+        return self._terminator
+
+    @terminator.setter
+    def terminator(self, new_terminator):
+        self._terminator = new_terminator
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @timeout.setter
+    def timeout(self, new_timeout):
+        self._timeout = new_timeout
+
+    @property
+    def events_remaining(self) -> int:
+        """
+
+        :return: The number of events not yet replayed or skipped
+        """
+        return len(self._events) - self._position
+
+    def close(self) -> None:
+        pass
+
+    def flush_input(self) -> None:
+        with self._lock:
+            self._pending_reads.clear()
+
+    def write_raw(self, msg: bytes) -> None:
+        with self._lock:
+            event = self._match(ExchangeKind.WRITE, msg)
+
+            while self._position < len(self._events) and \
+                    self._events[self._position].kind == ExchangeKind.READ:
+                read = self._events[self._position]
+                self._pending_reads.append([read.response, read.duration])
+                self._position += 1
+
+        self._wait(event.duration)
+
+    def read_raw(self, size: int=-1) -> bytes:
+        with self._lock:
+            response = b""
+            delay = 0.0
+
+            while self._pending_reads and \
+                    (size < 0 or len(response) < size):
+                chunk = self._pending_reads[0]
+                delay += chunk[1]
+                chunk[1] = 0.0
+
+                wanted = len(chunk[0]) if size < 0 \
+                    else size - len(response)
+                response += chunk[0][:wanted]
+                chunk[0] = chunk[0][wanted:]
+
+                if not chunk[0]:
+                    self._pending_reads.popleft()
+
+        self._wait(delay)
+        return response
+
+    def _sendcmd(self, msg: str) -> None:
+        with self._lock:
+            event = self._match(ExchangeKind.SENDCMD, msg.encode('utf-8'))
+        self._wait(event.duration)
+
+    def _query(self, msg: str, size: int=-1) -> str:
+        with self._lock:
+            event = self._match(ExchangeKind.QUERY, msg.encode('utf-8'))
+        self._wait(event.duration)
+        return event.response.decode('utf-8')
+
+    def _match(self, kind: ExchangeKind, request: bytes) -> TraceEvent:
+        """
+        Find the next event for an exchange, and move past it
+
+        :param kind: The kind of exchange
+        :param request: The request sent
+        :return: The matching event
+        :raises: :exc:`TraceMismatchError` if no event in the rest of the
+            trace matches
+        """
+        for position in range(self._position, len(self._events)):
+            event = self._events[position]
+            if event.kind == kind and event.request == request:
+                if position > self._position:
+                    log.debug("Skipped %d events to replay %s %r",
+                              position - self._position, kind, request)
+                self._position = position + 1
+                return event
+
+        raise TraceMismatchError(
+            "No %s of %r in the remaining %d events of the trace" % (
+                kind.name, request, self.events_remaining
+            )
+        )
+
+    def _wait(self, duration: float) -> None:
+        """
+
+        :param duration: The recorded duration of an exchange
+        """
+        if duration > 0 and self.speed != NO_DELAY:
+            self._sleep(duration / self.speed)
+
+    def __repr__(self) -> str:
+        return "%s(speed=%s, events_remaining=%d)" % (
+            self.__class__.__name__, self.speed, self.events_remaining
+        )
+
+
+class RecordingConstructor(object):
+    """
+    Opens instruments of a class in the usual way, and records their
+    traffic. Pass this to an adapter as its ``constructor``.
+    """
+    def __init__(self, instrument_class: type, stream: BinaryIO) -> None:
+        """
+
+        :param instrument_class: The InstrumentKit class of the instrument
+        :param stream: The stream to which the trace is written
+        """
+        self.instrument_class = instrument_class
+        self.writer = TraceWriter(stream)
+
+    def open_serial(self, *args, **kwargs):
+        return self._record(self.instrument_class.open_serial(
+            *args, **kwargs
+        ))
+
+    def open_gpibusb(self, *args, **kwargs):
+        return self._record(self.instrument_class.open_gpibusb(
+            *args, **kwargs
+        ))
+
+    def _record(self, instrument):
+        """
+
+        :param instrument: A newly-opened instrument
+        :return: The instrument, with its traffic being recorded
+        """
+        instrument._file = RecordingCommunicator(instrument._file, self.writer)
+        return instrument
+
+    def __repr__(self) -> str:
+        return "%s(instrument_class=%s)" % (
+            self.__class__.__name__, self.instrument_class.__name__
+        )
+
+
+class ReplayConstructor(object):
+    """
+    Makes instruments of a class that replay a trace instead of talking to
+    hardware. Pass this to an adapter as its ``constructor``. The arguments
+    that would normally open the instrument are ignored.
+    """
+    def __init__(
+            self,
+            instrument_class: type,
+            stream: BinaryIO,
+            speed: float=1.0
+    ) -> None:
+        """
+
+        :param instrument_class: The InstrumentKit class of the instrument
+        :param stream: The stream holding the trace
+        :param speed: The factor by which the replay is faster than the
+            recording
+        """
+        self.instrument_class = instrument_class
+        self.speed = speed
+        self._events = list(read_trace(stream))  # type: List[TraceEvent]
+
+    def open_serial(self, *_, **__):
+        return self._replay()
+
+    def open_gpibusb(self, *_, **__):
+        return self._replay()
+
+    def _replay(self):
+        """
+
+        :return: An instrument that replays the trace from the start
+        """
+        return self.instrument_class(
+            ReplayCommunicator(self._events, speed=self.speed)
+        )
+
+    def __repr__(self) -> str:
+        return "%s(instrument_class=%s, speed=%s)" % (
+            self.__class__.__name__, self.instrument_class.__name__,
+            self.speed
+        )
@@ -19,6 +19,14 @@ class BadConfigParameter(ValueError):
     pass
 
 
+class PortInUseError(BadConfigParameter):
+    """
+    Thrown if a connection is asked for on a port and address that already
+    has a connection open to a different kind of instrument
+    """
+    pass
+
+
 class DeviceCommunicationError(RuntimeError, IOError):
     """
     Thrown if a query could not be answered
@@ -40,6 +48,14 @@ class NoResponseError(DeviceCommunicationError):
     pass
 
 
+class DeviceBusyError(DeviceCommunicationError):
+    """
+    Thrown if the device could not be queried because another query held
+    the device's querying lock for too long
+    """
+    pass
+
+
 class DataNotReadyError(DeviceCommunicationError):
     """
     Thrown if data that should be ready is not
@@ -47,6 +63,39 @@ class DataNotReadyError(DeviceCommunicationError):
     pass
 
 
+class TraceMismatchError(DeviceCommunicationError):
+    """
+    Thrown if a command sent during replay does not appear in the rest of
+    the trace being replayed
+    """
+    pass
+
+
+class InstrumentWorkerError(DeviceCommunicationError):
+    """
+    Thrown if a command could not be carried out because the worker process
+    running the instrument is not running, or stopped before it answered
+    """
+    pass
+
+
+class TaskTimeoutError(RuntimeError):
+    """
+    Thrown if a task did not finish before its deadline. This is not a
+    :exc:`DeviceCommunicationError`, so that tasks which fall back to a null
+    value when an instrument misbehaves still report the timeout.
+    """
+    pass
+
+
+class TaskDroppedError(TaskTimeoutError):
+    """
+    Thrown if a task was still queued at its deadline, and was dropped
+    without talking to its instrument
+    """
+    pass
+
+
 class InvalidChannelError(ValueError):
     """
     Thrown if trying to access a channel that does not exist on an instrument
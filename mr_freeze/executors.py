@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Contains an executor that runs the work for each instrument in order. Since
+instruments can only answer one command at a time, running two tasks for
+the same instrument on different threads only makes the threads wait on the
+instrument's locks. Giving each instrument a lane of its own runs those
+tasks back to back instead, while tasks for different instruments still run
+in parallel.
+
+Instruments also need a pause between measurements. Each instrument type
+declares the pause it needs in its ``minimum_command_gap`` attribute. After
+a task for an instrument finishes, the next task in its lane is put off
+until the gap has passed. The wait is kept on a :class:`TimerQueue`, so no
+worker thread sleeps through it. A task that raises
+:exc:`TaskDroppedError` never talked to the instrument, so the gap is not
+started after it.
+
+Each task in a lane has a :class:`Priority`. When an instrument is free,
+its most urgent queued task runs next, so that a control command such as
+pausing a sweep does not wait behind the measurements queued before it.
+Tasks of the same priority run in the order in which they were submitted.
+The time each task spent queued is recorded by priority, and reported by
+:meth:`InstrumentAffineExecutor.queue_latency`.
+"""
+import logging
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from enum import IntEnum
+from threading import Condition
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+from mr_freeze.exceptions import TaskDroppedError
+from mr_freeze.metrics import LatencyHistogram
+from mr_freeze.timers import TimerQueue
+
+log = logging.getLogger(__name__)
+
+_WorkItem = Tuple[
+    Future, Callable[..., Any], Tuple, Dict[str, Any], 'Priority', float
+]
+
+
+class Priority(IntEnum):
+    """
+    How urgently a task for an instrument should run. Queued tasks with a
+    higher priority run before queued tasks with a lower one
+    """
+    MEASUREMENT = 0
+    CONTROL = 1
+
+
+def instrument_key(instrument: Any) -> Hashable:
+    """
+
+    :param instrument: An instrument
+    :return: The port name and address of the instrument, which is the same
+        for every adapter of the instrument, or the instrument itself if it
+        has no port name
+    """
+    port_name = getattr(instrument, 'port_name', None)
+    if port_name is None:
+        return instrument
+    return port_name, getattr(instrument, 'address', None)
+
+
+class InstrumentAffineExecutor(Executor):
+    """
+    Runs tasks submitted with :meth:`submit_to` one at a time for each
+    instrument, most urgent first and otherwise in the order in which they
+    were submitted, and no sooner
+    than the instrument's ``minimum_command_gap`` after the previous task
+    for that instrument finished. Tasks submitted with :meth:`submit` are
+    not tied to an instrument, and run straight away.
+
+    All tasks run on a pool of ``workers`` threads. Since each instrument
+    runs one task at a time, instruments never need more threads than there
+    are instruments.
+
+    Instruments are told apart by their port name and address, so adapters
+    that share a connection also share a lane. Objects without a port name
+    get a lane of their own.
+
+    .. warning::
+        A task must not wait for the result of another task submitted to its
+        own instrument, since that task can only run after it has finished
+    """
+    def __init__(
+            self,
+            workers: int=4,
+            timers: Optional[TimerQueue]=None,
+            task_timeout: Optional[float]=None
+    ) -> None:
+        """
+
+        :param workers: The number of threads that run tasks
+        :param timers: The timer queue on which the gaps between tasks are
+            kept. By default, the executor has a queue of its own
+        :param task_timeout: The time in seconds that tasks submitted to
+            this executor have to finish, unless they set a timeout of their
+            own. ``None`` means that tasks have no deadline
+        """
+        self.task_timeout = task_timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._timers = TimerQueue() if timers is None else timers
+        self._owns_timers = timers is None
+        self._lanes = {}  # type: Dict[Hashable, _Lane]
+        self._queue_latency = {
+            priority: LatencyHistogram() for priority in Priority
+        }  # type: Dict[Priority, LatencyHistogram]
+        self._condition = Condition()
+        self._shutdown = False
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        """
+        Run a task that is not tied to an instrument
+
+        :param fn: The function to run
+        :return: A future that resolves to the function's return value
+        """
+        return self._pool.submit(fn, *args, **kwargs)
+
+    def submit_to(
+            self,
+            instrument: Any,
+            fn: Callable[..., Any],
+            *args,
+            priority: Priority=Priority.MEASUREMENT,
+            **kwargs
+    ) -> Future:
+        """
+        Run a task after the earlier tasks for the same instrument with at
+        least its priority, once the instrument's minimum command gap has
+        passed
+
+        :param instrument: The instrument that the task talks to
+        :param fn: The function to run
+        :param priority: How urgently the task should run
+        :return: A future that resolves to the function's return value
+        """
+        future = Future()  # type: Future
+        key = self._lane_key(instrument)
+
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot schedule new tasks after shutdown")
+
+            lane = self._lanes.get(key)
+            if lane is None:
+                log.debug("Opening lane for instrument %r", instrument)
+                lane = self._lanes[key] = _Lane(instrument)
+
+            lane.push(
+                (future, fn, args, kwargs, priority, self._timers.clock())
+            )
+            if lane.busy:
+                return future
+            lane.busy = True
+
+        self._dispatch(lane)
+        return future
+
+    @property
+    def lane_count(self) -> int:
+        """
+
+        :return: The number of instruments that have a lane
+        """
+        with self._condition:
+            return len(self._lanes)
+
+    def queue_latency(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+
+        :return: A summary of the time that tasks spent queued before they
+            started, by the name of their priority
+        """
+        return {
+            priority.name: histogram.summary()
+            for priority, histogram in self._queue_latency.items()
+        }
+
+    def shutdown(self, wait: bool=True) -> None:
+        """
+
+        :param wait: If ``True``, wait for all pending tasks to finish
+        """
+        with self._condition:
+            self._shutdown = True
+            if wait:
+                self._condition.wait_for(
+                    lambda: not any(
+                        lane.busy for lane in self._lanes.values()
+                    )
+                )
+
+        if self._owns_timers:
+            self._timers.stop()
+        self._pool.shutdown(wait=wait)
+
+    def _dispatch(self, lane: '_Lane') -> None:
+        """
+        Start the next task in a lane once the lane's gap has passed. The
+        lane must have been marked busy by the caller.
+
+        :param lane: The lane whose next task is to be started
+        """
+        delay = lane.ready_at - self._timers.clock()
+
+        if delay > 0:
+            try:
+                self._timers.call_later(delay, self._start_next, lane)
+                return
+            except RuntimeError:
+                pass
+
+        self._start_next(lane)
+
+    def _start_next(self, lane: '_Lane') -> None:
+        """
+
+        :param lane: The lane whose next task is to be handed to the pool
+        """
+        with self._condition:
+            if not len(lane):
+                lane.busy = False
+                self._condition.notify_all()
+                return
+            item = lane.pop()
+
+        try:
+            self._pool.submit(self._run, lane, item)
+        except RuntimeError as error:
+            item[0].set_exception(error)
+            self._start_next(lane)
+
+    def _run(self, lane: '_Lane', item: _WorkItem) -> None:
+        """
+        Run a task, and then dispatch the next task in its lane
+
+        :param lane: The lane to which the task belongs
+        :param item: The task, with its future and arguments
+        """
+        future, fn, args, kwargs, priority, queued_at = item
+
+        if future.set_running_or_notify_cancel():
+            self._queue_latency[priority].record(
+                self._timers.clock() - queued_at
+            )
+            dropped = False
+            try:
+                result = fn(*args, **kwargs)
+            except TaskDroppedError as error:
+                dropped = True
+                future.set_exception(error)
+            except BaseException as error:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+            if not dropped:
+                lane.ready_at = self._timers.clock() + lane.gap
+
+        self._dispatch(lane)
+
+    @staticmethod
+    def _lane_key(instrument: Any) -> Hashable:
+        """
+
+        :param instrument: An instrument
+        :return: The key of the instrument's lane
+        """
+        return instrument_key(instrument)
+
+    def __repr__(self) -> str:
+        return "%s(lanes=%d)" % (self.__class__.__name__, self.lane_count)
+
+
+class _Lane(object):
+    """
+    The queues of tasks waiting for an instrument, one for each priority
+    """
+    def __init__(self, instrument: Any) -> None:
+        """
+
+        :param instrument: The instrument whose tasks are queued
+        """
+        self.instrument = instrument
+        self.pending = {
+            priority: deque() for priority in Priority
+        }  # type: Dict[Priority, Deque[_WorkItem]]
+        self.busy = False
+        self.ready_at = float('-inf')
+
+    @property
+    def gap(self) -> float:
+        """
+
+        :return: The time in seconds that must pass between the end of one
+            task and the start of the next
+        """
+        return float(getattr(self.instrument, 'minimum_command_gap', 0.0))
+
+    def push(self, item: _WorkItem) -> None:
+        """
+
+        :param item: The task to queue behind the tasks of its priority
+        """
+        self.pending[item[4]].append(item)
+
+    def pop(self) -> _WorkItem:
+        """
+
+        :return: The oldest of the most urgent queued tasks
+        """
+        for priority in sorted(self.pending, reverse=True):
+            if self.pending[priority]:
+                return self.pending[priority].popleft()
+        raise IndexError("No tasks are queued for %r" % self.instrument)
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self.pending.values())
+
+    def __repr__(self) -> str:
+        return "%s(instrument=%r)" % (self.__class__.__name__, self.instrument)
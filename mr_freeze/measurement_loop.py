@@ -1,14 +1,42 @@
 # coding=utf-8
 """
 Describes a loop for measuring instrument values and writing these values to
-an application store
+an application store.
+
+Each variable can be measured at its own rate. The loop runs every ``tick``
+seconds, where the tick is the largest interval that divides every sample
+interval, and measures the variables that are due on that tick. Variables
+that fall due together are measured by one :class:`MakeMeasurement`, which
+makes all the reads from an instrument in one visit.
+
+Each visit goes through an :class:`OverrunGuard`, which limits the visits
+in flight for each instrument, so that a hanging instrument cannot fill the
+executor with visits that it will never get to.
+
+The readings made on each tick are gathered into one :class:`SampleRecord`,
+which is published on the loop's :class:`SampleStream` when the last visit
+of the tick finishes. A visit that the guard holds back and starts late is
+published in a record of its own.
+
+Given an :class:`AdaptiveSampling` policy, the loop reads the records that
+it publishes back into the policy, and samples the variables that the policy
+adapts at the policy's intervals instead of their own. The tick then also
+divides the fast interval of each adapted variable.
 """
-import schedule
-from concurrent.futures import Executor
+import math
+from concurrent.futures import Executor, Future
+from functools import reduce
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Type
+from mr_freeze.adaptive_sampling import AdaptiveSampling
 from mr_freeze.devices.lakeshore_475 import Lakeshore475
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
-from mr_freeze.resources.application_state import Store
+from mr_freeze.overrun import OverrunGuard
+from mr_freeze.resources.abstract_store import Variable
+from mr_freeze.resources.application_state import Store, Current, \
+    MagneticField
+from mr_freeze.samples import SampleStream, collect, samples as _samples
+from mr_freeze.scheduler import Scheduler, scheduler as _scheduler
 from mr_freeze.tasks.make_measurement import MakeMeasurement
 
 
@@ -23,9 +51,29 @@ class MeasurementLoop(object):
             magnetometer: Lakeshore475,
             store: Store,
             executor: Executor,
-            sample_interval_in_seconds: int,
-            scheduler: schedule=schedule
+            sample_interval_in_seconds: float,
+            scheduler: Scheduler=_scheduler,
+            sample_intervals: Optional[Mapping[Type[Variable], float]]=None,
+            overrun_guard: Optional[OverrunGuard]=None,
+            samples: SampleStream=_samples,
+            sampling: Optional[AdaptiveSampling]=None
     ) -> None:
+        """
+
+        :param sample_interval_in_seconds: The time in seconds between
+            measurements of variables that do not have an interval of their
+            own
+        :param scheduler: The scheduler on which the loop runs
+        :param sample_intervals: The time in seconds between measurements
+            of each variable that is measured at its own rate
+        :param overrun_guard: The guard that decides what to do with visits
+            to an instrument that is still busy. By default, they are skipped
+        :param samples: The stream on which the records of the measurements
+            are published
+        :param sampling: The policy that decides how often to sample the
+            current and the magnetic field. By default, every variable is
+            sampled at its own fixed interval
+        """
         self.power_supply = power_supply
         self.level_meter = level_meter
         self.magnetometer = magnetometer
@@ -33,23 +81,155 @@ class MeasurementLoop(object):
         self.executor = executor
         self.sample_interval = sample_interval_in_seconds
         self.scheduler = scheduler
+        self.sample_intervals = {
+            variable: self.sample_interval for variable in
+            MakeMeasurement.VARIABLES
+        }  # type: Dict[Type[Variable], float]
+        self.sample_intervals.update(sample_intervals or {})
+        self.overrun_guard = OverrunGuard() if overrun_guard is None \
+            else overrun_guard
+        self.samples = samples
+        self.sampling = sampling
+
+        self._observed = None if sampling is None else samples.subscribe()
+        self._ticks = 0
+
+    @property
+    def tick(self) -> float:
+        """
+
+        :return: The time in seconds between runs of the loop. This is the
+            largest whole number of milliseconds that divides every sample
+            interval
+        """
+        intervals = list(self.sample_intervals.values())
+        if self.sampling is not None:
+            minimums = self.minimum_intervals
+            intervals.extend(
+                self.sampling.fast_interval_for(
+                    variable, minimums.get(variable, 0.0)
+                ) for variable in self.sampling.variables
+                if variable in self.sample_intervals
+            )
+        milliseconds = (
+            max(int(round(interval * 1000)), 1) for interval in intervals
+        )
+        return reduce(math.gcd, milliseconds) / 1000
+
+    @property
+    def minimum_intervals(self) -> Dict[Type[Variable], float]:
+        """
+
+        :return: The shortest time in seconds between samples of each
+            variable that its instrument allows
+        """
+        return {
+            Current: float(
+                getattr(self.power_supply, 'minimum_command_gap', 0.0)
+            ),
+            MagneticField: float(
+                getattr(self.magnetometer, 'minimum_command_gap', 0.0)
+            )
+        }
+
+    @property
+    def intervals(self) -> Dict[Type[Variable], float]:
+        """
+
+        :return: The time in seconds between samples of each variable now
+        """
+        if self.sampling is None:
+            return dict(self.sample_intervals)
+        return self.sampling.intervals(
+            self.sample_intervals, self.minimum_intervals
+        )
 
     def run(self) -> None:
         """
-        Run the measurement on a particular schedule
-        :return:
+        Measure each variable every time its sample interval passes
         """
-        self.scheduler.every(self.sample_interval).seconds.do(
-            self.run_single_iteration).tag(self.__repr__())
+        self._ticks = 0
+        self.scheduler.every(
+            self.tick, self.run_due_measurements, tag=self.__repr__()
+        )
+
+    def due_variables(self, tick_number: int) -> List[Type[Variable]]:
+        """
+
+        :param tick_number: The number of ticks since the loop started
+        :return: The variables whose sample interval ends on that tick.
+            Every variable is due on the first tick
+        """
+        tick = self.tick
+        return [
+            variable for variable, interval in self.intervals.items()
+            if tick_number % max(int(round(interval / tick)), 1) == 0
+        ]
+
+    def run_due_measurements(self) -> None:
+        """
+        Measure the variables that are due on this tick
+        """
+        if self.sampling is not None:
+            self.sampling.observe(self._observed.take())
+        variables = self.due_variables(self._ticks)
+        self._ticks += 1
+        self._measure(variables)
 
     def run_single_iteration(self) -> None:
         """
         Run a single iteration of the loop
         """
-        task = MakeMeasurement(
-            self.level_meter, self.power_supply, self.magnetometer, self.store
+        self._measure(MakeMeasurement.VARIABLES)
+
+    def _measure(self, variables: Sequence[Type[Variable]]) -> None:
+        """
+        Offer a visit to each instrument with variables to measure to the
+        overrun guard, and publish the record of the visits that start now
+
+        :param variables: The variables to measure
+        """
+        started = []  # type: List[Tuple[Sequence[Type[Variable]], Future]]
+        on_tick = [True]
+
+        def launch(visit_variables: Sequence[Type[Variable]]) -> Future:
+            future = self._visit(visit_variables)
+            if on_tick[0]:
+                started.append((visit_variables, future))
+            else:
+                self.samples.publish_when_done(
+                    collect([(visit_variables, future)])
+                )
+            return future
+
+        for visit in self._make_measurement(variables).visits:
+            self.overrun_guard.offer(visit.instrument, visit.variables, launch)
+        on_tick[0] = False
+
+        if started:
+            self.samples.publish_when_done(collect(started))
+
+    def _visit(self, variables: Sequence[Type[Variable]]) -> Future:
+        """
+
+        :param variables: Variables that are all read from one instrument
+        :return: The future of the visit that reads them
+        """
+        visit, = self._make_measurement(variables).visits
+        return visit(self.executor)
+
+    def _make_measurement(
+            self, variables: Sequence[Type[Variable]]
+    ) -> MakeMeasurement:
+        """
+
+        :param variables: The variables to measure
+        :return: The task that measures them
+        """
+        return MakeMeasurement(
+            self.level_meter, self.power_supply, self.magnetometer,
+            self.store, variables
         )
-        task(self.executor)
 
     def __repr__(self) -> str:
         """
@@ -66,7 +246,11 @@ class MeasurementLoop(object):
                 '%s=%s, ' % ("store", self.store),
                 '%s=%s, ' % ("executor", self.executor),
                 '%s=%s, ' % ("sample_interval", self.sample_interval),
+                '%s=%s, ' % ("sample_intervals", self.sample_intervals),
+                '%s=%s, ' % ("overrun_guard", self.overrun_guard),
                 '%s=%s, ' % ("scheduler", self.scheduler),
+                '%s=%s, ' % ("samples", self.samples),
+                '%s=%s, ' % ("sampling", self.sampling),
                 ')'
             )
         )
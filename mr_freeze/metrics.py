@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Contains histograms for keeping track of how long things take. The
+histograms are cheap to update, so they can be left running all the time.
+"""
+import re
+from collections import Counter
+from threading import Lock
+from typing import Any, Dict, Optional
+
+
+class LatencyHistogram(object):
+    """
+    A histogram of durations in the style of an HDR histogram. Durations are
+    counted in whole units of ``resolution`` seconds. Durations below
+    ``2 ** SIGNIFICANT_BITS`` units are counted exactly. Longer durations are
+    counted in buckets whose width grows with the duration, so that every
+    bucket is within ``2 ** -(SIGNIFICANT_BITS - 1)`` of the durations that
+    it holds. The memory used grows with the logarithm of the longest
+    duration, and not with the number of durations recorded.
+    """
+    SIGNIFICANT_BITS = 5
+
+    def __init__(self, resolution: float=1e-6) -> None:
+        """
+
+        :param resolution: The smallest duration in seconds that the
+            histogram can tell apart from zero
+        """
+        self.resolution = resolution
+
+        self._counts = {}  # type: Dict[int, int]
+        self._count = 0
+        self._total = 0.0
+        self._maximum = 0.0
+        self._lock = Lock()
+
+    def record(self, duration: float) -> None:
+        """
+
+        :param duration: The duration to record, in seconds
+        """
+        index = self._index(max(int(duration / self.resolution), 0))
+
+        with self._lock:
+            self._counts[index] = self._counts.get(index, 0) + 1
+            self._count += 1
+            self._total += duration
+            self._maximum = max(self._maximum, duration)
+
+    @property
+    def count(self) -> int:
+        """
+
+        :return: The number of durations recorded
+        """
+        return self._count
+
+    @property
+    def total(self) -> float:
+        """
+
+        :return: The sum of the recorded durations, in seconds
+        """
+        return self._total
+
+    @property
+    def mean(self) -> Optional[float]:
+        """
+
+        :return: The mean of the recorded durations in seconds, or ``None``
+            if nothing has been recorded
+        """
+        with self._lock:
+            if not self._count:
+                return None
+            return self._total / self._count
+
+    @property
+    def maximum(self) -> float:
+        """
+
+        :return: The longest duration recorded, in seconds
+        """
+        return self._maximum
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """
+
+        :param percent: The percentile to find, between 0 and 100
+        :return: The lower edge of the bucket holding the percentile in
+            seconds, or ``None`` if nothing has been recorded
+        """
+        with self._lock:
+            if not self._count:
+                return None
+
+            rank = percent / 100.0 * self._count
+            seen = 0
+            for index in sorted(self._counts):
+                seen += self._counts[index]
+                if seen >= rank:
+                    return self._lowest_value(index) * self.resolution
+
+            return self._maximum
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        """
+
+        :return: A dictionary summarizing the histogram
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.maximum
+        }
+
+    def reset(self) -> None:
+        """
+        Forget all recorded durations
+        """
+        with self._lock:
+            self._counts.clear()
+            self._count = 0
+            self._total = 0.0
+            self._maximum = 0.0
+
+    @classmethod
+    def _index(cls, value: int) -> int:
+        """
+
+        :param value: A duration, in units of the resolution
+        :return: The index of the bucket that holds the duration
+        """
+        shift = value.bit_length() - cls.SIGNIFICANT_BITS
+        if shift <= 0:
+            return value
+        half = 1 << (cls.SIGNIFICANT_BITS - 1)
+        return shift * half + (value >> shift)
+
+    @classmethod
+    def _lowest_value(cls, index: int) -> int:
+        """
+
+        :param index: The index of a bucket
+        :return: The smallest duration held by the bucket, in units of the
+            resolution
+        """
+        if index < 1 << cls.SIGNIFICANT_BITS:
+            return index
+        half = 1 << (cls.SIGNIFICANT_BITS - 1)
+        shift = index // half - 1
+        return (index - shift * half) << shift
+
+    def __repr__(self) -> str:
+        return "%s(resolution=%s)" % (self.__class__.__name__, self.resolution)
+
+
+class CommandMetrics(object):
+    """
+    Keeps a latency histogram, byte counts and error counts for each command
+    sent to an instrument. Decimal arguments are replaced by ``<n>`` in the
+    name under which a command is counted, so that setting a new limit does
+    not start a new histogram. Integer arguments, such as channel numbers,
+    are kept.
+    """
+    _DECIMAL = re.compile(r"^[-+]?\d*\.\d+[A-Za-z]*$")
+
+    def __init__(self) -> None:
+        self.latency = {}  # type: Dict[str, LatencyHistogram]
+        self.bytes_out = Counter()  # type: Counter
+        self.bytes_in = Counter()  # type: Counter
+        self.errors = {}  # type: Dict[str, Counter]
+        self._lock = Lock()
+
+    @classmethod
+    def command_key(cls, command: str) -> str:
+        """
+
+        :param command: A command sent to the instrument
+        :return: The name under which the command is counted
+        """
+        return " ".join(
+            "<n>" if cls._DECIMAL.match(word) else word
+            for word in command.split()
+        )
+
+    def record(
+            self,
+            command: str,
+            duration: float,
+            bytes_out: int=0,
+            bytes_in: int=0
+    ) -> None:
+        """
+
+        :param command: The command that was sent
+        :param duration: The time taken to send the command and read the
+            response, in seconds
+        :param bytes_out: The number of bytes sent
+        :param bytes_in: The number of bytes received
+        """
+        key = self.command_key(command)
+
+        with self._lock:
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = LatencyHistogram()
+            self.bytes_out[key] += bytes_out
+            self.bytes_in[key] += bytes_in
+
+        histogram.record(duration)
+
+    def record_error(self, command: str, error: BaseException) -> None:
+        """
+
+        :param command: The command that failed
+        :param error: The exception raised by the command
+        """
+        key = self.command_key(command)
+
+        with self._lock:
+            self.errors.setdefault(key, Counter())[
+                error.__class__.__name__
+            ] += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+
+        :return: A dictionary mapping each command to its latency summary,
+            its byte counts, and its error counts by exception type
+        """
+        with self._lock:
+            commands = set(self.latency) | set(self.errors)
+            latency = dict(self.latency)
+            errors = {key: dict(counts) for key, counts in self.errors.items()}
+
+        return {
+            command: {
+                "latency": latency[command].summary()
+                if command in latency else None,
+                "bytes_out": self.bytes_out[command],
+                "bytes_in": self.bytes_in[command],
+                "errors": errors.get(command, {})
+            } for command in commands
+        }
+
+    def reset(self) -> None:
+        """
+        Forget everything recorded
+        """
+        with self._lock:
+            self.latency.clear()
+            self.bytes_out.clear()
+            self.bytes_in.clear()
+            self.errors.clear()
+
+    def __repr__(self) -> str:
+        return "%s()" % self.__class__.__name__
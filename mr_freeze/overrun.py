@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the policies for what the measurement loop does when an instrument
+has not finished the measurements it was given before more fall due. This
+happens when a measurement takes longer than its sample interval, for
+instance while a serial read is hanging. Without a limit, measurements for
+the instrument pile up in the executor, and the values they return are stale
+by the time they run.
+
+An :class:`OverrunGuard` keeps at most ``max_in_flight`` measurements in the
+executor for each instrument. What happens to measurements that fall due
+while an instrument is at that limit depends on the :class:`OverrunPolicy`.
+"""
+import logging
+from collections import deque
+from concurrent.futures import Future
+from enum import Enum
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, Hashable, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+Launcher = Callable[[Tuple[Any, ...]], Future]
+
+
+class OverrunPolicy(Enum):
+    """
+    What to do with a measurement that falls due while its instrument is
+    busy.
+
+    ``SKIP`` drops the measurement.
+
+    ``COALESCE`` keeps one waiting measurement for the instrument.
+    Measurements that fall due while it waits are merged into it, so that it
+    reads every variable that fell due, once.
+
+    ``QUEUE`` keeps up to ``max_queued`` waiting measurements for the
+    instrument. When the queue is full, the oldest waiting measurement is
+    dropped.
+    """
+    SKIP = 'skip'
+    COALESCE = 'coalesce'
+    QUEUE = 'queue'
+
+
+class OverrunGuard(object):
+    """
+    Limits the measurements in flight for each instrument, and counts the
+    measurements that were skipped or started late because an instrument was
+    busy
+    """
+    def __init__(
+            self,
+            policy: OverrunPolicy=OverrunPolicy.SKIP,
+            max_in_flight: int=1,
+            max_queued: int=1
+    ) -> None:
+        """
+
+        :param policy: What to do with measurements that fall due while
+            their instrument is busy
+        :param max_in_flight: The number of measurements for an instrument
+            that can be in the executor at once
+        :param max_queued: The number of measurements that can wait for an
+            instrument under :attr:`OverrunPolicy.QUEUE`
+        :raises: ``ValueError`` if either limit is less than one
+        """
+        if max_in_flight < 1 or max_queued < 1:
+            raise ValueError(
+                "Overrun limits must be at least 1, not %d and %d" % (
+                    max_in_flight, max_queued
+                )
+            )
+
+        self.policy = policy
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.skipped = 0
+        self.late = 0
+
+        self._in_flight = {}  # type: Dict[Hashable, int]
+        self._waiting = {}  # type: Dict[Hashable, Deque[Tuple[Any, ...]]]
+        self._lock = Lock()
+
+    def offer(
+            self,
+            instrument: Hashable,
+            variables: Sequence[Any],
+            launch: Launcher
+    ) -> None:
+        """
+        Start a measurement if the instrument has room for it, or else deal
+        with it according to the policy
+
+        :param instrument: The instrument to measure
+        :param variables: The variables to read from the instrument
+        :param launch: A function that submits a measurement of the given
+            variables, and returns its future
+        """
+        variables = tuple(variables)
+
+        with self._lock:
+            if self._in_flight.get(instrument, 0) < self.max_in_flight:
+                self._in_flight[instrument] = \
+                    self._in_flight.get(instrument, 0) + 1
+            else:
+                self._hold(instrument, variables)
+                return
+
+        self._launch(instrument, variables, launch)
+
+    def in_flight(self, instrument: Hashable) -> int:
+        """
+
+        :param instrument: An instrument
+        :return: The number of measurements for the instrument that are in
+            the executor
+        """
+        with self._lock:
+            return self._in_flight.get(instrument, 0)
+
+    def waiting(self, instrument: Hashable) -> int:
+        """
+
+        :param instrument: An instrument
+        :return: The number of measurements waiting for the instrument
+        """
+        with self._lock:
+            return len(self._waiting.get(instrument, ()))
+
+    def summary(self) -> Dict[str, int]:
+        """
+
+        :return: The number of measurements that were skipped, and the
+            number that started late
+        """
+        return {"skipped": self.skipped, "late": self.late}
+
+    def _hold(self, instrument: Hashable, variables: Tuple[Any, ...]) -> None:
+        """
+        Deal with a measurement for a busy instrument. Must be called with
+        the lock held.
+
+        :param instrument: The busy instrument
+        :param variables: The variables that fell due
+        """
+        waiting = self._waiting.setdefault(instrument, deque())
+
+        if self.policy == OverrunPolicy.SKIP:
+            self.skipped += 1
+            log.warning("Skipped measurement of %s on busy instrument %r",
+                        variables, instrument)
+        elif self.policy == OverrunPolicy.COALESCE and waiting:
+            waiting[0] = waiting[0] + tuple(
+                variable for variable in variables
+                if variable not in waiting[0]
+            )
+            self.skipped += 1
+        else:
+            maximum = 1 if self.policy == OverrunPolicy.COALESCE \
+                else self.max_queued
+            if len(waiting) >= maximum:
+                waiting.popleft()
+                self.skipped += 1
+                log.warning("Dropped oldest measurement waiting for busy "
+                            "instrument %r", instrument)
+            waiting.append(variables)
+
+    def _launch(
+            self,
+            instrument: Hashable,
+            variables: Tuple[Any, ...],
+            launch: Launcher
+    ) -> None:
+        """
+        Start a measurement, and start the next waiting measurement when it
+        finishes
+
+        :param instrument: The instrument to measure
+        :param variables: The variables to read
+        :param launch: The function that submits the measurement
+        """
+        try:
+            future = launch(variables)
+        except Exception:
+            self._finished(instrument, launch)
+            raise
+
+        future.add_done_callback(
+            lambda _: self._finished(instrument, launch)
+        )
+
+    def _finished(self, instrument: Hashable, launch: Launcher) -> None:
+        """
+        Free the instrument's slot, and hand it to the next waiting
+        measurement if there is one
+
+        :param instrument: The instrument whose measurement finished
+        :param launch: The function that submits a measurement
+        """
+        with self._lock:
+            waiting = self._waiting.get(instrument)
+            if not waiting:
+                self._in_flight[instrument] -= 1
+                return
+            variables = waiting.popleft()
+            self.late += 1
+
+        self._launch(instrument, variables, launch)
+
+    def __repr__(self) -> str:
+        return "%s(policy=%s, max_in_flight=%d, max_queued=%d)" % (
+            self.__class__.__name__, self.policy, self.max_in_flight,
+            self.max_queued
+        )
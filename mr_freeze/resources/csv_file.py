@@ -1,6 +1,8 @@
 # coding=utf-8
 """
-Logs the output to the CSV file
+Logs the output to the CSV file. Each row is built from the sample records
+published since the last row, so that values are stamped with the time at
+which they were read rather than the time at which the row was written
 """
 import csv
 import os
@@ -14,7 +16,9 @@ from mr_freeze.resources.application_state import LiquidNitrogenLevel
 from mr_freeze.resources.application_state import MagneticField
 from mr_freeze.resources.application_state import Current
 from mr_freeze.resources.application_state import LoggingInterval
-import schedule
+from mr_freeze.samples import SampleRecord, SampleStream, Subscription, \
+    samples as _samples
+from mr_freeze.scheduler import Scheduler, scheduler as _scheduler
 
 
 class CurrentDate(Variable):
@@ -27,7 +31,11 @@ class CurrentDate(Variable):
 
 class CSVLogger(object):
     """
-    Logs the output from a store to a CSV file
+    Logs the output from a store to a CSV file. While logging, the logger
+    subscribes to a stream of sample records. Each row holds the newest
+    value of each variable in the records taken since the last row, and is
+    dated with the time at which the newest of them was read. Variables
+    that were not measured in that time are taken from the store.
     """
     VARIABLE_TITLES = {
         CurrentDate: "Date and Time",
@@ -50,31 +58,45 @@ class CSVLogger(object):
     _logger_tag = 'log-values'
 
     def __init__(
-            self, store: Store, path_to_csv_file: str, executor: Executor
+            self,
+            store: Store,
+            path_to_csv_file: str,
+            executor: Executor,
+            samples: SampleStream=_samples
     ) -> None:
         self.store = store
         self.path = path_to_csv_file
         self.executor = executor
+        self.samples = samples
 
         self._is_running = False
+        self._subscription = None  # type: Optional[Subscription]
 
         self._add_change_listener_to_store(self.store)
 
-    def start_logging(self, scheduler=schedule) -> None:
+    def start_logging(self, scheduler: Scheduler=_scheduler) -> None:
         """
-        Start the logger
+        Start the logger. The values are written on the executor, so that
+        writing the file does not hold up the scheduler.
         """
-        scheduler.every(self._logging_interval).minutes.do(
-            self.write_values
-        ).tag(self._logger_tag)
+        if self._subscription is None:
+            self._subscription = self.samples.subscribe()
+        scheduler.every(
+            float(self._logging_interval) * 60,
+            self.executor.submit, self.write_values,
+            tag=self._logger_tag
+        )
         self._is_running = True
 
-    def stop_logging(self, scheduler=schedule) -> None:
+    def stop_logging(self, scheduler: Scheduler=_scheduler) -> None:
         """
         Stop the logger
         """
         scheduler.clear(self._logger_tag)
         self._is_running = False
+        if self._subscription is not None:
+            self._subscription.close()
+            self._subscription = None
 
     def write_titles(self) -> None:
         """
@@ -122,12 +144,15 @@ class CSVLogger(object):
         }
 
     @property
-    def _date(self) -> CurrentDate:
+    def _record(self) -> SampleRecord:
         """
 
-        :return: The current date
+        :return: The newest readings from the records published since the
+            last row was written
         """
-        return CurrentDate(self.executor)
+        if self._subscription is None:
+            return SampleRecord()
+        return SampleRecord.merge(self._subscription.take())
 
     @property
     def _variables(self) -> Dict[Variable, Optional[Any]]:
@@ -136,7 +161,15 @@ class CSVLogger(object):
         :return: The values to be written
         """
         variables = self._values_from_store
-        variables[CurrentDate] = self._date.value
+        record = self._record
+        for reading in record.readings:
+            if reading.ok and reading.variable in variables:
+                variables[reading.variable] = reading.value
+
+        if record.wall_clock is None:
+            variables[CurrentDate] = datetime.now().isoformat()
+        else:
+            variables[CurrentDate] = record.wall_clock.isoformat()
         return variables
 
     @property
@@ -147,10 +180,10 @@ class CSVLogger(object):
         the value of the variables. This will be written via the CSV dict
         writer to the CSV file
         """
+        variables = self._variables
         return {
-            self.VARIABLE_TITLES[key]:
-                self._process_value(self._variables[key])
-            for key in self._variables.keys()
+            self.VARIABLE_TITLES[key]: self._process_value(value)
+            for key, value in variables.items()
         }
 
     @staticmethod
@@ -170,7 +203,9 @@ class CSVLogger(object):
     def _add_change_listener_to_store(self, store: Store) -> None:
         store[LoggingInterval].listeners.add(self._on_interval_change)
 
-    def _on_interval_change(self, *_, scheduler=schedule) -> None:
+    def _on_interval_change(
+            self, *_, scheduler: Scheduler=_scheduler
+    ) -> None:
         if self._is_running:
             self.stop_logging(scheduler=scheduler)
             self.start_logging(scheduler=scheduler)
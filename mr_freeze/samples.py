@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the records that measurements produce. Each reading of a variable
+is a :class:`Reading`, stamped with the time at which it was acquired. The
+readings from one measurement are gathered into a :class:`SampleRecord`.
+Neither can be changed once made, so that a record can be handed to any
+number of consumers.
+
+Records are published on a :class:`SampleStream`. Consumers subscribe to
+the stream, and take the records that arrived since they last looked in
+batches, instead of polling the store.
+"""
+import logging
+from collections import deque, namedtuple
+from concurrent.futures import Future
+from datetime import datetime
+from itertools import chain
+from threading import Condition, Lock
+from time import monotonic
+from typing import Any, Deque, Hashable, Iterable, List, Optional, \
+    Sequence, Set, Tuple, Type
+
+log = logging.getLogger(__name__)
+
+
+class Reading(namedtuple(
+    'Reading',
+    ('variable', 'value', 'monotonic', 'wall_clock', 'error', 'source')
+)):
+    """
+    The value of one variable, with the time at which it was acquired on
+    both the monotonic clock and the wall clock. If the read failed,
+    ``value`` is ``None`` and ``error`` describes the failure. ``source``
+    is the key of the instrument that made the reading, as given by
+    :func:`mr_freeze.executors.instrument_key`, or ``None`` if it is not
+    known
+    """
+    __slots__ = ()
+
+    @classmethod
+    def now(
+            cls, variable: Type, value: Any, source: Optional[Hashable]=None
+    ) -> 'Reading':
+        """
+
+        :param variable: The variable that was read
+        :param value: The value that was read
+        :param source: The key of the instrument that read the value
+        :return: A reading of the value, acquired now
+        """
+        return cls(variable, value, monotonic(), datetime.now(), None, source)
+
+    @classmethod
+    def failed(
+            cls,
+            variable: Type,
+            error: BaseException,
+            source: Optional[Hashable]=None
+    ) -> 'Reading':
+        """
+
+        :param variable: The variable that could not be read
+        :param error: The reason that it could not be read
+        :param source: The key of the instrument that could not read it
+        :return: A reading recording the failure, made now
+        """
+        return cls(
+            variable, None, monotonic(), datetime.now(), repr(error), source
+        )
+
+    @property
+    def ok(self) -> bool:
+        """
+
+        :return: ``True`` if the variable was read
+        """
+        return self.error is None
+
+
+Reading.__new__.__defaults__ = (None,)
+
+
+class SampleRecord(namedtuple('SampleRecord', ('readings',))):
+    """
+    The readings made by one measurement. A variable has at most one
+    reading in a record
+    """
+    __slots__ = ()
+
+    def __new__(cls, readings: Iterable[Reading]=()) -> 'SampleRecord':
+        latest = {}
+        for reading in readings:
+            latest[reading.variable] = reading
+        return super(SampleRecord, cls).__new__(cls, tuple(latest.values()))
+
+    @classmethod
+    def merge(cls, records: Iterable['SampleRecord']) -> 'SampleRecord':
+        """
+
+        :param records: Records, oldest first
+        :return: A record with the newest reading of each variable in the
+            records
+        """
+        return cls(chain.from_iterable(record.readings for record in records))
+
+    @property
+    def variables(self) -> Tuple[Type, ...]:
+        """
+
+        :return: The variables read in this record
+        """
+        return tuple(reading.variable for reading in self.readings)
+
+    def reading(self, variable: Type) -> Optional[Reading]:
+        """
+
+        :param variable: A variable
+        :return: The variable's reading, or ``None`` if it was not read
+        """
+        for reading in self.readings:
+            if reading.variable is variable:
+                return reading
+        return None
+
+    def value(self, variable: Type, default: Any=None) -> Any:
+        """
+
+        :param variable: A variable
+        :param default: The value to return if the variable was not read,
+            or could not be read
+        :return: The variable's value
+        """
+        reading = self.reading(variable)
+        return default if reading is None or not reading.ok \
+            else reading.value
+
+    @property
+    def errors(self) -> Tuple[Reading, ...]:
+        """
+
+        :return: The readings that failed
+        """
+        return tuple(reading for reading in self.readings if not reading.ok)
+
+    @property
+    def monotonic(self) -> Optional[float]:
+        """
+
+        :return: The time on the monotonic clock at which the last reading
+            was made, or ``None`` if the record is empty
+        """
+        return max(
+            (reading.monotonic for reading in self.readings), default=None
+        )
+
+    @property
+    def wall_clock(self) -> Optional[datetime]:
+        """
+
+        :return: The time on the wall clock at which the last reading was
+            made, or ``None`` if the record is empty
+        """
+        return max(
+            (reading.wall_clock for reading in self.readings), default=None
+        )
+
+
+def collect(parts: Sequence[Tuple[Sequence[Type], Future]]) -> Future:
+    """
+    Gather the readings of several tasks into one record
+
+    :param parts: The variables that each task reads, and the future of
+        the task, whose result is a sequence of :class:`Reading`
+    :return: A future that finishes with the record once every task has
+        finished. If a task fails, each of its variables has a failed
+        reading in the record
+    """
+    record = Future()  # type: Future
+    readings = [()] * len(parts)  # type: List[Sequence[Reading]]
+    remaining = [len(parts)]
+    lock = Lock()
+
+    def finished(index: int, variables: Sequence[Type], future: Future):
+        try:
+            result = tuple(future.result())
+        except BaseException as error:
+            result = tuple(Reading.failed(variable, error)
+                           for variable in variables)
+
+        with lock:
+            readings[index] = result
+            remaining[0] -= 1
+            if remaining[0]:
+                return
+        record.set_result(SampleRecord(chain.from_iterable(readings)))
+
+    if not parts:
+        record.set_result(SampleRecord())
+
+    for index, (variables, future) in enumerate(parts):
+        future.add_done_callback(
+            lambda done, index=index, variables=variables:
+                finished(index, variables, done)
+        )
+
+    return record
+
+
+class Subscription(object):
+    """
+    Holds the records published on a stream since they were last taken.
+    If the consumer falls behind by more than ``maxlen`` records, the oldest
+    are dropped and counted in ``dropped``
+    """
+    def __init__(self, stream: 'SampleStream', maxlen: int=1000) -> None:
+        """
+
+        :param stream: The stream to which this subscription belongs
+        :param maxlen: The number of records to hold
+        """
+        self.stream = stream
+        self.dropped = 0
+        self._records = deque(maxlen=maxlen)  # type: Deque[SampleRecord]
+        self._condition = Condition()
+
+    def put(self, record: SampleRecord) -> None:
+        """
+
+        :param record: The record to hold until it is taken
+        """
+        with self._condition:
+            if len(self._records) == self._records.maxlen:
+                self.dropped += 1
+            self._records.append(record)
+            self._condition.notify_all()
+
+    def take(
+            self,
+            max_records: Optional[int]=None,
+            timeout: Optional[float]=0
+    ) -> List[SampleRecord]:
+        """
+
+        :param max_records: The most records to take, or ``None`` to take
+            all of them
+        :param timeout: How long in seconds to wait for a record if there
+            are none. ``None`` waits until one is published
+        :return: The oldest records held, oldest first
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._records, timeout)
+            count = len(self._records) if max_records is None else \
+                min(max_records, len(self._records))
+            return [self._records.popleft() for _ in range(count)]
+
+    def close(self) -> None:
+        """
+        Stop receiving records from the stream
+        """
+        self.stream.unsubscribe(self)
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._records)
+
+
+class SampleStream(object):
+    """
+    Hands each published record to every subscription
+    """
+    def __init__(self) -> None:
+        self._subscriptions = set()  # type: Set[Subscription]
+        self._lock = Lock()
+
+    def subscribe(self, maxlen: int=1000) -> Subscription:
+        """
+
+        :param maxlen: The number of records the subscription holds
+        :return: A subscription that receives every record published from
+            now on
+        """
+        subscription = Subscription(self, maxlen)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+
+        :param subscription: The subscription to stop
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, record: SampleRecord) -> None:
+        """
+
+        :param record: The record to hand to the subscribers
+        """
+        with self._lock:
+            subscriptions = tuple(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(record)
+
+    def publish_when_done(self, record: Future) -> None:
+        """
+
+        :param record: The future of a record, which is published when it
+            finishes
+        """
+        def publish(future: Future) -> None:
+            try:
+                self.publish(future.result())
+            except Exception as error:
+                log.error("Could not publish sample record: %r", error)
+
+        record.add_done_callback(publish)
+
+
+samples = SampleStream()
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a scheduler for running jobs at a fixed interval. Each job is kept
+as a timer on a :class:`TimerQueue`, so the scheduler sleeps until the next
+job is due instead of polling for due jobs.
+
+A job's runs are due at whole multiples of its interval after it was
+scheduled. The next run is worked out from when the last run was due, and
+not from when it actually ran, so late runs do not push later runs back and
+the schedule does not drift. If a job falls more than a whole interval
+behind, the runs that were missed are skipped and counted.
+
+How late each run starts is recorded in a :class:`LatencyHistogram` on its
+job.
+"""
+import logging
+import math
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from mr_freeze.metrics import LatencyHistogram
+from mr_freeze.timers import Timer, TimerQueue
+
+log = logging.getLogger(__name__)
+
+
+class ScheduledJob(object):
+    """
+    A function that runs every ``interval`` seconds
+    """
+    def __init__(
+            self,
+            interval: float,
+            callback: Callable[..., Any],
+            args: tuple,
+            tag: Optional[Hashable],
+            first_run: float
+    ) -> None:
+        """
+
+        :param interval: The time in seconds between runs
+        :param callback: The function to run
+        :param args: The arguments to pass to the function
+        :param tag: A tag by which the job can be cleared
+        :param first_run: The time at which the job first runs, on the
+            clock of the scheduler
+        """
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.tag = tag
+        self.next_run = first_run
+        self.runs = 0
+        self.skipped = 0
+        self.lateness = LatencyHistogram()
+        self.cancelled = False
+
+        self._timer = None  # type: Optional[Timer]
+
+    def cancel(self) -> None:
+        """
+        Stop the job from running again
+        """
+        self.cancelled = True
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def __repr__(self) -> str:
+        return "%s(interval=%s, callback=%r, tag=%r)" % (
+            self.__class__.__name__, self.interval, self.callback, self.tag
+        )
+
+
+class Scheduler(object):
+    """
+    Runs jobs at fixed intervals. Jobs run on the thread of the timer
+    queue, so a job that takes a long time holds up every other job. Jobs
+    should hand any long-running work to an executor.
+    """
+    def __init__(self, timers: Optional[TimerQueue]=None) -> None:
+        """
+
+        :param timers: The timer queue on which jobs are kept. By default,
+            the scheduler has a queue of its own
+        """
+        self.timers = TimerQueue() if timers is None else timers
+        self._jobs = []  # type: List[ScheduledJob]
+        self._lock = Lock()
+
+    def every(
+            self,
+            interval: float,
+            callback: Callable[..., Any],
+            *args,
+            tag: Optional[Hashable]=None
+    ) -> ScheduledJob:
+        """
+        Run a function every ``interval`` seconds, starting one interval
+        from now
+
+        :param interval: The time in seconds between runs
+        :param callback: The function to run
+        :param args: The arguments to pass to the function
+        :param tag: A tag by which the job can be cleared
+        :return: The job
+        :raises: ``ValueError`` if the interval is not positive
+        """
+        if interval <= 0:
+            raise ValueError(
+                "Cannot schedule a job every %s seconds" % interval
+            )
+
+        job = ScheduledJob(
+            interval, callback, args, tag, self.timers.clock() + interval
+        )
+
+        with self._lock:
+            self._jobs.append(job)
+            job._timer = self.timers.call_at(job.next_run, self._run, job)
+
+        return job
+
+    def clear(self, tag: Optional[Hashable]=None) -> None:
+        """
+
+        :param tag: The tag of the jobs to cancel. If ``None``, all jobs are
+            cancelled
+        """
+        with self._lock:
+            cleared = [
+                job for job in self._jobs if tag is None or job.tag == tag
+            ]
+            for job in cleared:
+                job.cancel()
+                self._jobs.remove(job)
+
+    @property
+    def jobs(self) -> List[ScheduledJob]:
+        """
+
+        :return: The jobs that are scheduled
+        """
+        with self._lock:
+            return list(self._jobs)
+
+    def lateness(self) -> Dict[str, Dict[str, Any]]:
+        """
+
+        :return: A summary of how late each job has started, keyed by the
+            job's tag, or by the job itself if it has no tag
+        """
+        return {
+            str(job.tag if job.tag is not None else job): dict(
+                job.lateness.summary(), skipped=job.skipped
+            ) for job in self.jobs
+        }
+
+    def stop(self) -> None:
+        """
+        Cancel all jobs, and stop the timer queue
+        """
+        self.clear()
+        self.timers.stop()
+
+    def _run(self, job: ScheduledJob) -> None:
+        """
+        Run a job, and schedule its next run
+
+        :param job: The job that is due
+        """
+        if job.cancelled:
+            return
+
+        job.lateness.record(self.timers.clock() - job.next_run)
+        job.runs += 1
+
+        try:
+            job.callback(*job.args)
+        except Exception:
+            log.exception("Scheduled job %r raised an error", job)
+
+        due = job.next_run + job.interval
+        missed = math.floor((self.timers.clock() - due) / job.interval)
+        if missed > 0:
+            log.warning("Job %r skipped %d runs", job, missed)
+            job.skipped += missed
+            due += missed * job.interval
+
+        with self._lock:
+            if job.cancelled:
+                return
+            job.next_run = due
+            job._timer = self.timers.call_at(due, self._run, job)
+
+    def __repr__(self) -> str:
+        return "%s(jobs=%d)" % (self.__class__.__name__, len(self.jobs))
+
+
+scheduler = Scheduler()
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Contains simulators for the instruments in the cryostat rack. Each simulator
+serves its instrument's protocol over a Linux pseudo-terminal, so the
+device adapters can be pointed at the simulator's ``port_name`` exactly as
+they would be pointed at a serial port. The simulators can be started from
+the command line with
+
+.. code-block:: bash
+
+    python -m mr_freeze.simulators
+"""
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Starts a simulator for each instrument in the rack, and prints the command
+line that points the application at them. The simulators run until the
+process is interrupted.
+"""
+import argparse
+import logging
+from time import sleep
+
+from mr_freeze.simulators.cryomagnetics import Cryomagnetics4GSimulator, \
+    CryomagneticsLM510Simulator
+from mr_freeze.simulators.lakeshore_475 import Lakeshore475Simulator
+
+log = logging.getLogger(__name__)
+
+parser = argparse.ArgumentParser(
+    description="Simulate the instrument rack over pseudo-terminals"
+)
+
+parser.add_argument(
+    '--per-byte-latency', type=float, default=0.0,
+    help="The time in seconds taken to send each byte of a reply"
+)
+
+parser.add_argument(
+    '--per-command-latency', type=float, default=0.0,
+    help="The time in seconds taken to start replying to a command"
+)
+
+parser.add_argument(
+    '--fault-probability', type=float, default=0.0,
+    help="The probability that a reply is dropped, truncated or garbled"
+)
+
+parser.add_argument(
+    '--helium-measurement-time', type=float, default=0.0,
+    help="The time in seconds taken to measure the liquid helium level"
+)
+
+parser.add_argument(
+    '--seed', type=int, default=None,
+    help="The seed for the random number generator that injects faults"
+)
+
+
+def main() -> None:
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    simulator_arguments = dict(
+        per_byte_latency=arguments.per_byte_latency,
+        per_command_latency=arguments.per_command_latency,
+        fault_probability=arguments.fault_probability,
+        seed=arguments.seed
+    )
+
+    power_supply = Cryomagnetics4GSimulator(**simulator_arguments)
+    level_meter = CryomagneticsLM510Simulator(
+        helium_measurement_time=arguments.helium_measurement_time,
+        **simulator_arguments
+    )
+    gaussmeter = Lakeshore475Simulator(
+        field_source=lambda: power_supply.field, **simulator_arguments
+    )
+    simulators = (power_supply, level_meter, gaussmeter)
+
+    for simulator in simulators:
+        simulator.start()
+
+    print(
+        "python -m mr_freeze --power-supply-address %s "
+        "--ln2-gauge-address %s --gaussmeter-address %s" % (
+            power_supply.port_name, level_meter.port_name,
+            gaussmeter.port_name
+        )
+    )
+
+    try:
+        while True:
+            sleep(1)
+    except KeyboardInterrupt:
+        log.info("Stopping simulators")
+    finally:
+        for simulator in simulators:
+            simulator.stop()
+
+
+if __name__ == "__main__":
+    main()
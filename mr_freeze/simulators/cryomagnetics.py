@@ -0,0 +1,323 @@
+# -*- coding: utf-8 -*-
+"""
+Contains simulators for the Cryomagnetics 4G power supply and the
+Cryomagnetics LM510 level meter. Both instruments echo every command back,
+ended by ``\\r\\n``. Queries, which are the commands containing a ``?``, are
+answered with a second line after the echo.
+"""
+import logging
+from threading import Lock
+from time import monotonic, sleep
+from typing import Callable, Dict, Optional
+
+from mr_freeze.simulators.pseudo_terminal import PseudoTerminalSimulator
+
+log = logging.getLogger(__name__)
+
+
+class CryomagneticsSimulator(PseudoTerminalSimulator):
+    """
+    Serves the Cryomagnetics echo protocol. Each command is looked up by its
+    first word in ``handlers``, which maps to a function that takes the
+    arguments of the command, and returns the answer to a query or ``None``
+    """
+    FRAME_TERMINATOR = "\r\n"
+
+    @property
+    def handlers(self) -> Dict[str, Callable[..., Optional[str]]]:
+        """
+
+        :return: A dictionary mapping the first word of each command
+            understood by the instrument to the function that carries it out
+        """
+        return {}
+
+    def respond(self, command: str) -> str:
+        """
+
+        :param command: The command received
+        :return: The echo of the command, followed by the answer if the
+            command was a query
+        """
+        words = command.strip().split()
+        handler = self.handlers.get(words[0].upper()) if words else None
+
+        if handler is None:
+            log.warning("Simulator %r received unknown command %s",
+                        self, repr(command))
+            answer = None
+        else:
+            try:
+                answer = handler(*words[1:])
+            except (TypeError, ValueError):
+                log.warning("Simulator %r received malformed command %s",
+                            self, repr(command))
+                answer = None
+
+        reply = command + self.FRAME_TERMINATOR
+        if answer is not None and '?' in command:
+            reply += answer + self.FRAME_TERMINATOR
+        return reply
+
+
+class Cryomagnetics4GSimulator(CryomagneticsSimulator):
+    """
+    Simulates a Cryomagnetics 4G power supply driving a magnet. The output
+    current ramps towards the upper limit, the lower limit, or zero at
+    ``sweep_rate`` amperes per second, or ten times as fast for a ``FAST``
+    sweep. Limits are always expressed in amperes, while the output current
+    is reported in the selected unit.
+    """
+    FAST_SWEEP_FACTOR = 10.0
+
+    def __init__(
+            self,
+            sweep_rate: float=0.1,
+            gauss_per_amp: float=1000.0,
+            clock: Callable[[], float]=monotonic,
+            **kwargs
+    ) -> None:
+        """
+
+        :param sweep_rate: The rate at which the current changes during a
+            sweep, in amperes per second
+        :param gauss_per_amp: The field produced by the magnet per ampere of
+            current
+        :param clock: The clock that drives the current ramp. This should
+            only be overwritten during testing
+        :param kwargs: The latency and fault arguments of
+            :class:`PseudoTerminalSimulator`
+        """
+        super().__init__(**kwargs)
+        self.sweep_rate = sweep_rate
+        self.gauss_per_amp = gauss_per_amp
+        self.upper_limit = 0.0
+        self.lower_limit = 0.0
+        self.unit = "A"
+        self.remote = False
+        self.persistent_heater_on = True
+
+        self._clock = clock
+        self._current = 0.0
+        self._target = None  # type: Optional[float]
+        self._rate = 0.0
+        self._updated_at = clock()
+        self._ramp_lock = Lock()
+
+    @property
+    def handlers(self) -> Dict[str, Callable[..., Optional[str]]]:
+        return {
+            "*IDN?": lambda: "Cryomagnetics,4G,Simulator,1.0",
+            "IOUT?": self._output_current,
+            "ULIM?": lambda: "%.4fA" % self.upper_limit,
+            "LLIM?": lambda: "%.4fA" % self.lower_limit,
+            "ULIM": self._set_upper_limit,
+            "LLIM": self._set_lower_limit,
+            "UNITS?": lambda: self.unit,
+            "UNITS": self._set_unit,
+            "PSHTR?": lambda: "1" if self.persistent_heater_on else "0",
+            "REMOTE": self._set_remote,
+            "LOCAL": self._set_local,
+            "SWEEP": self._sweep,
+            "SWEEP?": self._sweep_mode
+        }
+
+    @property
+    def current(self) -> float:
+        """
+
+        :return: The output current in amperes
+        """
+        with self._ramp_lock:
+            self._advance()
+            return self._current
+
+    @property
+    def field(self) -> float:
+        """
+
+        :return: The field produced by the magnet, in gauss
+        """
+        return self.current * self.gauss_per_amp
+
+    def _advance(self) -> None:
+        """
+        Move the current along its ramp up to the present time
+        """
+        now = self._clock()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+
+        if self._target is None:
+            return
+
+        step = self._rate * elapsed
+        if abs(self._target - self._current) <= step:
+            self._current = self._target
+        elif self._target > self._current:
+            self._current += step
+        else:
+            self._current -= step
+
+    def _output_current(self) -> str:
+        current = self.current
+        if self.unit == "G":
+            return "%.4fG" % (current * self.gauss_per_amp)
+        return "%.4fA" % current
+
+    def _set_upper_limit(self, value: str) -> None:
+        self.upper_limit = float(value.rstrip("A"))
+
+    def _set_lower_limit(self, value: str) -> None:
+        self.lower_limit = float(value.rstrip("A"))
+
+    def _set_unit(self, unit: str) -> None:
+        if unit in ("A", "G"):
+            self.unit = unit
+
+    def _set_remote(self) -> None:
+        self.remote = True
+
+    def _set_local(self) -> None:
+        self.remote = False
+
+    def _sweep(self, direction: str, speed: str="") -> None:
+        """
+        Start or pause a sweep
+
+        :param direction: ``UP``, ``DOWN``, ``ZERO`` or ``PAUSE``
+        :param speed: ``FAST`` for a fast sweep
+        """
+        targets = {
+            "UP": self.upper_limit,
+            "DOWN": self.lower_limit,
+            "ZERO": 0.0,
+            "PAUSE": None
+        }
+
+        with self._ramp_lock:
+            self._advance()
+            self._target = targets.get(direction.upper())
+            self._rate = self.sweep_rate * (
+                self.FAST_SWEEP_FACTOR if speed.upper() == "FAST" else 1.0
+            )
+
+    def _sweep_mode(self) -> str:
+        with self._ramp_lock:
+            self._advance()
+            if self._target is None:
+                return "Pause"
+            elif self._target == self._current:
+                return "Standby"
+            elif self._target > self._current:
+                return "Sweep Up"
+            else:
+                return "Sweep Down"
+
+
+class CryomagneticsLM510Simulator(CryomagneticsSimulator):
+    """
+    Simulates a Cryomagnetics LM510 level meter with a liquid helium
+    gauge on channel 1 and a liquid nitrogen gauge on channel 2. Helium
+    measurements are slow. The echo of ``MEAS 1`` is only sent once the
+    measurement has finished, ``helium_measurement_time`` seconds later.
+    The nitrogen gauge is read continuously, so its data is always ready.
+    Helium boils off by ``helium_boil_off`` centimetres with each helium
+    measurement.
+    """
+    DATA_READY_BITS = {
+        1: 1,
+        2: 4
+    }
+
+    def __init__(
+            self,
+            helium_level: float=80.0,
+            nitrogen_level: float=30.0,
+            helium_measurement_time: float=0.0,
+            helium_boil_off: float=0.01,
+            **kwargs
+    ) -> None:
+        """
+
+        :param helium_level: The initial liquid helium level, in centimetres
+        :param nitrogen_level: The liquid nitrogen level, in centimetres
+        :param helium_measurement_time: The time taken to measure the liquid
+            helium level, in seconds
+        :param helium_boil_off: The drop in helium level caused by each
+            helium measurement, in centimetres
+        :param kwargs: The latency and fault arguments of
+            :class:`PseudoTerminalSimulator`
+        """
+        super().__init__(**kwargs)
+        self.levels = {1: helium_level, 2: nitrogen_level}
+        self.helium_measurement_time = helium_measurement_time
+        self.helium_boil_off = helium_boil_off
+        self.channel = 1
+
+        self._measured_levels = {1: helium_level, 2: nitrogen_level}
+        self._data_ready = {1: False, 2: True}
+
+    @property
+    def handlers(self) -> Dict[str, Callable[..., Optional[str]]]:
+        return {
+            "*IDN?": lambda: "Cryomagnetics,LM-510,Simulator,1.0",
+            "*STB?": lambda: str(self.status_byte),
+            "*RST": self._reset,
+            "CHAN?": lambda: str(self.channel),
+            "CHAN": self._set_channel,
+            "MEAS": self._measure,
+            "MEAS?": self._measurement
+        }
+
+    @property
+    def status_byte(self) -> int:
+        """
+
+        :return: The status byte, with the data ready bit set for each
+            channel that has data ready
+        """
+        return sum(
+            bit for channel, bit in self.DATA_READY_BITS.items()
+            if self._data_ready[channel]
+        )
+
+    def _reset(self) -> None:
+        self.channel = 1
+        self._data_ready[1] = False
+
+    def _set_channel(self, channel: str) -> None:
+        self.channel = int(channel)
+
+    def _measure(self, channel: Optional[str]=None) -> None:
+        """
+        Carry out a measurement. Helium measurements hold up the reply
+        until they have finished.
+
+        :param channel: The channel to measure. Defaults to the selected
+            channel
+        """
+        channel_number = int(channel) if channel else self.channel
+
+        if channel_number == 1:
+            self._data_ready[1] = False
+            if self.helium_measurement_time:
+                sleep(self.helium_measurement_time)
+            self.levels[1] = max(self.levels[1] - self.helium_boil_off, 0.0)
+
+        self._measured_levels[channel_number] = self.levels[channel_number]
+        self._data_ready[channel_number] = True
+
+    def _measurement(self, channel: Optional[str]=None) -> str:
+        """
+
+        :param channel: The channel whose last measurement is required.
+            Defaults to the selected channel
+        :return: The last measured level on the channel
+        """
+        channel_number = int(channel) if channel else self.channel
+
+        if channel_number == 2:
+            self._measured_levels[2] = self.levels[2]
+
+        return "%.1f cm" % self._measured_levels[channel_number]
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a simulator for a Lakeshore 475 gaussmeter that is attached through
+a Galvant Industries GPIB-USB adapter. Lines starting with ``+`` are
+commands for the adapter. All other lines are passed on to the instrument
+at the address last selected with ``+a:``.
+"""
+import logging
+from typing import Callable, Optional
+
+from mr_freeze.simulators.pseudo_terminal import PseudoTerminalSimulator
+
+log = logging.getLogger(__name__)
+
+
+class Lakeshore475Simulator(PseudoTerminalSimulator):
+    """
+    Simulates a Lakeshore 475 gaussmeter behind a GPIB-USB adapter. The
+    gaussmeter always reports its field in gauss. The field is read from
+    ``field_source`` if one is given, so that the gaussmeter can follow the
+    magnet driven by a :class:`Cryomagnetics4GSimulator`. Otherwise, the
+    field is the constant ``field``. Gaussian noise with a standard
+    deviation of ``noise`` gauss is added to each reading.
+    """
+    TERMINATOR = "\r"
+    ADAPTER_VERSION = 4
+    UNIT_CODES = {"gauss": 1, "tesla": 2, "oersted": 3, "amp_per_meter": 4}
+
+    def __init__(
+            self,
+            gpib_address: int=12,
+            field: float=0.0,
+            field_source: Optional[Callable[[], float]]=None,
+            noise: float=0.0,
+            **kwargs
+    ) -> None:
+        """
+
+        :param gpib_address: The GPIB address of the gaussmeter
+        :param field: The field to report if there is no field source, in
+            gauss
+        :param field_source: A function that takes no arguments, and returns
+            the field in gauss
+        :param noise: The standard deviation of the noise on each reading,
+            in gauss
+        :param kwargs: The latency and fault arguments of
+            :class:`PseudoTerminalSimulator`
+        """
+        super().__init__(**kwargs)
+        self.gpib_address = gpib_address
+        self.field = field
+        self.field_source = field_source
+        self.noise = noise
+        self.selected_address = None  # type: Optional[int]
+
+        self._pending_reply = ""
+
+    def respond(self, command: str) -> str:
+        """
+
+        :param command: A command for the adapter or the instrument
+        :return: The reply sent back through the adapter
+        """
+        command = command.strip()
+
+        if command.startswith("+"):
+            return self._respond_as_adapter(command)
+
+        if self.selected_address != self.gpib_address:
+            log.debug("Simulator %r ignoring %s for address %s",
+                      self, repr(command), self.selected_address)
+            return ""
+
+        answer = self._respond_as_instrument(command)
+
+        if answer is None:
+            return ""
+        elif '?' in command:
+            return answer + self.TERMINATOR
+
+        self._pending_reply = answer + self.TERMINATOR
+        return ""
+
+    def _respond_as_adapter(self, command: str) -> str:
+        """
+
+        :param command: A command for the GPIB-USB adapter
+        :return: The reply of the adapter
+        """
+        if command == "+ver":
+            return "%d%s" % (self.ADAPTER_VERSION, self.TERMINATOR)
+        elif command.startswith("+a:"):
+            self.selected_address = int(command[3:])
+        elif command == "+read":
+            reply, self._pending_reply = self._pending_reply, ""
+            return reply
+
+        return ""
+
+    def _respond_as_instrument(self, command: str) -> Optional[str]:
+        """
+
+        :param command: A command for the gaussmeter
+        :return: The gaussmeter's answer, or ``None``
+        """
+        if command == "*IDN?":
+            return "LSCI,MODEL475,Simulator,1.0"
+        elif command == "UNIT?":
+            return str(self.UNIT_CODES["gauss"])
+        elif command == "RDGFIELD?":
+            return "%.4f" % self._read_field()
+
+        log.warning("Simulator %r received unknown command %s",
+                    self, repr(command))
+        return None
+
+    def _read_field(self) -> float:
+        """
+
+        :return: A field reading, in gauss
+        """
+        field = self.field_source() if self.field_source is not None \
+            else self.field
+
+        if self.noise:
+            field += self._random.gauss(0.0, self.noise)
+
+        return field
@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the base class for simulators that serve an instrument's protocol
+over a pseudo-terminal
+"""
+import abc
+import logging
+import os
+import select
+import tty
+from collections import deque
+from enum import Enum
+from random import Random
+from threading import Thread, Event, Lock
+from time import sleep
+from typing import Deque, Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+
+class Fault(Enum):
+    """
+    The faults that a simulator can inject into its replies
+    """
+    DROP = "DROP"
+    GARBLE = "GARBLE"
+    TRUNCATE = "TRUNCATE"
+
+
+class PseudoTerminalSimulator(Thread, metaclass=abc.ABCMeta):
+    """
+    Opens a pseudo-terminal, and answers every command written to it. A
+    command is a line of text ended by ``\\r`` or ``\\n``. The reply to each
+    command is produced by :meth:`respond`.
+
+    Latency is simulated by waiting ``per_command_latency`` seconds before
+    replying to a command, and ``per_byte_latency`` seconds before sending
+    each byte of the reply. A fault from ``faults`` is injected into a reply
+    with probability ``fault_probability``. Faults can also be queued for
+    the next replies with :meth:`inject_fault`.
+    """
+    COMMAND_TERMINATORS = b"\r\n"
+
+    _poll_interval = 0.05
+
+    def __init__(
+            self,
+            per_byte_latency: float=0.0,
+            per_command_latency: float=0.0,
+            fault_probability: float=0.0,
+            faults: Iterable[Fault]=tuple(Fault),
+            seed: Optional[int]=None
+    ) -> None:
+        """
+
+        :param per_byte_latency: The time in seconds taken to send each byte
+            of a reply
+        :param per_command_latency: The time in seconds taken to start
+            replying to a command
+        :param fault_probability: The probability that a reply has a fault
+        :param faults: The faults to choose from when injecting a fault at
+            random
+        :param seed: The seed for the random number generator that injects
+            faults, so that runs can be repeated
+        """
+        super().__init__(daemon=True)
+        self.per_byte_latency = per_byte_latency
+        self.per_command_latency = per_command_latency
+        self.fault_probability = fault_probability
+        self.faults = tuple(faults)
+        self.commands_received = 0
+
+        self._random = Random(seed)
+        self._queued_faults = deque()  # type: Deque[Fault]
+        self._lock = Lock()
+        self._stopped = Event()
+
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self._port_name = os.ttyname(self._slave)
+
+    @property
+    def port_name(self) -> str:
+        """
+
+        :return: The name of the pseudo-terminal to which adapters should
+            connect
+        """
+        return self._port_name
+
+    @abc.abstractmethod
+    def respond(self, command: str) -> str:
+        """
+
+        :param command: The command received, without its terminator
+        :return: The reply to send. An empty string means that nothing is
+            sent
+        """
+        raise NotImplementedError()
+
+    def inject_fault(self, fault: Fault, count: int=1) -> None:
+        """
+        Inject a fault into each of the next replies
+
+        :param fault: The fault to inject
+        :param count: The number of replies into which the fault is injected
+        """
+        with self._lock:
+            self._queued_faults.extend([fault] * count)
+
+    def run(self) -> None:
+        """
+        Read commands from the pseudo-terminal and answer them until the
+        simulator is stopped
+        """
+        log.info("Simulator %r listening on %s", self, self.port_name)
+        buffer = b""
+
+        while not self._stopped.is_set():
+            readable, _, _ = select.select(
+                [self._master], [], [], self._poll_interval
+            )
+            if not readable:
+                continue
+
+            try:
+                buffer += os.read(self._master, 1024)
+            except OSError:
+                break
+
+            buffer = self._handle_commands(buffer)
+
+    def stop(self) -> None:
+        """
+        Stop answering commands, and close the pseudo-terminal
+        """
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+        for descriptor in (self._master, self._slave):
+            try:
+                os.close(descriptor)
+            except OSError:
+                pass
+
+    def __enter__(self) -> 'PseudoTerminalSimulator':
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
+
+    def _handle_commands(self, buffer: bytes) -> bytes:
+        """
+        Answer each complete command in the buffer
+
+        :param buffer: The bytes read from the pseudo-terminal
+        :return: The bytes left over after the last complete command
+        """
+        while True:
+            end = min(
+                (index for index in (
+                    buffer.find(bytes([terminator]))
+                    for terminator in self.COMMAND_TERMINATORS
+                ) if index >= 0),
+                default=-1
+            )
+            if end < 0:
+                return buffer
+
+            command = buffer[:end].decode('utf-8', errors='replace')
+            buffer = buffer[end + 1:]
+
+            if command:
+                self.commands_received += 1
+                self._send(self._apply_fault(self.respond(command)))
+
+    def _apply_fault(self, reply: str) -> str:
+        """
+
+        :param reply: The reply to a command
+        :return: The reply, with a fault if one is to be injected
+        """
+        fault = self._next_fault()
+
+        if fault is None or not reply:
+            return reply
+
+        log.debug("Simulator %r injecting fault %s into %s",
+                  self, fault, repr(reply))
+
+        if fault == Fault.DROP:
+            return ""
+        elif fault == Fault.TRUNCATE:
+            return reply[:len(reply) // 2]
+        else:
+            index = self._random.randrange(len(reply))
+            return reply[:index] + "\x15" + reply[index + 1:]
+
+    def _next_fault(self) -> Optional[Fault]:
+        """
+
+        :return: The fault to inject into the next reply, or ``None``
+        """
+        with self._lock:
+            if self._queued_faults:
+                return self._queued_faults.popleft()
+
+        if self.faults and self._random.random() < self.fault_probability:
+            return self._random.choice(self.faults)
+
+        return None
+
+    def _send(self, reply: str) -> None:
+        """
+        Wait for the latency of the command, and write the reply
+
+        :param reply: The reply to send
+        """
+        if not reply:
+            return
+
+        if self.per_command_latency:
+            sleep(self.per_command_latency)
+
+        data = reply.encode('utf-8')
+
+        if not self.per_byte_latency:
+            os.write(self._master, data)
+            return
+
+        for byte in data:
+            sleep(self.per_byte_latency)
+            os.write(self._master, bytes([byte]))
+
+    def __repr__(self) -> str:
+        return "%s(per_byte_latency=%s, per_command_latency=%s, " \
+               "fault_probability=%s)" % (
+                   self.__class__.__name__, self.per_byte_latency,
+                   self.per_command_latency, self.fault_probability
+               )
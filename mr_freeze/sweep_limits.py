@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the writer that sets the sweep limits of the power supply when
+they are changed in the store. Each write costs a ``REMOTE`` ... ``LOCAL``
+exchange with the power supply, and a turn in the power supply's lane, so
+writing every change as it is made builds up a backlog of writes whose
+values have already been replaced.
+
+The writer keeps the latest value of each limit that is waiting to be
+written, and has at most one write of the limits queued in the power
+supply's lane of the executor. A change made while the write is queued
+replaces the value that the write will send. When the write runs, it sends
+both limits in one remote session, and leaves out any limit that already
+has the value last written to the power supply.
+"""
+import logging
+from concurrent.futures import Executor, Future
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from quantities import Quantity
+from mr_freeze.executors import Priority
+from mr_freeze.tasks.abstract_task import AbstractTask
+
+log = logging.getLogger(__name__)
+
+
+class ApplySweepLimits(AbstractTask):
+    """
+    Writes the sweep limits that are waiting in a :class:`SweepLimitWriter`
+    """
+    priority = Priority.CONTROL
+
+    def __init__(
+            self, writer: 'SweepLimitWriter', batch: '_Batch'
+    ) -> None:
+        """
+
+        :param writer: The writer whose limits are written
+        :param batch: The changes that this write settles
+        """
+        self.writer = writer
+        self.batch = batch
+
+    @property
+    def instrument(self) -> Any:
+        """
+
+        :return: The power supply whose limits are written
+        """
+        return self.writer.power_supply
+
+    def task(self, executor: Executor) -> None:
+        """
+
+        :param executor: The executor with which this task is to be done
+        """
+        self.writer.apply(self.batch)
+
+    def __repr__(self) -> str:
+        return '<%s(writer=%s)>' % (self.__class__.__name__, self.writer)
+
+
+class _Batch(object):
+    """
+    The changes that one write of the limits settles
+    """
+    def __init__(self) -> None:
+        self.futures = []  # type: List[Future]
+        self.taken = False
+        self.attempts = 0
+
+
+class SweepLimitWriter(object):
+    """
+    Writes the upper and lower sweep limits of a power supply, last write
+    wins. ``writes`` counts the limits sent to the power supply, and
+    ``skipped`` counts the changes that were replaced before they were sent,
+    or that matched the value that the power supply already had.
+
+    A write that is dropped before it runs, for instance because its
+    deadline passed while it was queued, is submitted again, up to
+    ``max_attempts`` times in all. If it is still not written, the values
+    waiting to be written are discarded, and the futures of the changes
+    raise the error, so that the power supply is not left with old limits
+    while the writer holds new ones
+    """
+    UPPER = 'upper_sweep_current'
+    LOWER = 'lower_sweep_current'
+
+    def __init__(
+            self,
+            power_supply: Any,
+            executor: Executor,
+            max_attempts: int=3
+    ) -> None:
+        """
+
+        :param power_supply: The power supply whose limits are written
+        :param executor: The executor on which the writes are made
+        :param max_attempts: The number of times that a write is submitted
+            before its changes are given up on
+        """
+        self.power_supply = power_supply
+        self.executor = executor
+        self.max_attempts = max_attempts
+        self.writes = 0
+        self.skipped = 0
+
+        self._pending = {}  # type: Dict[str, Quantity]
+        self._confirmed = {}  # type: Dict[str, Quantity]
+        self._batch = None  # type: Optional[_Batch]
+        self._lock = Lock()
+
+    def set_upper(self, current: Quantity) -> Future:
+        """
+
+        :param current: The new upper sweep current
+        :return: A future that resolves once the power supply has the
+            latest upper limit
+        """
+        return self._set(self.UPPER, current)
+
+    def set_lower(self, current: Quantity) -> Future:
+        """
+
+        :param current: The new lower sweep current
+        :return: A future that resolves once the power supply has the
+            latest lower limit
+        """
+        return self._set(self.LOWER, current)
+
+    def confirmed(self, name: str) -> Optional[Quantity]:
+        """
+
+        :param name: The name of a limit, :attr:`UPPER` or :attr:`LOWER`
+        :return: The value of the limit that was last written to the power
+            supply, or ``None`` if none was written
+        """
+        with self._lock:
+            return self._confirmed.get(name)
+
+    def apply(self, batch: _Batch) -> None:
+        """
+        Write the limits that are waiting, and settle the changes in a batch
+
+        :param batch: The changes that this write settles
+        :raises: The error of the power supply, if the limits could not be
+            written
+        """
+        with self._lock:
+            batch.taken = True
+            if self._batch is batch:
+                self._batch = None
+            pending, self._pending = self._pending, {}
+            changed = {
+                name: current for name, current in pending.items()
+                if not self._is_confirmed(name, current)
+            }
+            self.skipped += len(pending) - len(changed)
+
+        try:
+            if changed:
+                log.debug("Writing sweep limits %s to %s", changed,
+                          self.power_supply)
+                self.power_supply.set_sweep_limits(
+                    upper=changed.get(self.UPPER),
+                    lower=changed.get(self.LOWER)
+                )
+        except BaseException as error:
+            with self._lock:
+                for name in changed:
+                    self._confirmed.pop(name, None)
+            self._settle(batch, error)
+            raise
+
+        with self._lock:
+            self._confirmed.update(changed)
+            self.writes += len(changed)
+        self._settle(batch)
+
+    def _set(self, name: str, current: Quantity) -> Future:
+        """
+
+        :param name: The name of the limit
+        :param current: The new value of the limit
+        :return: A future that resolves once the limit is written
+        """
+        future = Future()  # type: Future
+        submit = False
+        with self._lock:
+            if name in self._pending:
+                self.skipped += 1
+            self._pending[name] = current
+            if self._batch is None:
+                self._batch = _Batch()
+                submit = True
+            batch = self._batch
+            batch.futures.append(future)
+
+        if submit:
+            self._submit(batch)
+        return future
+
+    def _submit(self, batch: _Batch) -> None:
+        """
+
+        :param batch: The changes to write
+        """
+        batch.attempts += 1
+        try:
+            task = ApplySweepLimits(self, batch)(self.executor)
+        except RuntimeError as error:
+            self._abandon(batch, error)
+        else:
+            task.add_done_callback(lambda done: self._written(batch, done))
+
+    def _written(self, batch: _Batch, task: Future) -> None:
+        """
+        Submit a write that was dropped before it ran again, or give up on
+        its changes once it has been submitted ``max_attempts`` times
+
+        :param batch: The changes that the write was to settle
+        :param task: The future of the write
+        """
+        if batch.taken:
+            return
+        error = task.exception()
+        if error is None:
+            return
+        if batch.attempts < self.max_attempts:
+            log.warning("Sweep limits were not written: %r. Trying again",
+                        error)
+            self._submit(batch)
+            return
+        log.error("Sweep limits were not written after %d attempts: %r",
+                  batch.attempts, error)
+        self._abandon(batch, error)
+
+    def _abandon(self, batch: _Batch, error: BaseException) -> None:
+        """
+        Give up on the changes of a write. The values that were waiting to
+        be written with them are discarded
+
+        :param batch: The changes of a write that could not be made
+        :param error: Why the write could not be made
+        """
+        with self._lock:
+            batch.taken = True
+            if self._batch is batch:
+                self._batch = None
+                self._pending.clear()
+        self._settle(batch, error)
+
+    def _is_confirmed(self, name: str, current: Quantity) -> bool:
+        """
+
+        :param name: The name of a limit
+        :param current: A value of the limit
+        :return: ``True`` if the value is the last one that was written to
+            the power supply
+        """
+        confirmed = self._confirmed.get(name)
+        return confirmed is not None and \
+            confirmed.units == current.units and \
+            float(confirmed) == float(current)
+
+    @staticmethod
+    def _settle(
+            batch: _Batch, error: Optional[BaseException]=None
+    ) -> None:
+        """
+
+        :param batch: The changes to settle
+        :param error: The error with which to settle them, if the write
+            failed
+        """
+        for future in batch.futures:
+            if not future.set_running_or_notify_cancel():
+                continue
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+    def __repr__(self) -> str:
+        return "%s(power_supply=%s)" % (
+            self.__class__.__name__, self.power_supply
+        )
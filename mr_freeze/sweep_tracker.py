@@ -0,0 +1,455 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a tracker that tells when a sweep of the power supply is over. The
+power supply accepts a sweep command straight away, and then ramps its
+current towards the target on its own. The tracker watches the current, and
+resolves a future once the current reaches the target, or once the sweep is
+paused or replaced by another sweep.
+
+The tracker does not keep a polling loop of its own. The readings of the
+current that the measurement loop publishes on the :class:`SampleStream`
+are used first. The tracker only reads the current itself when no reading
+is recent enough, and it does so with a task in the power supply's lane of
+the executor, so that its reads are paced like every other read of the
+power supply. Its own readings are published on the stream in turn.
+
+Only readings made by the power supply that is sweeping count towards its
+sweep. Readings are matched to the power supply by the key of its lane, so
+a reading made through another adapter of the same power supply counts
+too.
+
+The time until the next look at the current is half the time that the
+sweep is expected to take to reach its target, at the rate that the current
+was last seen to change. It is never shorter than the power supply's
+``minimum_command_gap``, and never longer than ``maximum_interval``.
+
+A sweep whose current does not reach the target, for instance because the
+supply clamped it to a limit or the magnet quenched, is resolved as not
+reached once it has been tracked for ``max_duration``.
+"""
+import logging
+import math
+from collections import namedtuple
+from concurrent.futures import Executor, Future
+from threading import Lock
+from typing import Any, Dict, Optional
+from quantities import Quantity, A
+from mr_freeze.executors import instrument_key
+from mr_freeze.resources.application_state import Current
+from mr_freeze.samples import Reading, SampleRecord, SampleStream, \
+    Subscription, samples as _samples
+from mr_freeze.scheduler import scheduler as _scheduler
+from mr_freeze.tasks.abstract_task import AbstractTask
+from mr_freeze.timers import Timer, TimerQueue
+
+log = logging.getLogger(__name__)
+
+
+class SweepResult(namedtuple(
+    'SweepResult', ('target', 'current', 'reached')
+)):
+    """
+    How a sweep ended. ``current`` is the last current seen, or ``None`` if
+    the current was never read. ``reached`` is ``True`` if the current got
+    to the target, and ``False`` if the sweep was paused or replaced first,
+    or did not reach the target in time
+    """
+    __slots__ = ()
+
+
+class ReadSweepCurrent(AbstractTask):
+    """
+    Reads the current of a power supply that is sweeping
+    """
+    def __init__(self, power_supply: Any) -> None:
+        """
+
+        :param power_supply: The power supply to read
+        """
+        self.power_supply = power_supply
+
+    @property
+    def instrument(self) -> Any:
+        """
+
+        :return: The power supply to read
+        """
+        return self.power_supply
+
+    def task(self, executor: Executor) -> Reading:
+        """
+
+        :param executor: The executor to use for the task
+        :return: The reading of the current
+        """
+        return Reading.now(
+            Current, self.power_supply.current,
+            instrument_key(self.power_supply)
+        )
+
+    def __repr__(self) -> str:
+        return "%s(power_supply=%s)" % (
+            self.__class__.__name__, self.power_supply
+        )
+
+
+class _Sweep(object):
+    """
+    The state of one sweep that is being tracked
+    """
+    def __init__(
+            self,
+            power_supply: Any,
+            target: float,
+            executor: Executor,
+            started: float
+    ) -> None:
+        """
+
+        :param power_supply: The power supply that is sweeping
+        :param target: The target current in amperes
+        :param executor: The executor on which to read the current
+        :param started: The time at which the sweep started
+        """
+        self.power_supply = power_supply
+        self.source = instrument_key(power_supply)
+        self.target = target
+        self.executor = executor
+        self.started = started
+        self.future = Future()  # type: Future
+        self.finished = False
+        self.last_time = None  # type: Optional[float]
+        self.last_current = None  # type: Optional[float]
+        self.rate = None  # type: Optional[float]
+        self.failures = 0
+        self.timer = None  # type: Optional[Timer]
+
+
+class SweepTracker(object):
+    """
+    Resolves a future for each sweep once the sweep is over. Each power
+    supply has at most one sweep tracked at a time
+    """
+    def __init__(
+            self,
+            timers: TimerQueue=_scheduler.timers,
+            samples: SampleStream=_samples,
+            tolerance: Quantity=0.01 * A,
+            initial_interval: float=1.0,
+            maximum_interval: float=10.0,
+            max_failures: int=3,
+            max_duration: Optional[float]=3600.0
+    ) -> None:
+        """
+
+        :param timers: The timer queue on which the looks at the current are
+            kept
+        :param samples: The stream on which readings of the current are
+            shared with the measurement loop
+        :param tolerance: How close the current must be to the target for
+            the target to count as reached
+        :param initial_interval: The time in seconds until the first look at
+            the current, before its rate of change is known
+        :param maximum_interval: The longest time in seconds between looks
+            at the current
+        :param max_failures: The number of reads of the current in a row
+            that can fail before the sweep's future raises
+        :param max_duration: The longest time in seconds that a sweep is
+            tracked before it is resolved as not reached, or ``None`` to
+            track it until it reaches the target
+        """
+        self.timers = timers
+        self.samples = samples
+        self.tolerance = float(tolerance.rescale(A))
+        self.initial_interval = initial_interval
+        self.maximum_interval = maximum_interval
+        self.max_failures = max_failures
+        self.max_duration = max_duration
+
+        self._sweeps = {}  # type: Dict[int, _Sweep]
+        self._subscription = None  # type: Optional[Subscription]
+        self._lock = Lock()
+
+    def track(
+            self, power_supply: Any, target: Quantity, executor: Executor
+    ) -> Future:
+        """
+        Start tracking a sweep that was just started. A sweep of the same
+        power supply that was being tracked is resolved as not reached
+
+        :param power_supply: The power supply that is sweeping
+        :param target: The current towards which it is sweeping
+        :param executor: The executor on which to read the current
+        :return: A future that resolves to a :class:`SweepResult` once the
+            sweep is over
+        """
+        try:
+            target_in_amperes = float(target.rescale(A))
+        except ValueError:
+            target_in_amperes = float('nan')
+
+        sweep = _Sweep(
+            power_supply, target_in_amperes, executor, self.timers.clock()
+        )
+
+        if math.isnan(target_in_amperes):
+            log.warning("Cannot track sweep of %s to unknown target %s",
+                        power_supply, target)
+            sweep.future.set_result(
+                SweepResult(target_in_amperes * A, None, False)
+            )
+            return sweep.future
+
+        with self._lock:
+            replaced = self._sweeps.get(id(power_supply))
+            self._sweeps[id(power_supply)] = sweep
+            if self._subscription is None:
+                self._subscription = self.samples.subscribe()
+
+        if replaced is not None:
+            self._finish(replaced, False)
+
+        log.debug("Tracking sweep of %s to %s A", power_supply,
+                  target_in_amperes)
+        self._schedule(sweep, self._interval(sweep))
+        return sweep.future
+
+    def pause(self, power_supply: Any) -> None:
+        """
+        Resolve the sweep of a power supply as not reached, because the
+        sweep was paused
+
+        :param power_supply: The power supply whose sweep was paused
+        """
+        with self._lock:
+            sweep = self._sweeps.get(id(power_supply))
+        if sweep is not None:
+            self._finish(sweep, False)
+
+    def sweeping(self, power_supply: Any) -> bool:
+        """
+
+        :param power_supply: A power supply
+        :return: ``True`` if a sweep of the power supply is being tracked
+        """
+        with self._lock:
+            return id(power_supply) in self._sweeps
+
+    def _look(self, sweep: _Sweep) -> None:
+        """
+        Look at the readings that were shared since the last look. If none
+        of them is recent enough, read the current
+
+        :param sweep: The sweep to look at
+        """
+        if sweep.future.cancelled():
+            self._forget(sweep)
+            return
+
+        self._catch_up()
+        if sweep.finished:
+            return
+
+        now = self.timers.clock()
+        if self._timed_out(sweep, now):
+            log.warning("Sweep of %s to %s A did not reach its target in "
+                        "%s s", sweep.power_supply, sweep.target,
+                        self.max_duration)
+            self._finish(sweep, False)
+            return
+
+        due = self._next_look(sweep)
+        if due > now:
+            self._schedule(sweep, due - now)
+            return
+
+        try:
+            future = ReadSweepCurrent(sweep.power_supply)(sweep.executor)
+        except RuntimeError as error:
+            self._fail(sweep, error)
+            return
+        future.add_done_callback(lambda done: self._polled(sweep, done))
+
+    def _polled(self, sweep: _Sweep, future: Future) -> None:
+        """
+        Take in the current that the tracker read
+
+        :param sweep: The sweep whose current was read
+        :param future: The future of the read
+        """
+        try:
+            reading = future.result()
+        except Exception as error:
+            sweep.failures += 1
+            log.warning("Could not read current of sweeping %s: %r",
+                        sweep.power_supply, error)
+            if sweep.failures >= self.max_failures:
+                self._fail(sweep, error)
+            else:
+                self._schedule(sweep, self.maximum_interval)
+            return
+
+        sweep.failures = 0
+        self.samples.publish(SampleRecord((reading,)))
+        self._catch_up()
+        self._schedule(sweep, self._interval(sweep))
+
+    def _catch_up(self) -> None:
+        """
+        Update each tracked sweep with the currents that its power supply
+        read since the last look
+        """
+        with self._lock:
+            subscription = self._subscription
+            sweeps = list(self._sweeps.values())
+        if subscription is None:
+            return
+
+        for record in subscription.take():
+            reading = record.reading(Current)
+            if reading is None or not reading.ok:
+                continue
+            for sweep in sweeps:
+                if reading.source == sweep.source:
+                    self._update(sweep, reading)
+
+    def _update(self, sweep: _Sweep, reading: Reading) -> None:
+        """
+        Work out how quickly the current is changing, and resolve the sweep
+        if the current has reached its target
+
+        :param sweep: The sweep whose current was read
+        :param reading: A reading of the current
+        """
+        try:
+            current = float(reading.value.rescale(A))
+        except (AttributeError, ValueError):
+            return
+        last_time = sweep.started if sweep.last_time is None else \
+            sweep.last_time
+        if math.isnan(current) or sweep.finished or \
+                reading.monotonic < last_time:
+            return
+
+        if sweep.last_time is not None and reading.monotonic > last_time:
+            sweep.rate = abs(current - sweep.last_current) / (
+                reading.monotonic - sweep.last_time
+            )
+        sweep.last_time = reading.monotonic
+        sweep.last_current = current
+
+        if abs(current - sweep.target) <= self.tolerance:
+            self._finish(sweep, True)
+
+    def _interval(self, sweep: _Sweep) -> float:
+        """
+
+        :param sweep: A sweep
+        :return: The time in seconds between the last look at the current
+            and the next one
+        """
+        minimum = float(
+            getattr(sweep.power_supply, 'minimum_command_gap', 0.0)
+        )
+        if sweep.rate is None or sweep.last_current is None:
+            interval = self.initial_interval
+        elif sweep.rate == 0:
+            interval = self.maximum_interval
+        else:
+            distance = abs(sweep.target - sweep.last_current)
+            interval = distance / sweep.rate / 2
+        return min(max(interval, minimum), self.maximum_interval)
+
+    def _next_look(self, sweep: _Sweep) -> float:
+        """
+
+        :param sweep: A sweep
+        :return: The time at which the current must next be read
+        """
+        if sweep.last_time is None:
+            return self.timers.clock()
+        return sweep.last_time + self._interval(sweep)
+
+    def _timed_out(self, sweep: _Sweep, now: float) -> bool:
+        """
+
+        :param sweep: A sweep
+        :param now: The time on the timer queue's clock
+        :return: ``True`` if the sweep has been tracked for longer than
+            ``max_duration``
+        """
+        return self.max_duration is not None and \
+            now - sweep.started >= self.max_duration
+
+    def _schedule(self, sweep: _Sweep, delay: float) -> None:
+        """
+        Schedule the next look at a sweep, no later than the end of its
+        ``max_duration``
+
+        :param sweep: The sweep to look at
+        :param delay: The time in seconds until the look
+        """
+        if self.max_duration is not None:
+            remaining = sweep.started + self.max_duration - \
+                self.timers.clock()
+            delay = max(min(delay, remaining), 0.0)
+        with self._lock:
+            if not sweep.finished:
+                sweep.timer = self.timers.call_later(
+                    delay, self._look, sweep
+                )
+
+    def _finish(self, sweep: _Sweep, reached: bool) -> None:
+        """
+        Stop tracking a sweep, and resolve its future
+
+        :param sweep: The sweep that is over
+        :param reached: ``True`` if the current reached the target
+        """
+        if not self._forget(sweep):
+            return
+        current = None if sweep.last_current is None else \
+            sweep.last_current * A
+        log.debug("Sweep of %s to %s A is over. Reached: %s",
+                  sweep.power_supply, sweep.target, reached)
+        sweep.future.set_result(
+            SweepResult(sweep.target * A, current, reached)
+        )
+
+    def _fail(self, sweep: _Sweep, error: BaseException) -> None:
+        """
+        Stop tracking a sweep whose current cannot be read
+
+        :param sweep: The sweep
+        :param error: Why the current cannot be read
+        """
+        if self._forget(sweep):
+            sweep.future.set_exception(error)
+
+    def _forget(self, sweep: _Sweep) -> bool:
+        """
+
+        :param sweep: The sweep to stop tracking
+        :return: ``True`` if the sweep was being tracked, and is not any
+            more
+        """
+        with self._lock:
+            if sweep.finished:
+                return False
+            sweep.finished = True
+            if self._sweeps.get(id(sweep.power_supply)) is sweep:
+                del self._sweeps[id(sweep.power_supply)]
+            if not self._sweeps and self._subscription is not None:
+                self._subscription.close()
+                self._subscription = None
+            if sweep.timer is not None:
+                sweep.timer.cancel()
+        return sweep.future.set_running_or_notify_cancel()
+
+    def __repr__(self) -> str:
+        return "%s(tolerance=%s A, maximum_interval=%s)" % (
+            self.__class__.__name__, self.tolerance, self.maximum_interval
+        )
+
+
+sweep_tracker = SweepTracker()
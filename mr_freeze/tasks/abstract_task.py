@@ -7,19 +7,54 @@ import logging
 from typing import Any, Optional, Callable
 from functools import wraps
 from concurrent.futures import Executor, Future
+from threading import Lock
+from mr_freeze.deadlines import watchdog, deadline_scope
+from mr_freeze.exceptions import TaskDroppedError, TaskTimeoutError
+from mr_freeze.executors import InstrumentAffineExecutor, Priority
 
 log = logging.getLogger(__name__)
 
 
 class AbstractTask(object, metaclass=abc.ABCMeta):
     """
-    Describes a task that can be submitted to an executor
+    Describes a task that can be submitted to an executor. Tasks that talk
+    to an instrument name it in ``instrument``. When such a task is
+    submitted to an :class:`InstrumentAffineExecutor`, it runs in that
+    instrument's lane. Tasks with a higher ``priority`` go ahead of the
+    tasks queued in the lane with a lower one.
+
+    Each task has a deadline ``timeout`` seconds after it is submitted. If
+    the task has no timeout of its own, the ``task_timeout`` of the executor
+    is used. A task that is still queued when its deadline passes is dropped
+    without running. A task that is still running is interrupted with
+    :meth:`interrupt`, and stops at its next read or write. Either way, its
+    future raises :exc:`TaskTimeoutError`, which is a
+    :exc:`TaskDroppedError` if the task was dropped. A task that has
+    already returned is never interrupted, so that a deadline passing just
+    as the task finishes does not cancel a read of the next task.
     """
+    instrument = None  # type: Optional[Any]
+
+    priority = Priority.MEASUREMENT  # type: Priority
+
+    timeout = None  # type: Optional[float]
+
     def __call__(self, executor: Executor) -> Future:
         log.debug("Submitted task <%s> to executor <%s>", self.__repr__(),
                   executor.__repr__())
 
-        return executor.submit(self._task_wrapper(self.task), executor)
+        timeout = self.timeout if self.timeout is not None else \
+            getattr(executor, 'task_timeout', None)
+        deadline = None if timeout is None else watchdog.clock() + timeout
+        wrapper = self._task_wrapper(self.task, deadline)
+
+        if self.instrument is not None and \
+                isinstance(executor, InstrumentAffineExecutor):
+            return executor.submit_to(
+                self.instrument, wrapper, executor, priority=self.priority
+            )
+
+        return executor.submit(wrapper, executor)
 
     @abc.abstractmethod
     def task(self, executor: Executor) -> Optional[Any]:
@@ -29,14 +64,28 @@ class AbstractTask(object, metaclass=abc.ABCMeta):
         """
         raise NotImplementedError()
 
+    def interrupt(self) -> None:
+        """
+        Stop the task at its next read or write, once its deadline has
+        passed. By default, a read blocking on the task's instrument is
+        cancelled
+        """
+        interrupt = getattr(self.instrument, 'interrupt', None)
+        if interrupt is not None:
+            interrupt()
+
     def _task_wrapper(
-            self, task: Callable[['AbstractTask', Executor], Optional[Any]]
+            self,
+            task: Callable[['AbstractTask', Executor], Optional[Any]],
+            deadline: Optional[float]=None
     ) -> Callable[[Executor], Optional[Any]]:
         """
         Wraps the method to be executed, adding in some logging should the
-        task fail
+        task fail, and holding the task to its deadline
 
         :param task: The task function to wrap
+        :param deadline: The time on the watchdog's clock by which the task
+            must finish, or ``None`` if it has no deadline
         :return: The wrapped function
         """
         @wraps(task)
@@ -47,13 +96,45 @@ class AbstractTask(object, metaclass=abc.ABCMeta):
             :param kwargs: The keyword arguments to the original task function
             :return: The return value of the task
             """
+            if deadline is not None and watchdog.clock() >= deadline:
+                log.warning("Task %s dropped because its deadline passed "
+                            "before it started", repr(self))
+                raise TaskDroppedError(
+                    "Task %r was still queued at its deadline" % self
+                )
+
+            running = [True]
+            running_lock = Lock()
+
+            def interrupt() -> None:
+                with running_lock:
+                    if running[0]:
+                        self.interrupt()
+
+            timer = None if deadline is None else \
+                watchdog.call_at(deadline, interrupt)
             try:
-                return task(*args, **kwargs)
+                with deadline_scope(deadline):
+                    return task(*args, **kwargs)
+            except TaskTimeoutError as error:
+                log.warning("Task %s timed out: %s", repr(self), error)
+                raise
             except BaseException as error:
+                if deadline is not None and watchdog.clock() >= deadline:
+                    log.warning("Task %s was interrupted at its deadline: "
+                                "%s", repr(self), repr(error))
+                    raise TaskTimeoutError(
+                        "Task %r was interrupted at its deadline" % self
+                    ) from error
                 log.error(
                     "Task %s threw error %s", repr(self), repr(error)
                 )
                 raise error
+            finally:
+                with running_lock:
+                    running[0] = False
+                if timer is not None:
+                    timer.cancel()
         return wrapper
 
     def __repr__(self):
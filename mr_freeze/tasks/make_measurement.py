@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 """
 Contains a task that makes a single measurement on the current, cryogen
-level, and magnetic field. This task associates these values with a date,
-and writes the numbers down as a single line in a CSV file
+level, and magnetic field. The values are written to the store as they are
+read, and gathered into one :class:`SampleRecord`, which stamps each value
+with the time at which it was read
 """
 import logging
 from concurrent.futures import Executor, Future
+from typing import Dict, Iterable, List, Optional, Type
 from mr_freeze.tasks.abstract_task import AbstractTask
 from mr_freeze.tasks.report_current import ReportCurrent
 from mr_freeze.tasks.report_magnetic_field import ReportMagneticField
@@ -17,22 +19,36 @@ from mr_freeze.devices.cryomagnetics_4g_adapter \
     import Cryomagnetics4G as _Cryomagnetics4G
 from mr_freeze.devices.cryomagnetics_lm510_adapter \
     import CryomagneticsLM510 as _CryomagneticsLM510
-from mr_freeze.resources.application_state import Store
+from mr_freeze.tasks.report_variable_task import ReportVariableTask
+from mr_freeze.tasks.visit_instrument import VisitInstrument
+from mr_freeze.resources.abstract_store import Variable
+from mr_freeze.samples import collect
+from mr_freeze.resources.application_state import Store, Current, \
+    MagneticField, LiquidHeliumLevel, LiquidNitrogenLevel
 
 log = logging.getLogger(__name__)
 
 
 class MakeMeasurement(AbstractTask):
     """
-    Run a single measurement, and write the results
+    Run a single measurement, and write the results. Reads from the same
+    instrument are made in one visit to the instrument.
+
+    Calling the measurement submits its visits to the executor directly,
+    and returns a future for the :class:`SampleRecord` of the measurement.
+    The future finishes once every visit has.
     """
+    VARIABLES = (
+        LiquidNitrogenLevel, Current, MagneticField, LiquidHeliumLevel
+    )
 
     def __init__(
             self,
             level_meter: _CryomagneticsLM510,
             current_gauge: _Cryomagnetics4G,
             gaussmeter: _Lakeshore475,
-            store: Store) -> None:
+            store: Store,
+            variables: Optional[Iterable[Type[Variable]]]=None) -> None:
         """
 
         :param level_meter: The gauge used to measure liquid nitrogen
@@ -40,21 +56,59 @@ class MakeMeasurement(AbstractTask):
         going into the cryostat
         :param gaussmeter: The gauge used to measure the magnetic field in
         the cryostat
+        :param variables: The variables to measure. By default, all of
+            ``VARIABLES`` are measured
         """
         self.ln2_task = ReportLiquidNitrogenLevel(level_meter, store)
         self.current_task = ReportCurrent(current_gauge, store)
         self.magnetic_field_task = ReportMagneticField(gaussmeter, store)
         self.report_helium_task = ReportLiquidHeliumLevel(level_meter, store)
         self.store = store
+        self.variables = tuple(
+            self.VARIABLES if variables is None else variables
+        )
+
+    def __call__(self, executor: Executor) -> Future:
+        """
+
+        :param executor: The executor to use for making the measurement
+        :return: A future for the record of the measurement
+        """
+        return self.task(executor)
 
-    def task(self, executor: Executor) -> None:
+    def task(self, executor: Executor) -> Future:
         """
-        Measure the variables and write them to the CSV file
+        Submit a visit to each instrument with variables to measure
 
         :param executor: The executor to use for making the measurement
-        :return:
+        :return: A future for the record of the measurement
         """
-        self.ln2_task(executor)  # type: Future
-        self.current_task(executor)  # type: Future
-        self.magnetic_field_task(executor)  # type: Future
-        self.report_helium_task(executor)  # type: Future
+        return collect(
+            [(visit.variables, visit(executor)) for visit in self.visits]
+        )
+
+    @property
+    def visits(self) -> List[VisitInstrument]:
+        """
+
+        :return: One visit for each instrument with a variable to measure,
+            making all the reads from that instrument
+        """
+        tasks = {
+            task.variable_type: task for task in (
+                self.ln2_task, self.current_task,
+                self.magnetic_field_task, self.report_helium_task
+            )
+        }  # type: Dict[Type[Variable], ReportVariableTask]
+
+        grouped = []  # type: List[List[ReportVariableTask]]
+        for variable in self.variables:
+            task = tasks[variable]
+            for group in grouped:
+                if group[0].instrument is task.instrument:
+                    group.append(task)
+                    break
+            else:
+                grouped.append([task])
+
+        return [VisitInstrument(group) for group in grouped]
@@ -2,7 +2,6 @@
 """
 Measures the current from the Cryomagnetics 4G power supply
 """
-from time import sleep
 import numpy as np
 from quantities import A
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
@@ -26,6 +25,14 @@ class ReportCurrent(ReportVariableTask):
         super(ReportCurrent, self).__init__(store)
         self.gauge = gauge
 
+    @property
+    def instrument(self) -> Cryomagnetics4G:
+        """
+
+        :return: The power supply whose current is reported
+        """
+        return self.gauge
+
     @property
     def variable_type(self):
         """
@@ -44,5 +51,4 @@ class ReportCurrent(ReportVariableTask):
             current = self.gauge.current
         except NoEchoedCommandFoundError:
             current = np.nan * A
-        sleep(0.3)
         return current
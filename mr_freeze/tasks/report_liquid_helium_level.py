@@ -4,7 +4,6 @@ Describes a task to report the level of liquid helium in the system
 """
 import logging
 import numpy as np
-from time import sleep
 from quantities import Quantity, cm
 from mr_freeze.resources.abstract_store import Store, Variable
 from mr_freeze.resources.application_state import LiquidHeliumLevel
@@ -20,7 +19,6 @@ class ReportLiquidHeliumLevel(ReportVariableTask):
     The task to report the amount of liquid helium in the cryostat
     """
     title = "Liquid Helium Level"
-    _minimum_time_between_samples = 0.3
 
     def __init__(
             self,
@@ -38,6 +36,14 @@ class ReportLiquidHeliumLevel(ReportVariableTask):
         self.gauge = gauge
         self.lhe_channel = lhe_channel
 
+    @property
+    def instrument(self) -> CryomagneticsLM510:
+        """
+
+        :return: The level meter that measures the helium
+        """
+        return self.gauge
+
     @property
     def variable_type(self) -> Variable.__class__:
         """
@@ -57,7 +63,6 @@ class ReportLiquidHeliumLevel(ReportVariableTask):
         except DeviceCommunicationError as error:
             log.error(error)
             level = np.nan * cm
-        self._wait_for_minimum_time()
         return level
 
     @property
@@ -74,6 +79,3 @@ class ReportLiquidHeliumLevel(ReportVariableTask):
             raise RuntimeError(
                 "Attempted to measure using unknown channel "
                 "%d" % self.lhe_channel)
-
-    def _wait_for_minimum_time(self):
-        sleep(self._minimum_time_between_samples)
@@ -3,7 +3,6 @@
 Describes a task to report the level of liquid nitrogen in the system
 """
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
-from time import sleep
 from quantities import Quantity, cm
 from numpy import nan
 from mr_freeze.resources.abstract_store import Store, Variable
@@ -18,8 +17,6 @@ class ReportLiquidNitrogenLevel(ReportVariableTask):
     """
     title = "Liquid Nitrogen Level"
 
-    _minimum_time_between_samples = 0.3
-
     def __init__(
             self,
             gauge: CryomagneticsLM510,
@@ -36,6 +33,14 @@ class ReportLiquidNitrogenLevel(ReportVariableTask):
         self.gauge = gauge
         self.ln_2_channel = ln2_channel
 
+    @property
+    def instrument(self) -> CryomagneticsLM510:
+        """
+
+        :return: The level meter that measures the nitrogen
+        """
+        return self.gauge
+
     @property
     def variable(self):
         """
@@ -46,7 +51,6 @@ class ReportLiquidNitrogenLevel(ReportVariableTask):
             level = self._ln2_level
         except NoEchoedCommandFoundError:
             level = nan * cm
-        self._wait_for_minimum_time()
         return level
 
     @property
@@ -72,6 +76,3 @@ class ReportLiquidNitrogenLevel(ReportVariableTask):
                 "Attempted to measure using unknown channel %d" %
                 self.ln_2_channel
             )
-
-    def _wait_for_minimum_time(self):
-        sleep(self._minimum_time_between_samples)
@@ -9,7 +9,6 @@ from mr_freeze.tasks.report_variable_task import ReportVariableTask
 from mr_freeze.exceptions import NoEchoedCommandFoundError
 from quantities import Quantity, gauss
 from numpy import nan
-from time import sleep
 
 
 class ReportMagneticField(ReportVariableTask):
@@ -18,8 +17,6 @@ class ReportMagneticField(ReportVariableTask):
     """
     title = "Magnetic Field"
 
-    _minimum_time_between_samples = 0.3
-
     def __init__(self, gauge: Lakeshore475, store: Store) -> None:
         """
         Initialize the task
@@ -29,6 +26,14 @@ class ReportMagneticField(ReportVariableTask):
         super(ReportMagneticField, self).__init__(store)
         self.gauge = gauge
 
+    @property
+    def instrument(self) -> Lakeshore475:
+        """
+
+        :return: The gaussmeter that measures the field
+        """
+        return self.gauge
+
     @property
     def variable_type(self):
         """
@@ -44,14 +49,10 @@ class ReportMagneticField(ReportVariableTask):
         :return: The measured strength of the magnetic field
         """
         try:
-            self._wait_for_minimum_time()
             return self.gauge.field
         except NoEchoedCommandFoundError:
             return nan * gauss
 
-    def _wait_for_minimum_time(self):
-        sleep(self._minimum_time_between_samples)
-
     def __repr__(self) -> str:
         """
 
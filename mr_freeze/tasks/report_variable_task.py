@@ -5,6 +5,8 @@ Describes how to report a variable to the store
 import abc
 import logging
 from concurrent.futures import Executor
+from mr_freeze.executors import instrument_key
+from mr_freeze.samples import Reading
 from mr_freeze.tasks.abstract_task import AbstractTask
 from mr_freeze.resources.abstract_store import Variable, V, Store
 from six import add_metaclass
@@ -26,14 +28,20 @@ class ReportVariableTask(AbstractTask):
         super(ReportVariableTask, self).__init__()
         self.store = store
 
-    def task(self, executor: Executor) -> None:
+    def task(self, executor: Executor) -> Reading:
         """
 
         Get the new value and write it to the store
 
         :param executor: The executor to use for the task
-        """
-        self.store[self.variable_type].value = self.variable
+        :return: The reading of the new value, stamped with the time at
+            which it was read, and with the instrument that read it
+        """
+        reading = Reading.now(
+            self.variable_type, self.variable, instrument_key(self.instrument)
+        )
+        self.store[self.variable_type].value = reading.value
+        return reading
 
     @abc.abstractproperty
     def variable_type(self) -> Variable.__class__:
@@ -4,6 +4,7 @@ Set the upper sweep current
 """
 from quantities import Quantity
 from concurrent.futures import Executor
+from mr_freeze.executors import Priority
 from mr_freeze.tasks.abstract_task import AbstractTask
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
 
@@ -12,6 +13,8 @@ class SetUpperSweepCurrent(AbstractTask):
     """
     Sets the upper sweep current
     """
+    priority = Priority.CONTROL
+
     def __init__(
             self,
             sweep_current: Quantity,
@@ -20,6 +23,14 @@ class SetUpperSweepCurrent(AbstractTask):
         self.sweep_current = sweep_current
         self.power_supply = power_supply
 
+    @property
+    def instrument(self) -> Cryomagnetics4G:
+        """
+
+        :return: The power supply whose limit is set
+        """
+        return self.power_supply
+
     def task(self, executor: Executor) -> None:
         """
 
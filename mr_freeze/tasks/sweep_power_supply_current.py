@@ -1,17 +1,32 @@
 # coding=utf-8
 """
-Describes a task to sweep the power supply current up, down, or to 0
+Describes a task to sweep the power supply current up, down, or to 0. The
+power supply accepts a sweep straight away, so the future of the task
+resolves once the sweep is over
 """
+import math
+from typing import Any, Optional
+from quantities import A, Quantity
+from mr_freeze.adaptive_sampling import AdaptiveSampling, \
+    adaptive_sampling as _adaptive_sampling
+from mr_freeze.executors import Priority
+from mr_freeze.sweep_limits import SweepLimitWriter
+from mr_freeze.sweep_tracker import SweepTracker, \
+    sweep_tracker as _sweep_tracker
 from mr_freeze.tasks.abstract_task import AbstractTask
-from concurrent.futures import Executor
+from concurrent.futures import Executor, Future
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
 from enum import Enum
 
 
 class SweepPowerSupply(AbstractTask):
     """
-    Sweep the power supply to another current value in a particular direction
+    Sweep the power supply to another current value in a particular direction.
+    The limit towards which the power supply sweeps is taken from its
+    response cache, or from the limits last written by ``limits``. The power
+    supply is only asked for the limit if neither has it.
     """
+    priority = Priority.CONTROL
 
     class Direction(Enum):
         """
@@ -24,30 +39,164 @@ class SweepPowerSupply(AbstractTask):
 
     def __init__(
             self, direction: Direction, power_supply: Cryomagnetics4G,
-            fast_sweep=False
+            fast_sweep=False,
+            sampling: Optional[AdaptiveSampling]=_adaptive_sampling,
+            tracker: SweepTracker=_sweep_tracker,
+            limits: Optional[SweepLimitWriter]=None
     ) -> None:
+        """
+
+        :param direction: The direction in which to sweep
+        :param power_supply: The power supply to sweep
+        :param fast_sweep: If ``True``, sweep at the fast rate
+        :param sampling: The sampling policy to tell when a sweep starts, so
+            that the current and the field are sampled quickly while they
+            change
+        :param tracker: The tracker that tells when the sweep is over
+        :param limits: The writer of the power supply's sweep limits, if
+            there is one
+        """
         self.direction = direction
         self.power_supply = power_supply
         self.fast_sweep = fast_sweep
+        self.sampling = sampling
+        self.tracker = tracker
+        self.limits = limits
+
+    def __call__(self, executor: Executor) -> Future:
+        """
+
+        :param executor: The executor on which to sweep
+        :return: A future that resolves to a
+            :class:`mr_freeze.sweep_tracker.SweepResult` once the sweep is
+            over, or to ``None`` once a pause is sent. Cancelling it stops
+            tracking the sweep
+        """
+        sweep = Future()  # type: Future
+        started = super(SweepPowerSupply, self).__call__(executor)
+        started.add_done_callback(lambda done: self._started(done, sweep))
+        sweep.add_done_callback(
+            lambda done: started.cancel() if done.cancelled() else None
+        )
+        return sweep
+
+    @property
+    def instrument(self) -> Cryomagnetics4G:
+        """
 
-    def task(self, executor: Executor) -> None:
+        :return: The power supply to sweep
+        """
+        return self.power_supply
+
+    def task(self, executor: Executor) -> Optional[Future]:
         """
 
         :param executor: The executor to use for the task
+        :return: A future that resolves to a
+            :class:`mr_freeze.sweep_tracker.SweepResult` once the current
+            reaches its target, or once the sweep is paused or replaced by
+            another sweep. Pausing returns ``None``
         """
         if self.direction == self.Direction.UP:
+            target = self._limit(SweepLimitWriter.UPPER)
             self._sweep_up()
         elif self.direction == self.Direction.DOWN:
+            target = self._limit(SweepLimitWriter.LOWER)
             self._sweep_down()
         elif self.direction == self.Direction.ZERO:
+            target = 0 * A
             self._sweep_zero()
         elif self.direction == self.Direction.PAUSE:
             self._sweep_pause()
+            self.tracker.pause(self.power_supply)
+            return None
         else:
             raise RuntimeError(
                 "No sweep defined for direction %s" % self.direction
             )
 
+        if self.sampling is not None:
+            self.sampling.sweep_started()
+
+        return self.tracker.track(self.power_supply, target, executor)
+
+    def _limit(self, name: str) -> Quantity:
+        """
+
+        :param name: The name of the limit towards which the power supply
+            sweeps
+        :return: The value of the limit
+        """
+        cached = getattr(self.power_supply, 'cached_' + name)
+        if not math.isnan(float(cached)):
+            return cached
+        if self.limits is not None:
+            confirmed = self.limits.confirmed(name)
+            if confirmed is not None:
+                return confirmed
+        return getattr(self.power_supply, name)
+
+    @staticmethod
+    def _started(started: Future, sweep: Future) -> None:
+        """
+        Settle the future of a sweep once the sweep has been sent, or once
+        the tracked sweep is over
+
+        :param started: The future of the task that sent the sweep
+        :param sweep: The future to settle with the result of the sweep
+        """
+        if started.cancelled():
+            sweep.cancel()
+            return
+        if started.exception() is not None:
+            SweepPowerSupply._settle(sweep, error=started.exception())
+            return
+
+        tracked = started.result()  # type: Optional[Future]
+        if tracked is None:
+            SweepPowerSupply._settle(sweep)
+            return
+
+        sweep.add_done_callback(
+            lambda done: tracked.cancel() if done.cancelled() else None
+        )
+        tracked.add_done_callback(
+            lambda done: SweepPowerSupply._finished(done, sweep)
+        )
+
+    @staticmethod
+    def _finished(tracked: Future, sweep: Future) -> None:
+        """
+
+        :param tracked: The future of the tracked sweep, which is done
+        :param sweep: The future to settle with its result
+        """
+        if tracked.cancelled():
+            sweep.cancel()
+        elif tracked.exception() is not None:
+            SweepPowerSupply._settle(sweep, error=tracked.exception())
+        else:
+            SweepPowerSupply._settle(sweep, tracked.result())
+
+    @staticmethod
+    def _settle(
+            sweep: Future,
+            result: Optional[Any]=None,
+            error: Optional[BaseException]=None
+    ) -> None:
+        """
+
+        :param sweep: The future of a sweep
+        :param result: The result with which to settle it
+        :param error: The error with which to settle it, if the sweep failed
+        """
+        if not sweep.set_running_or_notify_cancel():
+            return
+        if error is None:
+            sweep.set_result(result)
+        else:
+            sweep.set_exception(error)
+
     def _sweep_up(self):
         self.power_supply.sweep_up(fast=self.fast_sweep)
 
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a task that makes several reads from one instrument in a single
+visit
+"""
+import logging
+from concurrent.futures import Executor
+from time import sleep
+from typing import Any, List, Sequence, Tuple, Type
+from mr_freeze.deadlines import check_deadline
+from mr_freeze.exceptions import TaskTimeoutError
+from mr_freeze.executors import instrument_key
+from mr_freeze.resources.abstract_store import Variable
+from mr_freeze.samples import Reading
+from mr_freeze.tasks.abstract_task import AbstractTask
+from mr_freeze.tasks.report_variable_task import ReportVariableTask
+
+log = logging.getLogger(__name__)
+
+
+class VisitInstrument(AbstractTask):
+    """
+    Runs report tasks for the same instrument one after the other, as one
+    task. On an :class:`InstrumentAffineExecutor`, the reads take one turn
+    in the instrument's lane, instead of each waiting for a turn of its own.
+    The instrument still rests for its ``minimum_command_gap`` between the
+    reads of a visit, as it would between turns in its lane.
+    """
+    def __init__(self, report_tasks: Sequence[ReportVariableTask]) -> None:
+        """
+
+        :param report_tasks: The tasks to run. They must all report from
+            the same instrument
+        """
+        self.report_tasks = tuple(report_tasks)
+
+    @property
+    def instrument(self) -> Any:
+        """
+
+        :return: The instrument that is visited
+        """
+        return self.report_tasks[0].instrument
+
+    @property
+    def variables(self) -> Tuple[Type[Variable], ...]:
+        """
+
+        :return: The variables that are read in this visit
+        """
+        return tuple(task.variable_type for task in self.report_tasks)
+
+    def task(self, executor: Executor) -> Tuple[Reading, ...]:
+        """
+        Run each report task, resting for the instrument's minimum command
+        gap between them. A task that fails is logged, and does not stop
+        the tasks after it from running. If the visit runs out of time, the
+        tasks that have not yet run are given up on.
+
+        :param executor: The executor on which this task runs
+        :return: The reading made by each task. A task that failed has a
+            failed reading
+        :raises: :exc:`TaskTimeoutError` if the visit's deadline passed
+        """
+        readings = []  # type: List[Reading]
+        gap = float(getattr(self.instrument, 'minimum_command_gap', 0.0))
+        for index, report_task in enumerate(self.report_tasks):
+            if index and gap > 0:
+                sleep(gap)
+                check_deadline("read after resting %.3f s" % gap)
+            try:
+                readings.append(report_task.task(executor))
+            except TaskTimeoutError:
+                raise
+            except Exception as error:
+                check_deadline("finish visit after %r" % error)
+                log.error(
+                    "Task %s threw error %s", repr(report_task), repr(error)
+                )
+                readings.append(Reading.failed(
+                    report_task.variable_type, error,
+                    instrument_key(report_task.instrument)
+                ))
+        return tuple(readings)
+
+    def __repr__(self) -> str:
+        return "{0}(report_tasks={1})".format(
+            self.__class__.__name__, self.report_tasks
+        )
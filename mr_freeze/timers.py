@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+Contains a queue of timers that fire on a single thread. Waiting for a timer
+does not hold up a worker thread, so this is used to put off work until it
+is allowed to run.
+"""
+import heapq
+import logging
+from itertools import count
+from threading import Condition, Thread, current_thread
+from time import monotonic
+from typing import Any, Callable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class Timer(object):
+    """
+    A callback that is due to run at a point in time
+    """
+    def __init__(
+            self,
+            when: float,
+            callback: Callable[..., Any],
+            args: Tuple
+    ) -> None:
+        """
+
+        :param when: The time at which the callback is due, on the clock of
+            the timer queue
+        :param callback: The function to call
+        :param args: The arguments to pass to the callback
+        """
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Stop the callback from running, if it has not already run
+        """
+        self.cancelled = True
+
+    def __repr__(self) -> str:
+        return "%s(when=%s, callback=%r)" % (
+            self.__class__.__name__, self.when, self.callback
+        )
+
+
+class TimerQueue(object):
+    """
+    Keeps timers in a heap ordered by the time at which they are due, and
+    runs each callback on the queue's thread once its time has come. The
+    thread is started when the first timer is added. Callbacks should hand
+    any long-running work to an executor, since the next timer cannot fire
+    until the callback has returned.
+    """
+    def __init__(self, clock: Callable[[], float]=monotonic) -> None:
+        """
+
+        :param clock: The clock against which timers are due. This should
+            only be overwritten during testing
+        """
+        self.clock = clock
+
+        self._heap = []  # type: List[Tuple[float, int, Timer]]
+        self._sequence = count()
+        self._condition = Condition()
+        self._thread = None  # type: Optional[Thread]
+        self._stopped = False
+
+    def call_at(
+            self, when: float, callback: Callable[..., Any], *args
+    ) -> Timer:
+        """
+
+        :param when: The time at which to run the callback
+        :param callback: The function to call
+        :param args: The arguments to pass to the callback
+        :return: The timer, which can be used to cancel the callback
+        """
+        timer = Timer(when, callback, args)
+
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Cannot add timers to a stopped queue")
+
+            heapq.heappush(self._heap, (when, next(self._sequence), timer))
+
+            if self._thread is None:
+                self._thread = Thread(
+                    target=self._run, name=repr(self), daemon=True
+                )
+                self._thread.start()
+
+            self._condition.notify()
+
+        return timer
+
+    def call_later(
+            self, delay: float, callback: Callable[..., Any], *args
+    ) -> Timer:
+        """
+
+        :param delay: The time in seconds after which to run the callback
+        :param callback: The function to call
+        :param args: The arguments to pass to the callback
+        :return: The timer, which can be used to cancel the callback
+        """
+        return self.call_at(self.clock() + delay, callback, *args)
+
+    def __len__(self) -> int:
+        """
+
+        :return: The number of timers that have not yet fired
+        """
+        with self._condition:
+            return sum(1 for _, _, timer in self._heap if not timer.cancelled)
+
+    def stop(self) -> None:
+        """
+        Stop the queue. Timers that have not fired are dropped.
+        """
+        with self._condition:
+            self._stopped = True
+            self._heap.clear()
+            self._condition.notify()
+            thread = self._thread
+
+        if thread is not None and thread is not current_thread():
+            thread.join()
+
+    def _run(self) -> None:
+        """
+        Fire timers as they come due, until the queue is stopped
+        """
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+
+                    delay = self._heap[0][0] - self.clock()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+
+                if self._stopped:
+                    return
+
+                _, _, timer = heapq.heappop(self._heap)
+
+            if timer.cancelled:
+                continue
+
+            try:
+                timer.callback(*timer.args)
+            except Exception:
+                log.exception("Timer %r raised an error", timer)
+
+    def __repr__(self) -> str:
+        return "%s()" % self.__class__.__name__
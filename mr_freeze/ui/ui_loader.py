@@ -18,8 +18,6 @@ from quantities import Quantity, cm, amperes
 from random import uniform
 import os
 from datetime import datetime
-from threading import Thread
-import schedule
 
 # IMPORTS For Gui setUp
 from mr_freeze.ui.user_interface import Ui_MainwindowUI
@@ -273,27 +271,9 @@ def change_event(store: Store) -> None:
         store[MagneticField].value = uniform(0, 10.0)
         store[Current].value = uniform(0, 100.0)
 
-
-class SchedulerThread(Thread):
-    """
-    runs the scheduler
-    """
-    def run(self) -> None:
-        """
-        Run the scheduler
-
-        :return:
-        """
-        while True:
-            sleep(1)
-            schedule.run_pending()
-
 if __name__ == '__main__':
     app = QtGui.QApplication(sys.argv)
 
-    scheduler_thread = SchedulerThread(daemon=True)
-    scheduler_thread.start()
-
     with ThreadPoolExecutor(5 * cpu_count()) as executor:
         empty_store = Store(executor)
 
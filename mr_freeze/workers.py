@@ -0,0 +1,615 @@
+# -*- coding: utf-8 -*-
+"""
+Contains the optional mode in which each instrument is run by a worker
+process of its own, instead of by threads in the GUI process. A read that
+hangs on a serial port, or the parsing and logging of replies, then cannot
+hold up the GUI, and an instrument that crashes its worker can be restarted
+without taking the GUI down.
+
+Each worker samples the variables of its instrument on its own clock, and
+writes the readings to a :class:`SampleRing` in shared memory. One consumer
+thread in the GUI process, run by the :class:`WorkerSupervisor`, drains the
+rings, writes the values to the store, and publishes them as
+:class:`SampleRecord`. Commands for an instrument, such as sweeping the
+power supply, are sent to its worker through a :class:`RemoteAdapter`.
+"""
+import ctypes
+import logging
+import math
+import multiprocessing
+import struct
+from collections import namedtuple
+from itertools import count
+from datetime import datetime
+from threading import Event, Lock, Thread
+from time import monotonic, sleep, time
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple, \
+    Type
+from quantities import Quantity, amperes, cm, gauss
+from mr_freeze.deadlines import remaining
+from mr_freeze.exceptions import InstrumentWorkerError, TaskTimeoutError
+from mr_freeze.executors import instrument_key
+from mr_freeze.resources.abstract_store import Store, Variable
+from mr_freeze.resources.application_state import Current, MagneticField, \
+    LiquidHeliumLevel, LiquidNitrogenLevel
+from mr_freeze.samples import Reading, SampleRecord, SampleStream, \
+    samples as _samples
+from mr_freeze.tasks.make_measurement import MakeMeasurement
+from mr_freeze.tasks.report_variable_task import ReportVariableTask
+
+log = logging.getLogger(__name__)
+
+VARIABLES = MakeMeasurement.VARIABLES  # type: Tuple[Type[Variable], ...]
+
+UNITS = {
+    Current: amperes,
+    MagneticField: gauss,
+    LiquidHeliumLevel: cm,
+    LiquidNitrogenLevel: cm
+}  # type: Dict[Type[Variable], Quantity]
+
+
+class SampleRing(object):
+    """
+    A ring buffer of fixed-size sample records in shared memory, written by
+    one process and read by another. No lock is needed, since only the
+    writer moves the count of records written, and only the reader moves
+    the count of records read. A record is written before the count that
+    makes it visible. If the ring is full, new records are dropped and
+    counted in :attr:`dropped`.
+
+    Each record holds the index of the variable in ``VARIABLES``, whether
+    the read failed, the value in the variable's unit in ``UNITS``, and the
+    times at which it was read on the monotonic clock and the wall clock.
+    """
+    RECORD = struct.Struct('<iiddd')
+
+    _WRITTEN = 0
+    _READ = 1
+    _DROPPED = 2
+
+    def __init__(self, capacity: int=256, context: Any=multiprocessing):
+        """
+
+        :param capacity: The number of records the ring can hold
+        :param context: The multiprocessing context in which the shared
+            memory is made
+        """
+        self.capacity = capacity
+        self._counters = context.RawArray(ctypes.c_uint64, 3)
+        self._buffer = context.RawArray(
+            ctypes.c_char, capacity * self.RECORD.size
+        )
+
+    def put(
+            self,
+            variable_index: int,
+            value: float,
+            monotonic_time: float,
+            wall_clock: float,
+            failed: bool=False
+    ) -> bool:
+        """
+        Write a record. Must only be called by the writing process
+
+        :param variable_index: The index of the variable in ``VARIABLES``
+        :param value: The value that was read
+        :param monotonic_time: The time of the read on the monotonic clock
+        :param wall_clock: The time of the read, in seconds since the epoch
+        :param failed: ``True`` if the read failed
+        :return: ``True`` if the record was written, or ``False`` if the
+            ring was full
+        """
+        written = self._counters[self._WRITTEN]
+        if written - self._counters[self._READ] >= self.capacity:
+            self._counters[self._DROPPED] += 1
+            return False
+
+        self.RECORD.pack_into(
+            self._buffer, (written % self.capacity) * self.RECORD.size,
+            variable_index, int(failed), value, monotonic_time, wall_clock
+        )
+        self._counters[self._WRITTEN] = written + 1
+        return True
+
+    def take(self) -> List[Tuple[int, int, float, float, float]]:
+        """
+        Read the records written since the last call. Must only be called by
+        the reading process
+
+        :return: The records, oldest first
+        """
+        written = self._counters[self._WRITTEN]
+        read = self._counters[self._READ]
+
+        records = [
+            self.RECORD.unpack_from(
+                self._buffer, (index % self.capacity) * self.RECORD.size
+            ) for index in range(read, written)
+        ]
+        self._counters[self._READ] = written
+        return records
+
+    @property
+    def dropped(self) -> int:
+        """
+
+        :return: The number of records dropped because the ring was full
+        """
+        return self._counters[self._DROPPED]
+
+    def __len__(self) -> int:
+        return self._counters[self._WRITTEN] - self._counters[self._READ]
+
+    def __repr__(self) -> str:
+        return "%s(capacity=%d)" % (self.__class__.__name__, self.capacity)
+
+
+class WorkerSpec(namedtuple(
+    'WorkerSpec', ('name', 'adapter', 'settings', 'reports')
+)):
+    """
+    Describes the instrument that a worker runs. The worker makes an
+    ``adapter``, and sets each attribute in ``settings`` on it. ``reports``
+    holds the report tasks to run, each with the keyword arguments used to
+    make it and the time in seconds between its reads. Everything in the
+    spec is sent to the worker process, so it must be picklable
+    """
+    __slots__ = ()
+
+
+def adapter_settings(adapter: Any) -> Dict[str, Any]:
+    """
+
+    :param adapter: An adapter that has been set up in this process
+    :return: The value of each of the adapter's ``connection_settings``,
+        to be put in the spec of the worker that runs it
+    """
+    return {
+        name: getattr(adapter, name)
+        for name in getattr(adapter, 'connection_settings', ())
+    }
+
+
+def read_into_ring(report: ReportVariableTask, ring: SampleRing) -> None:
+    """
+
+    :param report: The report task that makes the read
+    :param ring: The ring to which the reading is written
+    """
+    variable = report.variable_type
+    try:
+        value = float(report.variable.rescale(UNITS[variable]))
+        failed = False
+    except Exception as error:
+        log.error("Reading %s failed: %r", variable.__name__, error)
+        value = float('nan')
+        failed = True
+
+    ring.put(VARIABLES.index(variable), value, monotonic(), time(), failed)
+
+
+def run_worker(spec: WorkerSpec, ring: SampleRing, commands: Any) -> None:
+    """
+    The main function of a worker process. Reads fall due on a drift-free
+    schedule, and commands are carried out between reads, so that the
+    instrument is only ever used by one thread. Like a lane of an
+    :class:`InstrumentAffineExecutor`, the worker waits for the adapter's
+    ``minimum_command_gap`` after each read or command before starting the
+    next one.
+
+    Commands are tuples of a sequence number, a kind, an attribute name and
+    arguments. The kind is ``'call'`` to call a method of the adapter,
+    ``'get'`` to get an attribute, or ``'set'`` to set one. Each reply
+    carries the sequence number of its command. ``None`` stops the worker.
+
+    :param spec: The instrument to run
+    :param ring: The ring to which readings are written
+    :param commands: The worker's end of the pipe on which commands arrive
+        and replies are sent
+    """
+    adapter = spec.adapter()
+    for name, value in spec.settings.items():
+        setattr(adapter, name, value)
+
+    reports = [
+        (report(adapter, None, **kwargs), interval)
+        for report, kwargs, interval in spec.reports
+    ]
+    due = [monotonic()] * len(reports)
+    gap = float(getattr(spec.adapter, 'minimum_command_gap', 0.0))
+    ready_at = monotonic()
+
+    try:
+        while True:
+            for index, (report, interval) in enumerate(reports):
+                now = monotonic()
+                if due[index] <= now:
+                    _wait_until(ready_at)
+                    read_into_ring(report, ring)
+                    ready_at = monotonic() + gap
+                    due[index] += interval * (
+                        math.floor((now - due[index]) / interval) + 1
+                    )
+
+            timeout = max(min(due) - monotonic(), 0) if due else None
+            if not commands.poll(timeout):
+                continue
+
+            try:
+                command = commands.recv()
+            except EOFError:
+                return
+            if command is None:
+                return
+            sequence, kind, name, args = command
+            _wait_until(ready_at)
+            commands.send(
+                (sequence,) + _carry_out(adapter, kind, name, args)
+            )
+            ready_at = monotonic() + gap
+    finally:
+        adapter.close()
+
+
+def _wait_until(ready_at: float) -> None:
+    """
+
+    :param ready_at: The time on the monotonic clock at which the
+        instrument is ready for its next exchange
+    """
+    delay = ready_at - monotonic()
+    if delay > 0:
+        sleep(delay)
+
+
+def _carry_out(
+        adapter: Any, kind: str, name: str, args: Sequence[Any]
+) -> Tuple[bool, Any]:
+    """
+
+    :param adapter: The adapter that carries out the command
+    :param kind: ``'call'``, ``'get'``, or ``'set'``
+    :param name: The name of the attribute
+    :param args: The arguments of the command
+    :return: ``True`` and the result, or ``False`` and the error
+    """
+    try:
+        if kind == 'call':
+            return True, getattr(adapter, name)(*args)
+        elif kind == 'get':
+            return True, getattr(adapter, name)
+        elif kind == 'set':
+            setattr(adapter, name, *args)
+            return True, None
+        raise ValueError("Unknown command %r" % kind)
+    except Exception as error:
+        return False, error
+
+
+class InstrumentWorker(object):
+    """
+    The GUI process's handle on one worker process. The worker process is
+    started with the ``spawn`` method, so that it does not inherit the
+    GUI's threads
+    """
+    def __init__(
+            self,
+            spec: WorkerSpec,
+            ring_capacity: int=256,
+            context: Any=None
+    ) -> None:
+        """
+
+        :param spec: The instrument that the worker runs
+        :param ring_capacity: The number of readings that the ring holds
+        :param context: The multiprocessing context in which the worker
+            runs. By default, this is the ``spawn`` context
+        """
+        self.spec = spec
+        self.context = multiprocessing.get_context('spawn') \
+            if context is None else context
+        self.ring = SampleRing(ring_capacity, self.context)
+        self.restarts = 0
+
+        self._process = None  # type: Optional[Any]
+        self._commands = None  # type: Optional[Any]
+        self._sequence = count()
+        self._lock = Lock()
+
+    @property
+    def is_alive(self) -> bool:
+        """
+
+        :return: ``True`` if the worker process is running
+        """
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """
+        Start the worker process
+        """
+        with self._lock:
+            commands, worker_end = self.context.Pipe()
+            self._process = self.context.Process(
+                target=run_worker, args=(self.spec, self.ring, worker_end),
+                name="mr-freeze-%s" % self.spec.name, daemon=True
+            )
+            self._process.start()
+            worker_end.close()
+            self._commands = commands
+
+    def restart(self) -> None:
+        """
+        Stop the worker process if it is still running, and start a new one
+        """
+        self.stop(timeout=0)
+        self.restarts += 1
+        self.start()
+
+    def stop(self, timeout: float=1) -> None:
+        """
+
+        :param timeout: The time in seconds to wait for the worker to stop
+            before it is terminated
+        """
+        with self._lock:
+            process, commands = self._process, self._commands
+            self._process = self._commands = None
+
+        if process is None:
+            return
+
+        try:
+            commands.send(None)
+        except (OSError, ValueError):
+            pass
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+        commands.close()
+
+    def call(self, kind: str, name: str, *args) -> Any:
+        """
+        Send a command to the worker, and wait for its reply. The wait is
+        no longer than the time left before the deadline of the calling
+        task. Replies to earlier commands whose callers stopped waiting are
+        thrown away
+
+        :param kind: ``'call'``, ``'get'``, or ``'set'``
+        :param name: The name of the adapter's attribute
+        :return: The result of the command
+        :raises: :exc:`InstrumentWorkerError` if the worker is not running,
+            or stopped before it replied. :exc:`TaskTimeoutError` if the
+            caller's deadline passed before the worker replied
+        """
+        with self._lock:
+            if self._commands is None:
+                raise InstrumentWorkerError(
+                    "The worker for %s is not running" % self.spec.name
+                )
+            sequence = next(self._sequence)
+            try:
+                self._commands.send((sequence, kind, name, args))
+                while True:
+                    if not self._commands.poll(remaining()):
+                        raise TaskTimeoutError(
+                            "The worker for %s did not answer %s in time" % (
+                                self.spec.name, name
+                            )
+                        )
+                    replied_to, succeeded, result = self._commands.recv()
+                    if replied_to == sequence:
+                        break
+                    log.debug("Threw away late reply to command %d of the "
+                              "worker for %s", replied_to, self.spec.name)
+            except (EOFError, OSError) as error:
+                raise InstrumentWorkerError(
+                    "The worker for %s stopped before it answered %s" % (
+                        self.spec.name, name
+                    )
+                ) from error
+
+        if not succeeded:
+            raise result
+        return result
+
+    def __repr__(self) -> str:
+        return "%s(spec=%r)" % (self.__class__.__name__, self.spec)
+
+
+class RemoteAdapter(object):
+    """
+    Stands in for an adapter that is run by a worker. Methods and properties
+    of the adapter are carried out by the worker. Settings from the worker's
+    spec and class attributes, such as ``minimum_command_gap``, are answered
+    without asking the worker.
+
+    Only properties of the adapter are set in the worker. A new value of a
+    setting is also kept in the spec, so that a restarted worker gets it.
+    Any other attribute is set on the stand-in itself.
+    """
+    def __init__(self, worker: InstrumentWorker) -> None:
+        """
+
+        :param worker: The worker that runs the adapter
+        """
+        object.__setattr__(self, 'worker', worker)
+
+    def interrupt(self) -> None:
+        """
+        Do nothing. A task waiting on the worker already stops waiting at its
+        deadline, and the worker's own read is not stopped
+        """
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        spec = self.worker.spec
+        if name in spec.settings:
+            return spec.settings[name]
+
+        attribute = getattr(spec.adapter, name)
+        if isinstance(attribute, property):
+            return self.worker.call('get', name)
+        if callable(attribute):
+            return lambda *args: self.worker.call('call', name, *args)
+        return attribute
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        spec = self.worker.spec
+        if not isinstance(getattr(spec.adapter, name, None), property):
+            object.__setattr__(self, name, value)
+            return
+
+        self.worker.call('set', name, value)
+        if name in getattr(spec.adapter, 'connection_settings', ()):
+            spec.settings[name] = value
+
+    def __repr__(self) -> str:
+        return "%s(worker=%r)" % (self.__class__.__name__, self.worker)
+
+
+class WorkerSupervisor(object):
+    """
+    Starts the workers, and runs the one consumer thread that drains their
+    rings into the store. A worker that has crashed is restarted, no more
+    often than once every ``restart_interval`` seconds
+    """
+    def __init__(
+            self,
+            workers: Sequence[InstrumentWorker],
+            store: Store,
+            samples: SampleStream=_samples,
+            poll_interval: float=0.1,
+            restart_interval: float=5.0
+    ) -> None:
+        """
+
+        :param workers: The workers to run
+        :param store: The store to which the readings are written
+        :param samples: The stream on which the readings are published
+        :param poll_interval: The time in seconds between drains of the
+            rings
+        :param restart_interval: The shortest time in seconds between
+            restarts of a worker
+        """
+        self.workers = tuple(workers)
+        self.store = store
+        self.samples = samples
+        self.poll_interval = poll_interval
+        self.restart_interval = restart_interval
+
+        self._last_started = {}  # type: Dict[InstrumentWorker, float]
+        self._stopped = Event()
+        self._thread = None  # type: Optional[Thread]
+
+    def start(self) -> None:
+        """
+        Start the workers and the consumer thread
+        """
+        for worker in self.workers:
+            worker.start()
+            self._last_started[worker] = monotonic()
+
+        self._stopped.clear()
+        self._thread = Thread(
+            target=self._consume, name="mr-freeze-worker-consumer",
+            daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop the consumer thread and the workers
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        for worker in self.workers:
+            worker.stop()
+
+    def drain(self) -> List[SampleRecord]:
+        """
+        Write the readings in each worker's ring to the store, and publish
+        them
+
+        :return: One record for each worker with new readings
+        """
+        records = []
+        for worker in self.workers:
+            source = instrument_key(RemoteAdapter(worker))
+            readings = [
+                self.reading(record, source) for record in worker.ring.take()
+            ]
+            if not readings:
+                continue
+
+            for reading in readings:
+                if reading.ok:
+                    self.store[reading.variable].value = reading.value
+
+            record = SampleRecord(readings)
+            self.samples.publish(record)
+            records.append(record)
+        return records
+
+    def check_workers(self) -> None:
+        """
+        Restart the workers that have crashed
+        """
+        now = monotonic()
+        for worker in self.workers:
+            if worker.is_alive:
+                continue
+            if now - self._last_started.get(worker, float('-inf')) < \
+                    self.restart_interval:
+                continue
+
+            log.error("Worker for %s stopped. Restarting it",
+                      worker.spec.name)
+            worker.restart()
+            self._last_started[worker] = now
+
+    @staticmethod
+    def reading(
+            record: Tuple[int, int, float, float, float],
+            source: Optional[Hashable]=None
+    ) -> Reading:
+        """
+
+        :param record: A record taken from a ring
+        :param source: The key of the instrument whose worker filled the
+            ring
+        :return: The reading in the record
+        """
+        index, failed, value, monotonic_time, wall_clock = record
+        variable = VARIABLES[index]
+
+        if failed:
+            return Reading(
+                variable, None, monotonic_time,
+                datetime.fromtimestamp(wall_clock),
+                "The worker could not read %s" % variable.__name__, source
+            )
+        return Reading(
+            variable, value * UNITS[variable], monotonic_time,
+            datetime.fromtimestamp(wall_clock), None, source
+        )
+
+    def _consume(self) -> None:
+        """
+        Drain the rings and look after the workers until stopped
+        """
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.drain()
+                self.check_workers()
+            except Exception as error:
+                log.error("Consuming worker readings threw %r", error)
+
+    def __repr__(self) -> str:
+        return "%s(workers=%r)" % (self.__class__.__name__, self.workers)
@@ -0,0 +1,20 @@
+"""
+Contains microbenchmarks. These are not run as part of the unit test suite,
+and are meant to be run by hand when changing performance-sensitive code.
+They are skipped unless the ``MR_FREEZE_BENCHMARKS`` environment variable is
+set, and they log their results at the ``INFO`` level. Run them with
+
+.. code-block:: bash
+
+    MR_FREEZE_BENCHMARKS=1 python -m pytest tests/benchmarks \\
+        --log-cli-level=INFO
+"""
+import os
+import unittest
+
+ENVIRONMENT_VARIABLE = "MR_FREEZE_BENCHMARKS"
+
+benchmark = unittest.skipUnless(
+    os.environ.get(ENVIRONMENT_VARIABLE),
+    "Set %s=1 to run the benchmarks" % ENVIRONMENT_VARIABLE
+)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8
+"""
+Stress test for several Cryomagnetics LM510 level meters measuring at the
+same time. Each simulated level meter takes ``QUERY_LATENCY`` seconds to
+answer a query. Since every level meter has its own locks, the number of
+measurements made per second should grow with the number of level meters.
+Run with
+
+.. code-block:: bash
+
+    MR_FREEZE_BENCHMARKS=1 python -m pytest \\
+        tests/benchmarks/test_lm510_parallel_measurement.py \\
+        --log-cli-level=INFO
+"""
+import logging
+import unittest
+from concurrent.futures import ThreadPoolExecutor, wait
+from time import sleep, monotonic
+from mr_freeze.devices.cryomagnetics_lm510 import CryomagneticsLM510
+from tests.benchmarks import benchmark
+
+log = logging.getLogger(__name__)
+
+QUERY_LATENCY = 0.01
+MEASUREMENTS_PER_METER = 20
+METER_COUNTS = (1, 2, 4, 8)
+
+
+class SimulatedLevelMeter(CryomagneticsLM510):
+    """
+    A level meter that answers every query after a fixed delay. Channel 2
+    always has data ready, and always reads 50 cm.
+    """
+    RESPONSES = {
+        "*STB?": "4",
+        "MEAS? 2": "50.0 cm"
+    }
+
+    def __init__(self, filelike):
+        super().__init__(filelike)
+        self.status_byte_freshness = 0
+        self._last_command = None
+
+    def write(self, msg):
+        self._last_command = msg.rstrip(self.terminator)
+
+    def read(self, size=-1):
+        sleep(QUERY_LATENCY)
+        command = self._last_command
+        return "%s\r\n%s\r\n" % (command, self.RESPONSES[command])
+
+
+@benchmark
+class TestParallelMeasurement(unittest.TestCase):
+    """
+    Measures the throughput of several level meters measuring in parallel
+    """
+    def test_throughput_scales_with_meters(self):
+        throughput = {
+            meter_count: self._throughput(meter_count)
+            for meter_count in METER_COUNTS
+        }
+
+        for meter_count in METER_COUNTS:
+            log.info("%d meters: %.1f measurements/s",
+                     meter_count, throughput[meter_count])
+
+        self.assertGreater(
+            throughput[METER_COUNTS[-1]],
+            0.5 * METER_COUNTS[-1] * throughput[METER_COUNTS[0]]
+        )
+
+    @staticmethod
+    def _throughput(meter_count):
+        meters = [
+            SimulatedLevelMeter.open_test() for _ in range(meter_count)
+        ]
+
+        def measure(meter):
+            for _ in range(MEASUREMENTS_PER_METER):
+                meter[1].measurement
+
+        with ThreadPoolExecutor(max_workers=meter_count) as executor:
+            started_at = monotonic()
+            wait([executor.submit(measure, meter) for meter in meters])
+            elapsed = monotonic() - started_at
+
+        return meter_count * MEASUREMENTS_PER_METER / elapsed
@@ -0,0 +1,125 @@
+# -*- coding: utf-8
+"""
+Compares the single-pass parser
+:meth:`~AbstractCryomagneticsDevice.parse_query` in
+:mod:`mr_freeze.devices.abstract_cryomagnetics_device` with the regular
+expression parser that it replaced. Run with
+
+.. code-block:: bash
+
+    MR_FREEZE_BENCHMARKS=1 python -m pytest \\
+        tests/benchmarks/test_parse_query.py --log-cli-level=INFO
+"""
+import logging
+import re
+import timeit
+import unittest
+from mr_freeze.exceptions import NoEchoedCommandFoundError
+from tests.benchmarks import benchmark
+from tests.unit.test_devices.test_abstract_cryomagnetics_device import \
+    ConcreteCryomagneticsDevice
+
+log = logging.getLogger(__name__)
+
+BUFFER_SIZE = 1000
+REPETITIONS = 5000
+
+COMMAND = "IOUT?"
+
+
+def regex_parse_query(command, response):
+    """
+    The parser that was used before the single-pass parser. Two regular
+    expressions are built for every response.
+
+    :param str command: The command which was sent to the device
+    :param str response: The response from the device
+    :return: The response from the device, or None if the response is none
+    """
+    echoed_command = re.search(
+        r"^{0}(?={1})".format(re.escape(command), '\r\n'),
+        response
+    )
+    response_from_device = re.search(
+        r"(?<={0}).*(?={0}$)".format('\r\n'),
+        response
+    )
+
+    if echoed_command is None:
+        raise NoEchoedCommandFoundError(
+            "Expected Command: {0}; Device Response: {1}".format(
+                command, response
+            )
+        )
+
+    if response_from_device is None:
+        return None
+
+    return response_from_device.group(0)
+
+
+def _padded_response(echo, terminator):
+    """
+
+    :return: A frame of ``BUFFER_SIZE`` characters, with the response line
+        padded out to fill the buffer
+    """
+    padding = BUFFER_SIZE - len(echo) - len("A") - len(terminator)
+    return echo + "1" * padding + "A" + terminator
+
+
+@benchmark
+class TestParseQueryBenchmark(unittest.TestCase):
+    """
+    Base class for the benchmarks
+    """
+    response = None
+
+    def setUp(self):
+        self.device = ConcreteCryomagneticsDevice()
+
+    def test_benchmark(self):
+        if self.response is None:
+            self.skipTest("No response to benchmark")
+
+        self.assertEqual(BUFFER_SIZE, len(self.response))
+        self.assertEqual(
+            self._run(regex_parse_query), self._run(self.device.parse_query)
+        )
+
+        regex_time = self._time(regex_parse_query)
+        single_pass_time = self._time(self.device.parse_query)
+        binary_time = self._time(
+            self.device.parse_query, memoryview(self.response.encode())
+        )
+
+        log.info(
+            "%s: regex %.2f us, single pass %.2f us, memoryview %.2f us",
+            self.__class__.__name__,
+            1e6 * regex_time / REPETITIONS,
+            1e6 * single_pass_time / REPETITIONS,
+            1e6 * binary_time / REPETITIONS
+        )
+
+    def _run(self, parser, response=None):
+        try:
+            return parser(COMMAND, response or self.response)
+        except NoEchoedCommandFoundError as error:
+            return type(error)
+
+    def _time(self, parser, response=None):
+        return timeit.timeit(
+            lambda: self._run(parser, response), number=REPETITIONS
+        )
+
+
+class TestNormalResponse(TestParseQueryBenchmark):
+    response = _padded_response("IOUT?\r\n", "\r\n")
+
+
+class TestTruncatedResponse(TestParseQueryBenchmark):
+    response = _padded_response("IOUT?\r\n", "xx")
+
+
+class TestGarbageResponse(TestParseQueryBenchmark):
+    response = "\x07" * BUFFER_SIZE
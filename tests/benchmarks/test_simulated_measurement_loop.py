@@ -0,0 +1,123 @@
+# -*- coding: utf-8
+"""
+Benchmark for the measurement loop running against the instrument
+simulators. Every simulator sends its replies at roughly 9600 baud. The time
+taken for all the variables of one iteration of the loop to reach the store
+is reported, both for a plain thread pool and for an executor with a lane
+for each instrument. Run with
+
+.. code-block:: bash
+
+    MR_FREEZE_BENCHMARKS=1 python -m pytest \\
+        tests/benchmarks/test_simulated_measurement_loop.py \\
+        --log-cli-level=INFO
+"""
+import logging
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Condition
+from time import monotonic
+from mr_freeze.devices.connection_registry import ConnectionRegistry
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
+from mr_freeze.devices.lakeshore_475 import Lakeshore475
+from mr_freeze.executors import InstrumentAffineExecutor
+from mr_freeze.measurement_loop import MeasurementLoop
+from mr_freeze.simulators.cryomagnetics import Cryomagnetics4GSimulator, \
+    CryomagneticsLM510Simulator
+from mr_freeze.simulators.lakeshore_475 import Lakeshore475Simulator
+from tests.benchmarks import benchmark
+
+log = logging.getLogger(__name__)
+
+PER_BYTE_LATENCY = 1.0 / 960
+ITERATIONS = 5
+VARIABLES_PER_ITERATION = 4
+
+
+class RecordingStore(object):
+    """
+    A stand-in for the application store that counts the values written
+    to it
+    """
+    class _Variable(object):
+        def __init__(self, store):
+            self._store = store
+
+        @property
+        def value(self):
+            return None
+
+        @value.setter
+        def value(self, _):
+            with self._store.written:
+                self._store.writes += 1
+                self._store.written.notify_all()
+
+    def __init__(self):
+        self.writes = 0
+        self.written = Condition()
+
+    def __getitem__(self, _):
+        return self._Variable(self)
+
+    def wait_for(self, writes, timeout):
+        with self.written:
+            return self.written.wait_for(
+                lambda: self.writes >= writes, timeout
+            )
+
+
+@benchmark
+class TestSimulatedMeasurementLoop(unittest.TestCase):
+    def setUp(self):
+        self.simulators = (
+            Cryomagnetics4GSimulator(per_byte_latency=PER_BYTE_LATENCY),
+            CryomagneticsLM510Simulator(per_byte_latency=PER_BYTE_LATENCY),
+            Lakeshore475Simulator(per_byte_latency=PER_BYTE_LATENCY)
+        )
+        for simulator in self.simulators:
+            simulator.start()
+
+        registry = ConnectionRegistry()
+        self.adapters = (
+            Cryomagnetics4G(registry=registry),
+            CryomagneticsLM510(registry=registry),
+            Lakeshore475(registry=registry)
+        )
+        for adapter, simulator in zip(self.adapters, self.simulators):
+            adapter.port_name = simulator.port_name
+            adapter.open()
+
+    def tearDown(self):
+        for adapter in self.adapters:
+            adapter.close()
+        for simulator in self.simulators:
+            simulator.stop()
+
+    def test_thread_pool(self):
+        self._report_iteration_time(ThreadPoolExecutor(max_workers=8))
+
+    def test_instrument_affine_executor(self):
+        self._report_iteration_time(InstrumentAffineExecutor())
+
+    def _report_iteration_time(self, executor):
+        store = RecordingStore()
+        power_supply, level_meter, magnetometer = self.adapters
+
+        with executor:
+            loop = MeasurementLoop(
+                power_supply, level_meter, magnetometer, store, executor, 1
+            )
+            durations = []
+            for iteration in range(1, ITERATIONS + 1):
+                started_at = monotonic()
+                loop.run_single_iteration()
+                self.assertTrue(store.wait_for(
+                    iteration * VARIABLES_PER_ITERATION, timeout=30
+                ))
+                durations.append(monotonic() - started_at)
+
+        log.info("%s iteration time: mean %.3f s, max %.3f s",
+                 executor.__class__.__name__,
+                 sum(durations) / len(durations), max(durations))
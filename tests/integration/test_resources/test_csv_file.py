@@ -7,8 +7,12 @@ import unittest.mock as mock
 import os
 import csv
 from concurrent.futures import Executor
-from mr_freeze.resources.application_state import Store, LoggingInterval
-from mr_freeze.resources.csv_file import CSVLogger
+from datetime import datetime
+from mr_freeze.resources.application_state import Store, LoggingInterval, \
+    Current
+from mr_freeze.resources.csv_file import CSVLogger, CurrentDate
+from mr_freeze.samples import Reading, SampleRecord, SampleStream
+from mr_freeze.scheduler import Scheduler
 
 
 class TestCSVLogger(unittest.TestCase):
@@ -16,9 +20,10 @@ class TestCSVLogger(unittest.TestCase):
         self.file_path = os.path.join(os.curdir, 'file.csv')
         self.executor = mock.MagicMock(spec=Executor)  # type: Executor
         self.store = Store(self.executor)
-        self.scheduler = mock.MagicMock()
+        self.scheduler = mock.MagicMock(spec=Scheduler)
+        self.samples = SampleStream()
         self.logger = CSVLogger(
-            self.store, self.file_path, self.executor
+            self.store, self.file_path, self.executor, self.samples
         )
 
     def tearDown(self):
@@ -29,10 +34,10 @@ class TestCSVLogger(unittest.TestCase):
 class TestStartLogging(TestCSVLogger):
     def test_start_logging(self):
         self.logger.start_logging(self.scheduler)
-        self.assertTrue(
-            self.scheduler.every(self.store[LoggingInterval].value).minutes.do(
-                self.logger.write_values
-            ).tag.called
+        self.scheduler.every.assert_called_once_with(
+            float(self.store[LoggingInterval].value) * 60,
+            self.executor.submit, self.logger.write_values,
+            tag=self.logger._logger_tag
         )
 
 
@@ -69,3 +74,58 @@ class TestWriteValues(TestCSVLogger):
         self.logger.write_values()
 
         self.assertTrue(os.path.isfile(self.file_path))
+
+    def test_values_from_sample_records(self):
+        self.logger.start_logging(self.scheduler)
+        reading = Reading.now(Current, 2.5)
+        self.samples.publish(SampleRecord((reading,)))
+
+        self.logger.write_values()
+
+        with open(self.file_path) as file:
+            row, = csv.DictReader(file)
+
+        self.assertEqual(
+            "2.5", row[self.logger.VARIABLE_TITLES[Current]]
+        )
+
+
+class TestRow(unittest.TestCase):
+    """
+    Tests the row built from the sample records, with a stand-in for the
+    store
+    """
+    def setUp(self):
+        self.store = mock.MagicMock()
+        self.samples = SampleStream()
+        self.logger = CSVLogger(
+            self.store, 'file.csv', mock.MagicMock(spec=Executor),
+            self.samples
+        )
+        self.logger.start_logging(mock.MagicMock(spec=Scheduler))
+
+    def tearDown(self):
+        self.logger.stop_logging(mock.MagicMock(spec=Scheduler))
+
+    def _publish(self, value, wall_clock):
+        self.samples.publish(SampleRecord((
+            Reading(Current, value, 0.0, wall_clock, None),
+        )))
+
+    def test_dated_by_newest_reading(self):
+        self._publish(1.0, datetime(2017, 1, 1, 12, 0, 0))
+        self._publish(2.0, datetime(2017, 1, 1, 12, 0, 5))
+
+        variables = self.logger._variables
+
+        self.assertEqual("2017-01-01T12:00:05", variables[CurrentDate])
+        self.assertEqual(2.0, variables[Current])
+
+    @mock.patch("mr_freeze.resources.csv_file.datetime")
+    def test_dated_now_without_readings(self, clock):
+        clock.now.return_value = datetime(2017, 1, 1, 13, 0, 0)
+
+        variables = self.logger._variables
+
+        self.assertEqual("2017-01-01T13:00:00", variables[CurrentDate])
+        self.assertIs(self.store[Current].value, variables[Current])
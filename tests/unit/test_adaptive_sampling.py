@@ -0,0 +1,109 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.adaptive_sampling`
+"""
+import unittest
+from quantities import amperes, gauss
+from mr_freeze.adaptive_sampling import AdaptiveSampling
+from mr_freeze.resources.application_state import Current, MagneticField, \
+    LiquidHeliumLevel
+from mr_freeze.samples import Reading, SampleRecord
+
+
+class FakeClock(object):
+    def __init__(self) -> None:
+        self.time = 100.0
+
+    def __call__(self) -> float:
+        return self.time
+
+
+def record(variable, value, when: float) -> SampleRecord:
+    return SampleRecord((Reading(variable, value, when, None, None),))
+
+
+class TestAdaptiveSampling(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sampling = AdaptiveSampling(
+            fast_interval=1.0, settle_time=30.0, decay_time=10.0,
+            clock=self.clock
+        )
+
+
+class TestInterval(TestAdaptiveSampling):
+    def test_baseline_while_holding(self):
+        self.assertEqual(60, self.sampling.interval(Current, 60))
+
+    def test_variable_not_adapted(self):
+        self.sampling.sweep_started()
+        self.assertEqual(
+            300, self.sampling.interval(LiquidHeliumLevel, 300)
+        )
+
+    def test_fast_after_sweep_started(self):
+        self.sampling.sweep_started()
+        self.assertEqual(1.0, self.sampling.interval(Current, 60))
+        self.assertEqual(1.0, self.sampling.interval(MagneticField, 60))
+
+    def test_minimum_command_gap(self):
+        self.sampling.fast_interval = 0.1
+        self.sampling.sweep_started()
+        self.assertEqual(0.3, self.sampling.interval(Current, 60, 0.3))
+
+    def test_baseline_shorter_than_fast_interval(self):
+        self.sampling.sweep_started()
+        self.assertEqual(0.5, self.sampling.interval(Current, 0.5))
+
+    def test_decay(self):
+        self.sampling.sweep_started()
+        self.clock.time += 30
+        self.assertEqual(2.0, self.sampling.interval(Current, 60))
+        self.clock.time += 10
+        self.assertEqual(4.0, self.sampling.interval(Current, 60))
+        self.clock.time += 1000
+        self.assertEqual(60, self.sampling.interval(Current, 60))
+
+    def test_intervals(self):
+        self.sampling.sweep_started()
+        self.assertEqual(
+            {Current: 1.0, LiquidHeliumLevel: 300},
+            self.sampling.intervals(
+                {Current: 60, LiquidHeliumLevel: 300}, {Current: 0.3}
+            )
+        )
+
+
+class TestObserve(TestAdaptiveSampling):
+    def test_fast_when_changing(self):
+        self.sampling.observe([
+            record(Current, 1.0 * amperes, 100.0),
+            record(Current, 1.5 * amperes, 101.0)
+        ])
+        self.assertEqual(1.0, self.sampling.interval(Current, 60))
+        self.assertEqual(60, self.sampling.interval(MagneticField, 60))
+
+    def test_slow_when_steady(self):
+        self.sampling.observe([
+            record(MagneticField, 10.0 * gauss, 100.0),
+            record(MagneticField, 10.1 * gauss, 101.0)
+        ])
+        self.assertEqual(60, self.sampling.interval(MagneticField, 60))
+
+    def test_settles_after_last_change(self):
+        self.sampling.observe([
+            record(Current, 1.0 * amperes, 100.0),
+            record(Current, 2.0 * amperes, 110.0)
+        ])
+        self.clock.time = 139.0
+        self.assertEqual(1.0, self.sampling.interval(Current, 60))
+        self.clock.time = 140.0
+        self.assertEqual(2.0, self.sampling.interval(Current, 60))
+
+    def test_failed_readings_ignored(self):
+        self.sampling.observe([
+            record(Current, 1.0 * amperes, 100.0),
+            SampleRecord((Reading.failed(Current, IOError("No reply")),)),
+            record(Current, 1.0 * amperes, 101.0)
+        ])
+        self.assertEqual(60, self.sampling.interval(Current, 60))
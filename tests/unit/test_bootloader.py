@@ -4,8 +4,13 @@ Contains unit tests for the bootloader
 """
 import unittest
 import unittest.mock as mock
+from quantities import amperes
 from mr_freeze.measurement_loop import MeasurementLoop
 from mr_freeze.bootloader import Application
+from mr_freeze.overrun import OverrunPolicy
+from mr_freeze.resources.application_state import LiquidHeliumLevel
+from mr_freeze.sweep_limits import SweepLimitWriter
+from mr_freeze.workers import RemoteAdapter
 
 
 class TestApplication(unittest.TestCase):
@@ -36,7 +41,10 @@ class TestStartLoop(TestApplication):
                 power_supply=self.app._power_supply,
                 store=self.app._store,
                 executor=self.app._executor,
-                sample_interval_in_seconds=10
+                sample_interval_in_seconds=self.app._sample_interval,
+                sample_intervals=self.app._sample_intervals,
+                overrun_guard=mock.ANY,
+                sampling=self.app._sampling
             ),
             self.task_builder.call_args
         )
@@ -44,3 +52,53 @@ class TestStartLoop(TestApplication):
         self.assertTrue(
             self.task_builder().run.called
         )
+
+
+class TestSampleIntervals(unittest.TestCase):
+    def test_interval_from_command_line(self):
+        app = Application(("--liquid-helium-sample-interval=300",))
+        self.assertEqual(300, app._sample_intervals[LiquidHeliumLevel])
+
+
+class TestOverrunGuard(unittest.TestCase):
+    def test_policy_from_command_line(self):
+        app = Application(("--overrun-policy=queue", "--max-queued=3"))
+        self.assertEqual(OverrunPolicy.QUEUE, app._overrun_guard.policy)
+        self.assertEqual(3, app._overrun_guard.max_queued)
+
+
+class TestIsolateInstruments(unittest.TestCase):
+    def test_threads_by_default(self):
+        app = Application(())
+        self.assertIsNone(app._supervisor)
+
+    def test_worker_for_each_instrument(self):
+        app = Application(("--isolate-instruments",))
+        self.assertEqual(3, len(app._supervisor.workers))
+        self.assertIsInstance(app._power_supply, RemoteAdapter)
+
+    def test_worker_gets_connection_settings(self):
+        app = Application(("--isolate-instruments",))
+        gaussmeter = app._supervisor.workers[2]
+        self.assertEqual(
+            {"port_name", "address"}, set(gaussmeter.spec.settings)
+        )
+
+
+class TestSweepLimits(TestApplication):
+    def setUp(self):
+        TestApplication.setUp(self)
+        self.app._sweep_limits = mock.MagicMock(spec=SweepLimitWriter)
+        self.current = 1 * amperes
+
+    def test_upper_change_written(self):
+        self.app._handle_upper_sweep_current_change(self.current)
+        self.app._sweep_limits.set_upper.assert_called_once_with(
+            self.current
+        )
+
+    def test_lower_change_written(self):
+        self.app._handle_lower_sweep_current_change(self.current)
+        self.app._sweep_limits.set_lower.assert_called_once_with(
+            self.current
+        )
@@ -1,5 +1,6 @@
+import argparse
 import unittest
-from mr_freeze.cli_argument_parser import parser
+from mr_freeze.cli_argument_parser import parser, positive_float
 
 
 class TestArgumentParser(unittest.TestCase):
@@ -13,3 +14,12 @@ class TestArgumentParser(unittest.TestCase):
         self.assertIsNotNone(
             result.gaussmeter_address
         )
+
+    def test_sample_interval(self):
+        result = parser.parse_args(["--current-sample-interval=2.5"])
+        self.assertEqual(2.5, result.current_sample_interval)
+
+    def test_sample_interval_must_be_positive(self):
+        for interval in ("0", "-1", "nan", "never"):
+            with self.assertRaises(argparse.ArgumentTypeError):
+                positive_float(interval)
@@ -8,6 +8,7 @@ import os
 from typing import Mapping
 from mr_freeze.config_file_parser import ConfigFileParser
 from mr_freeze.exceptions import BadConfigParameter
+from mr_freeze.overrun import OverrunPolicy
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
 
 
@@ -253,3 +254,80 @@ class TestTaskTimeout(OverloadedBootLoaderTestCase):
             BadConfigParameter,
             lambda: self.loader.task_timeout
         )
+
+
+class TestVariableSampleInterval(OverloadedBootLoaderTestCase):
+    def test_not_in_file(self):
+        self.assertIsNone(self.loader.liquid_helium_sample_interval)
+
+    def test_interval(self):
+        self.parameters["CURRENT_SAMPLE_INTERVAL"] = "0.5"
+        self.assertEqual(0.5, self.loader.current_sample_interval)
+
+    def test_bad_interval(self):
+        self.parameters["MAGNETIC_FIELD_SAMPLE_INTERVAL"] = "not a number"
+        self.assertRaises(
+            BadConfigParameter,
+            lambda: self.loader.magnetic_field_sample_interval
+        )
+
+    def test_interval_not_positive(self):
+        self.parameters["LIQUID_NITROGEN_SAMPLE_INTERVAL"] = "0"
+        self.assertRaises(
+            BadConfigParameter,
+            lambda: self.loader.liquid_nitrogen_sample_interval
+        )
+
+
+class TestSweepSampleInterval(OverloadedBootLoaderTestCase):
+    def test_not_in_file(self):
+        self.assertIsNone(self.loader.sweep_sample_interval)
+
+    def test_interval(self):
+        self.parameters["SWEEP_SAMPLE_INTERVAL"] = "2"
+        self.assertEqual(2.0, self.loader.sweep_sample_interval)
+
+
+class TestOverrunPolicy(OverloadedBootLoaderTestCase):
+    def test_default(self):
+        self.assertEqual(OverrunPolicy.SKIP, self.loader.overrun_policy)
+
+    def test_policy(self):
+        self.parameters["OVERRUN_POLICY"] = "Coalesce"
+        self.assertEqual(OverrunPolicy.COALESCE, self.loader.overrun_policy)
+
+    def test_bad_policy(self):
+        self.parameters["OVERRUN_POLICY"] = "ignore"
+        self.assertRaises(
+            BadConfigParameter, lambda: self.loader.overrun_policy
+        )
+
+
+class TestOverrunLimits(OverloadedBootLoaderTestCase):
+    def test_default(self):
+        self.assertEqual(1, self.loader.max_in_flight)
+
+    def test_limit(self):
+        self.parameters["MAX_QUEUED_MEASUREMENTS"] = "4"
+        self.assertEqual(4, self.loader.max_queued)
+
+    def test_limit_not_positive(self):
+        self.parameters["MAX_IN_FLIGHT_PER_INSTRUMENT"] = "0"
+        self.assertRaises(
+            BadConfigParameter, lambda: self.loader.max_in_flight
+        )
+
+
+class TestIsolateInstruments(OverloadedBootLoaderTestCase):
+    def test_default(self):
+        self.assertFalse(self.loader.isolate_instruments)
+
+    def test_yes(self):
+        self.parameters["ISOLATE_INSTRUMENTS"] = "Yes"
+        self.assertTrue(self.loader.isolate_instruments)
+
+    def test_bad_value(self):
+        self.parameters["ISOLATE_INSTRUMENTS"] = "sometimes"
+        self.assertRaises(
+            BadConfigParameter, lambda: self.loader.isolate_instruments
+        )
@@ -0,0 +1,45 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.deadlines`
+"""
+import unittest
+from threading import Thread
+from mr_freeze.deadlines import check_deadline, current_deadline, \
+    deadline_scope, remaining, watchdog
+from mr_freeze.exceptions import TaskTimeoutError
+
+
+class TestDeadlineScope(unittest.TestCase):
+    def test_no_deadline(self):
+        self.assertIsNone(current_deadline())
+        self.assertIsNone(remaining())
+        check_deadline()
+
+    def test_deadline_restored(self):
+        with deadline_scope(1.0):
+            with deadline_scope(2.0):
+                self.assertEqual(2.0, current_deadline())
+            self.assertEqual(1.0, current_deadline())
+        self.assertIsNone(current_deadline())
+
+    def test_deadline_per_thread(self):
+        seen = []
+        thread = Thread(target=lambda: seen.append(current_deadline()))
+
+        with deadline_scope(1.0):
+            thread.start()
+            thread.join()
+
+        self.assertEqual([None], seen)
+
+
+class TestCheckDeadline(unittest.TestCase):
+    def test_before_deadline(self):
+        with deadline_scope(watchdog.clock() + 60):
+            check_deadline()
+            self.assertGreater(remaining(), 0)
+
+    def test_after_deadline(self):
+        with deadline_scope(watchdog.clock() - 1):
+            with self.assertRaises(TaskTimeoutError):
+                check_deadline("read")
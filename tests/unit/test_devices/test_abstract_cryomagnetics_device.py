@@ -5,6 +5,11 @@ Contains unit tests for :mod:`mr_freeze.devices.abstract_cryomagnetics_device`
 import unittest
 import unittest.mock as mock
 from threading import Lock
+from time import sleep
+from mr_freeze.deadlines import deadline_scope, watchdog
+from mr_freeze.exceptions import NoEchoedCommandFoundError, \
+    DeviceBusyError, TaskTimeoutError
+from mr_freeze.metrics import LatencyHistogram, CommandMetrics
 from mr_freeze.devices.abstract_cryomagnetics_device import \
     AbstractCryomagneticsDevice
 
@@ -23,7 +28,9 @@ class ConcreteCryomagneticsDevice(AbstractCryomagneticsDevice):
     def __init__(self):
         self._querying_lock = mock.MagicMock(spec=Lock().__class__)
         self._filelike = mock.MagicMock()
-        pass
+        self.lock_wait_time = LatencyHistogram()
+        self.lock_hold_time = LatencyHistogram()
+        self.command_metrics = CommandMetrics()
 
     def read(self, *args, **kwargs):
         """
@@ -102,3 +109,250 @@ class TestParseQuery(TestAbstractCryomagneticsDevice):
 
         with self.assertRaises(RuntimeError):
             self.device.parse_query(self.command, data_to_read)
+
+
+class ChunkedCryomagneticsDevice(ConcreteCryomagneticsDevice):
+    """
+    A device that returns the data to be read in chunks, in the way that a
+    serial port returns whatever characters have arrived before the read
+    returns
+    """
+    def __init__(self, chunks):
+        ConcreteCryomagneticsDevice.__init__(self)
+        self.chunks = list(chunks)
+        self.requested_sizes = []
+
+    def read(self, size=-1):
+        """
+        Return the next chunk, or an empty string if the device has nothing
+        more to say
+        """
+        self.was_read_called = True
+        self.requested_sizes.append(size)
+        if not self.chunks:
+            return ''
+        return self.chunks.pop(0)
+
+
+class TestReadFrame(unittest.TestCase):
+    """
+    Contains unit tests for the frame-aware reader
+    """
+    def test_partial_reads(self):
+        device = ChunkedCryomagneticsDevice(
+            ("IO", "UT?\r", "\n", "1", "0.0A", "\r", "\n", "ignored")
+        )
+        self.assertEqual("10.0A", device.query("IOUT?"))
+        self.assertIn("ignored", device.chunks)
+
+    def test_echo_read_in_one_call(self):
+        device = ChunkedCryomagneticsDevice(("IOUT?\r\n", "1\r\n"))
+        device.query("IOUT?")
+        self.assertEqual(len("IOUT?\r\n"), device.requested_sizes[0])
+
+    def test_leftover_characters_start_next_frame(self):
+        device = ChunkedCryomagneticsDevice(
+            ("ULIM?\r\n1.0A\r\nLLIM?\r\n", "0.5A\r\n")
+        )
+        self.assertEqual("1.0A", device.query("ULIM?"))
+        self.assertEqual("0.5A", device.query("LLIM?"))
+
+    def test_stale_characters_discarded(self):
+        device = ChunkedCryomagneticsDevice(
+            ("3.0A\r\nIOUT?\r\n", "2.0A\r\n")
+        )
+        self.assertEqual("2.0A", device.query("IOUT?"))
+
+    def test_command_without_response(self):
+        device = ChunkedCryomagneticsDevice(("REMOTE\r\n", "unexpected"))
+        self.assertIsNone(device.query("REMOTE"))
+        self.assertEqual(1, len(device.requested_sizes))
+
+    def test_timeout(self):
+        device = ChunkedCryomagneticsDevice(("IOUT?\r\n", "1.0"))
+        self.assertIsNone(device.query("IOUT?"))
+
+    def test_bad_echo(self):
+        device = ChunkedCryomagneticsDevice(("garbage",))
+        with self.assertRaises(NoEchoedCommandFoundError):
+            device.query("IOUT?")
+
+    def test_maximum_message_size(self):
+        device = ChunkedCryomagneticsDevice(("x",) * 1000)
+        with self.assertRaises(NoEchoedCommandFoundError):
+            device.query("IOUT?")
+        self.assertLessEqual(
+            len(device.requested_sizes), device.MAXIMUM_MESSAGE_SIZE
+        )
+
+    def test_latency_recorded(self):
+        device = ChunkedCryomagneticsDevice(("IOUT?\r\n", "1.0A\r\n"))
+        device.query("IOUT?")
+        self.assertGreaterEqual(device.last_query_latency, 0)
+
+
+class TestParseQueryFormats(TestAbstractCryomagneticsDevice):
+    """
+    Tests that the parser accepts text and bytes-like responses, and that
+    it handles the edge cases of the echo framing
+    """
+    command = "IOUT?"
+
+    def test_text(self):
+        self.assertEqual(
+            "1.0A", self.device.parse_query(self.command, "IOUT?\r\n1.0A\r\n")
+        )
+
+    def test_bytes(self):
+        self.assertEqual(
+            "1.0A", self.device.parse_query(self.command, b"IOUT?\r\n1.0A\r\n")
+        )
+
+    def test_memoryview(self):
+        response = memoryview(bytearray(b"IOUT?\r\n1.0A\r\n"))
+        self.assertEqual(
+            "1.0A", self.device.parse_query(self.command, response)
+        )
+
+    def test_empty_response(self):
+        self.assertEqual(
+            "", self.device.parse_query(self.command, "IOUT?\r\n\r\n")
+        )
+
+    def test_echo_only(self):
+        self.assertIsNone(self.device.parse_query(self.command, "IOUT?\r\n"))
+
+    def test_truncated_response(self):
+        self.assertIsNone(
+            self.device.parse_query(self.command, "IOUT?\r\n1.0")
+        )
+
+    def test_last_line_returned(self):
+        self.assertEqual(
+            "2.0A",
+            self.device.parse_query(self.command, "IOUT?\r\n1.0A\r\n2.0A\r\n")
+        )
+
+    def test_bad_echo_bytes(self):
+        with self.assertRaises(NoEchoedCommandFoundError):
+            self.device.parse_query(self.command, b"LLIM?\r\n1.0A\r\n")
+
+
+class TestQueryLock(unittest.TestCase):
+    """
+    Tests that the querying lock is always released, and that waiting for
+    it is bounded
+    """
+    def setUp(self):
+        self.device = ChunkedCryomagneticsDevice(("IOUT?\r\n", "1.0A\r\n"))
+        self.device._querying_lock = Lock()
+
+    def test_lock_released_after_error(self):
+        self.device.read = mock.MagicMock(side_effect=IOError("Kaboom"))
+
+        with self.assertRaises(IOError):
+            self.device.query("IOUT?")
+
+        self.assertFalse(self.device._querying_lock.locked())
+
+    def test_lock_timeout(self):
+        self.device.query_lock_timeout = 0.01
+        self.device._querying_lock.acquire()
+
+        with self.assertRaises(DeviceBusyError):
+            self.device.query("IOUT?")
+
+        self.assertEqual(1, self.device.lock_wait_time.count)
+        self.assertEqual(0, self.device.lock_hold_time.count)
+
+    def test_times_recorded(self):
+        self.device.query("IOUT?")
+        self.assertEqual(1, self.device.lock_wait_time.count)
+        self.assertEqual(1, self.device.lock_hold_time.count)
+
+
+class TestCommandMetrics(unittest.TestCase):
+    """
+    Tests that each query is counted under its command
+    """
+    def setUp(self):
+        self.device = ChunkedCryomagneticsDevice(("IOUT?\r\n", "1.0A\r\n"))
+        self.device._querying_lock = Lock()
+
+    def test_query_recorded(self):
+        self.device.query("IOUT?")
+        summary = self.device.command_metrics.summary()["IOUT?"]
+
+        self.assertEqual(1, summary["latency"]["count"])
+        self.assertEqual(len("IOUT?\r"), summary["bytes_out"])
+        self.assertEqual(len("IOUT?\r\n1.0A\r\n"), summary["bytes_in"])
+        self.assertEqual({}, summary["errors"])
+
+    def test_error_recorded(self):
+        self.device.read = mock.MagicMock(side_effect=IOError("Kaboom"))
+
+        with self.assertRaises(IOError):
+            self.device.query("IOUT?")
+
+        self.assertEqual(
+            {"OSError": 1},
+            self.device.command_metrics.summary()["IOUT?"]["errors"]
+        )
+
+    def test_bad_echo_recorded(self):
+        with self.assertRaises(NoEchoedCommandFoundError):
+            self.device.query("LLIM?")
+
+        self.assertEqual(
+            {"NoEchoedCommandFoundError": 1},
+            self.device.command_metrics.summary()["LLIM?"]["errors"]
+        )
+
+
+class TestDeadline(unittest.TestCase):
+    """
+    Tests that queries stop once the deadline of their task has passed
+    """
+    def setUp(self):
+        self.device = ChunkedCryomagneticsDevice(("IOUT?\r\n", "1.0"))
+        self.device._querying_lock = Lock()
+
+    def test_not_sent_after_deadline(self):
+        with deadline_scope(watchdog.clock() - 1):
+            with self.assertRaises(TaskTimeoutError):
+                self.device.query("IOUT?")
+        self.assertFalse(self.device.was_write_called)
+        self.assertFalse(self.device._querying_lock.locked())
+
+    def test_empty_read_after_deadline(self):
+        deadline = watchdog.clock() + 0.01
+        read = self.device.read
+
+        def read_until_deadline(size=-1):
+            chunk = read(size)
+            if not chunk:
+                sleep(max(deadline - watchdog.clock(), 0))
+            return chunk
+
+        self.device.read = read_until_deadline
+
+        with deadline_scope(deadline):
+            with self.assertRaises(TaskTimeoutError):
+                self.device.query("IOUT?")
+
+    def test_empty_read_before_deadline(self):
+        with deadline_scope(watchdog.clock() + 60):
+            self.assertIsNone(self.device.query("IOUT?"))
+
+    def test_lock_wait_ends_at_deadline(self):
+        self.device.query_lock_timeout = None
+        self.device._querying_lock.acquire()
+
+        with deadline_scope(watchdog.clock() + 0.01):
+            with self.assertRaises(TaskTimeoutError):
+                self.device.query("IOUT?")
+        self.assertEqual(
+            1, self.device.command_metrics.summary()["IOUT?"]["errors"][
+                "TaskTimeoutError"
+            ]
+        )
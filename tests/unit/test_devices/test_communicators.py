@@ -0,0 +1,81 @@
+# -*- coding: utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.devices.communicators`
+"""
+import unittest
+import unittest.mock as mock
+from mr_freeze.devices.communicators import DelegatingCommunicator, \
+    MeteredCommunicator, cancel_read
+from mr_freeze.metrics import CommandMetrics
+
+
+class TestDelegatingCommunicator(unittest.TestCase):
+    def setUp(self):
+        self.communicator = mock.MagicMock()
+        self.delegate = DelegatingCommunicator(self.communicator)
+
+    def test_query(self):
+        self.communicator.query.return_value = "1"
+        self.assertEqual("1", self.delegate.query("UNIT?"))
+        self.communicator.query.assert_called_once_with("UNIT?", -1)
+
+    def test_properties(self):
+        self.delegate.terminator = "\r"
+        self.assertEqual("\r", self.communicator.terminator)
+
+    def test_close(self):
+        self.delegate.close()
+        self.assertTrue(self.communicator.close.called)
+
+
+class TestMeteredCommunicator(unittest.TestCase):
+    def setUp(self):
+        self.communicator = mock.MagicMock()
+        self.metrics = CommandMetrics()
+        self.metered = MeteredCommunicator(
+            self.communicator, self.metrics,
+            clock=mock.MagicMock(side_effect=[1.0, 1.25])
+        )
+
+    def test_query(self):
+        self.communicator.query.return_value = "1.5000"
+        self.assertEqual("1.5000", self.metered.query("RDGFIELD?"))
+
+        summary = self.metrics.summary()["RDGFIELD?"]
+        self.assertEqual(0.25, summary["latency"]["total"])
+        self.assertEqual(len("RDGFIELD?"), summary["bytes_out"])
+        self.assertEqual(len("1.5000"), summary["bytes_in"])
+
+    def test_sendcmd(self):
+        self.metered.sendcmd("*RST")
+        self.assertEqual(1, self.metrics.summary()["*RST"]["latency"]["count"])
+
+    def test_error(self):
+        self.communicator.query.side_effect = IOError("Kaboom")
+
+        with self.assertRaises(IOError):
+            self.metered.query("RDGFIELD?")
+
+        self.assertEqual(
+            {"OSError": 1}, self.metrics.summary()["RDGFIELD?"]["errors"]
+        )
+
+
+class TestCancelRead(unittest.TestCase):
+    def test_serial_port_found_through_wrappers(self):
+        serial_communicator = mock.MagicMock(spec=['_conn'])
+        gpib_communicator = mock.MagicMock(spec=['_file'])
+        gpib_communicator._file = serial_communicator
+
+        self.assertTrue(cancel_read(
+            DelegatingCommunicator(gpib_communicator)
+        ))
+        self.assertTrue(serial_communicator._conn.cancel_read.called)
+
+    def test_no_serial_port(self):
+        self.assertFalse(cancel_read(object()))
+
+    def test_port_cannot_cancel(self):
+        serial_communicator = mock.MagicMock(spec=['_conn'])
+        serial_communicator._conn = object()
+        self.assertFalse(cancel_read(serial_communicator))
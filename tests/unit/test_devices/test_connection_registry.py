@@ -0,0 +1,164 @@
+# -*- coding: utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.devices.connection_registry`
+"""
+import unittest
+import unittest.mock as mock
+from mr_freeze.devices.connection_registry import ConnectionRegistry
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
+from mr_freeze.devices.lakeshore_475 import Lakeshore475
+from mr_freeze.exceptions import PortInUseError
+from mr_freeze.metrics import CommandMetrics
+
+
+class TestConnectionRegistry(unittest.TestCase):
+    """
+    Base class for unit tests of the registry
+    """
+    def setUp(self):
+        self.registry = ConnectionRegistry()
+        self.opener = mock.MagicMock()
+        self.first_owner = object()
+        self.second_owner = object()
+
+
+class TestOpen(TestConnectionRegistry):
+    def test_open(self):
+        connection = self.registry.open(
+            "port", None, self.opener, self.first_owner
+        )
+        self.assertEqual(self.opener(), connection)
+        self.assertTrue(self.registry.is_open("port", None))
+
+    def test_reuse(self):
+        self.registry.open("port", None, self.opener, self.first_owner)
+        self.registry.open("port", None, self.opener, self.second_owner)
+        self.assertEqual(1, self.opener.call_count)
+        self.assertEqual(2, self.registry.owner_count("port", None))
+
+    def test_different_addresses(self):
+        self.registry.open("port", 1, self.opener, self.first_owner)
+        self.registry.open("port", 2, self.opener, self.first_owner)
+        self.assertEqual(2, self.opener.call_count)
+
+    def test_different_kind_refused(self):
+        self.registry.open("port", None, self.opener, self.first_owner, int)
+        with self.assertRaises(PortInUseError):
+            self.registry.open(
+                "port", None, self.opener, self.second_owner, str
+            )
+        self.assertEqual(1, self.registry.owner_count("port", None))
+
+
+class TestClose(TestConnectionRegistry):
+    def setUp(self):
+        TestConnectionRegistry.setUp(self)
+        self.connection = self.registry.open(
+            "port", 1, self.opener, self.first_owner
+        )
+        self.registry.open("port", 1, self.opener, self.second_owner)
+
+    def test_close_with_other_owner(self):
+        self.registry.close("port", 1, self.first_owner)
+        self.assertTrue(self.registry.is_open("port", 1))
+        self.assertFalse(self.connection._file.close.called)
+
+    def test_close_last_owner(self):
+        self.registry.close("port", 1, self.first_owner)
+        self.registry.close("port", 1, self.second_owner)
+        self.assertFalse(self.registry.is_open("port", 1))
+        self.assertTrue(self.connection._file.close.called)
+
+    def test_close_error_is_ignored(self):
+        self.connection._file.close.side_effect = AttributeError("shutdown")
+        self.registry.close("port", 1, self.first_owner)
+        self.registry.close("port", 1, self.second_owner)
+        self.assertFalse(self.registry.is_open("port", 1))
+
+    def test_port_shared_with_other_address(self):
+        self.registry.open("port", 2, mock.MagicMock(), self.first_owner)
+        self.registry.close("port", 1, self.first_owner)
+        self.registry.close("port", 1, self.second_owner)
+        self.assertFalse(self.connection._file.close.called)
+
+
+class TestAdapters(TestConnectionRegistry):
+    """
+    Tests that adapters share connections through the registry
+    """
+    def test_adapters_on_same_port_share_instrument(self):
+        constructor = mock.MagicMock()
+        first = CryomagneticsLM510(constructor, self.registry)
+        second = CryomagneticsLM510(constructor, self.registry)
+
+        self.assertIs(first.open(), second.open())
+        self.assertEqual(1, constructor.open_serial.call_count)
+
+    def test_adapters_on_different_ports(self):
+        constructor = mock.MagicMock()
+        first = CryomagneticsLM510(constructor, self.registry)
+        second = CryomagneticsLM510(constructor, self.registry)
+        second.port_name = "/dev/ttyUSB1"
+
+        first.open()
+        second.open()
+        self.assertEqual(2, constructor.open_serial.call_count)
+
+    def test_level_meter_and_power_supply_not_mixed(self):
+        level_meter = CryomagneticsLM510(mock.MagicMock(), self.registry)
+        power_supply = Cryomagnetics4G(mock.MagicMock(), self.registry)
+
+        level_meter.open()
+        with self.assertRaises(PortInUseError):
+            power_supply.open()
+        self.assertFalse(power_supply.is_open)
+
+    def test_changing_baud_rate_closes_connection(self):
+        adapter = Cryomagnetics4G(mock.MagicMock(), self.registry)
+        adapter.open()
+        adapter.baud_rate = 19200
+
+        self.assertFalse(adapter.is_open)
+        self.assertFalse(self.registry.is_open("/dev/ttyUSB0", None))
+
+    def test_changing_port_closes_connection(self):
+        adapter = CryomagneticsLM510(mock.MagicMock(), self.registry)
+        adapter.open()
+        adapter.port_name = "/dev/ttyUSB1"
+
+        self.assertFalse(adapter.is_open)
+        self.assertFalse(self.registry.is_open("/dev/ttyUSB0", None))
+
+    @mock.patch("mr_freeze.devices.lakeshore_475.sleep")
+    def test_gaussmeters_keyed_by_address(self, _):
+        constructor = mock.MagicMock()
+        first = Lakeshore475(constructor, self.registry)
+        second = Lakeshore475(constructor, self.registry)
+        second.address = 13
+
+        first.open()
+        second.open()
+        self.assertEqual(2, constructor.open_gpibusb.call_count)
+        self.assertTrue(self.registry.is_open("/dev/ttyUSB0", 13))
+
+
+class TestCommandMetrics(TestConnectionRegistry):
+    def test_only_metered_connections_reported(self):
+        metered = mock.MagicMock()
+        metered.command_metrics = CommandMetrics()
+        metered.command_metrics.record("IOUT?", 0.01)
+
+        self.registry.open("port", None, lambda: metered, self.first_owner)
+        self.registry.open("gpib", 12, self.opener, self.first_owner)
+
+        summary = self.registry.command_metrics()
+        self.assertEqual(["port"], list(summary))
+        self.assertEqual(1, summary["port"]["IOUT?"]["latency"]["count"])
+
+    def test_address_in_name(self):
+        metered = mock.MagicMock()
+        metered.command_metrics = CommandMetrics()
+
+        self.registry.open("gpib", 12, lambda: metered, self.first_owner)
+        self.assertEqual(["gpib@12"], list(self.registry.command_metrics()))
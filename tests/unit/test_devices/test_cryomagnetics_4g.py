@@ -1,4 +1,5 @@
 import unittest
+import unittest.mock as mock
 import quantities as pq
 from mr_freeze.devices.cryomagnetics_4g import Cryomagnetics4G
 
@@ -22,3 +23,148 @@ class TestParseQuery(TestCryomagnetics4G):
             parameter[1],
             Cryomagnetics4G.parse_current_response(parameter[0])
         )
+
+
+class TestRemoteSession(TestCryomagnetics4G):
+    """
+    Tests that remote sessions share a single REMOTE ... LOCAL exchange
+    """
+    def setUp(self):
+        self.instrument = Cryomagnetics4G.open_test()
+        self.instrument.instrument_measurement_timeout = 0
+        self.instrument.query = mock.MagicMock(return_value="1.0A")
+
+    def test_single_command(self):
+        self.instrument.pause_sweep()
+        self.assertEqual(
+            [mock.call("REMOTE"), mock.call("SWEEP PAUSE"),
+             mock.call("LOCAL")],
+            self.instrument.query.call_args_list
+        )
+
+    def test_nested_commands(self):
+        with self.instrument.remote_session():
+            self.instrument.upper_sweep_current = 1 * pq.A
+            self.instrument.lower_sweep_current = 0 * pq.A
+            with self.instrument.remote_session():
+                self.instrument.pause_sweep()
+
+        commands = [
+            call[0][0] for call in self.instrument.query.call_args_list
+        ]
+        self.assertEqual(1, commands.count("REMOTE"))
+        self.assertEqual(1, commands.count("LOCAL"))
+        self.assertEqual("REMOTE", commands[0])
+        self.assertEqual("LOCAL", commands[-1])
+
+    def test_local_after_error(self):
+        with self.assertRaises(ValueError):
+            with self.instrument.remote_session():
+                raise ValueError("Kaboom")
+
+        self.assertEqual(
+            mock.call("LOCAL"), self.instrument.query.call_args
+        )
+        self.assertEqual(0, self.instrument._remote_session_depth)
+
+
+class TestCachedUnit(TestCryomagnetics4G):
+    """
+    Tests that the UNITS command is only sent when the unit needs to change
+    """
+    def setUp(self):
+        self.instrument = Cryomagnetics4G.open_test()
+        self.instrument.instrument_measurement_timeout = 0
+        self.instrument.query = mock.MagicMock(return_value="1.0A")
+
+    def _commands(self):
+        return [call[0][0] for call in self.instrument.query.call_args_list]
+
+    def test_unit_set_once(self):
+        self.assertEqual(1.0 * pq.A, self.instrument.current)
+        self.assertEqual(1.0 * pq.A, self.instrument.current)
+        self.assertEqual(
+            ["UNITS A", "IOUT?", "IOUT?"], self._commands()
+        )
+
+    def test_unit_read_from_device(self):
+        self.instrument.query.side_effect = ["A", "1.0A"]
+        self.assertEqual(pq.A, self.instrument.unit)
+        self.instrument.current
+        self.assertEqual(["UNITS?", "IOUT?"], self._commands())
+
+    def test_different_unit_reported(self):
+        self.instrument.query.side_effect = [
+            None, "1.0A", "10.0G", None, "1.0A"
+        ]
+        self.instrument.current
+        self.assertEqual(1.0 * pq.A, self.instrument.current)
+        self.assertEqual(
+            ["UNITS A", "IOUT?", "IOUT?", "UNITS A", "IOUT?"],
+            self._commands()
+        )
+
+    def test_failed_unit_change_not_cached(self):
+        self.instrument.query.side_effect = IOError("Kaboom")
+        with self.assertRaises(IOError):
+            self.instrument.unit = "A"
+        self.assertIsNone(self.instrument._cached_unit)
+
+
+@mock.patch("mr_freeze.devices.cryomagnetics_4g.sleep")
+class TestRest(TestCryomagnetics4G):
+    """
+    Tests that commands sent in a remote session are not paced
+    """
+    def setUp(self):
+        self.instrument = Cryomagnetics4G.open_test()
+        self.instrument.query = mock.MagicMock(return_value="1.0A")
+
+    def test_rest_before_setting(self, sleep):
+        self.instrument.upper_sweep_current = 1 * pq.A
+        sleep.assert_called_once_with(
+            self.instrument.instrument_measurement_timeout
+        )
+
+    def test_no_rest_in_session(self, sleep):
+        with self.instrument.remote_session():
+            self.instrument.upper_sweep_current = 1 * pq.A
+            self.instrument.lower_sweep_current = 0 * pq.A
+        self.assertFalse(sleep.called)
+
+    def test_rest_after_session(self, sleep):
+        with self.instrument.remote_session():
+            pass
+        self.instrument.lower_sweep_current = 0 * pq.A
+        self.assertTrue(sleep.called)
+
+
+class TestResponseCache(TestCryomagnetics4G):
+    """
+    Tests that slowly-changing settings are served from the cache
+    """
+    def setUp(self):
+        self.instrument = Cryomagnetics4G.open_test()
+        self.instrument.instrument_measurement_timeout = 0
+        self.instrument.query = mock.MagicMock(return_value="1.0000A")
+
+    def _commands(self):
+        return [call[0][0] for call in self.instrument.query.call_args_list]
+
+    def test_read_cached(self):
+        self.instrument.upper_sweep_current
+        self.instrument.upper_sweep_current
+        self.assertEqual(["ULIM?"], self._commands())
+        self.assertEqual(1, self.instrument.response_cache.hits["ULIM?"])
+        self.assertEqual(1, self.instrument.response_cache.misses["ULIM?"])
+
+    def test_setter_writes_through(self):
+        self.instrument.lower_sweep_current = 2.5 * pq.A
+        self.assertEqual(2.5 * pq.A, self.instrument.lower_sweep_current)
+        self.assertNotIn("LLIM?", self._commands())
+
+    def test_sweep_does_not_read_limit(self):
+        self.instrument.sweep_up()
+        self.instrument.sweep_down()
+        self.assertNotIn("ULIM?", self._commands())
+        self.assertNotIn("LLIM?", self._commands())
@@ -0,0 +1,124 @@
+# coding=utf-8
+"""
+Contains unit tests for the adapter of the Cryomagnetics 4G power supply
+"""
+import unittest
+import unittest.mock as mock
+from contextlib import contextmanager
+from quantities import amperes
+from mr_freeze.devices.connection_registry import ConnectionRegistry
+from mr_freeze.devices.cryomagnetics_4g import Cryomagnetics4G as \
+    _Cryomagnetics4G
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.devices.response_cache import ResponseCache
+
+
+class FakePowerSupply(object):
+    """
+    Records the commands that the adapter sends
+    """
+    parse_current_response = staticmethod(
+        _Cryomagnetics4G.parse_current_response
+    )
+
+    def __init__(self) -> None:
+        object.__setattr__(self, 'commands', [])
+        object.__setattr__(self, 'upper_sweep_current', 5 * amperes)
+        object.__setattr__(self, 'response_cache', ResponseCache(
+            _Cryomagnetics4G.RESPONSE_TIME_TO_LIVE
+        ))
+
+    @contextmanager
+    def remote_session(self):
+        self.commands.append('REMOTE')
+        yield
+        self.commands.append('LOCAL')
+
+    def __setattr__(self, name, value):
+        self.commands.append(name)
+        object.__setattr__(self, name, value)
+
+
+class TestSetSweepLimits(unittest.TestCase):
+    def setUp(self):
+        self.device = FakePowerSupply()
+        constructor = mock.MagicMock()
+        constructor.open_serial.return_value = self.device
+        self.adapter = Cryomagnetics4G(
+            constructor, ConnectionRegistry(), single_flight=False
+        )
+
+    def test_one_remote_session(self):
+        self.device.response_cache.put("LLIM?", "0.0000A")
+        self.adapter.set_sweep_limits(6 * amperes, 1 * amperes)
+        self.assertEqual(
+            ['REMOTE', 'upper_sweep_current', 'lower_sweep_current',
+             'LOCAL'],
+            self.device.commands
+        )
+
+    def test_lower_first_when_upper_below_lower(self):
+        self.device.response_cache.put("LLIM?", "3.0000A")
+        self.adapter.set_sweep_limits(2 * amperes, 1 * amperes)
+        self.assertEqual(
+            ['REMOTE', 'lower_sweep_current', 'upper_sweep_current',
+             'LOCAL'],
+            self.device.commands
+        )
+
+    def test_lower_first_when_lower_unknown(self):
+        self.adapter.set_sweep_limits(10 * amperes, 5 * amperes)
+        self.assertEqual(
+            ['REMOTE', 'lower_sweep_current', 'upper_sweep_current',
+             'LOCAL'],
+            self.device.commands
+        )
+
+    def test_both_raised_from_empty_cache(self):
+        self.adapter.set_sweep_limits(10 * amperes, 8 * amperes)
+        self.assertEqual(
+            ['REMOTE', 'upper_sweep_current', 'lower_sweep_current',
+             'LOCAL'],
+            self.device.commands
+        )
+
+    def test_upper_first_when_both_raised(self):
+        self.device.response_cache.put("LLIM?", "0.0000A")
+        self.adapter.set_sweep_limits(10 * amperes, 5 * amperes)
+        self.assertEqual(
+            ['REMOTE', 'upper_sweep_current', 'lower_sweep_current',
+             'LOCAL'],
+            self.device.commands
+        )
+
+    def test_one_limit(self):
+        self.adapter.set_sweep_limits(lower=1 * amperes)
+        self.assertEqual(
+            ['REMOTE', 'lower_sweep_current', 'LOCAL'], self.device.commands
+        )
+
+    def test_out_of_range(self):
+        with self.assertRaises(ValueError):
+            self.adapter.set_sweep_limits(200 * amperes, 1 * amperes)
+        self.assertEqual([], self.device.commands)
+
+
+class TestCachedSweepCurrent(unittest.TestCase):
+    def setUp(self):
+        self.device = mock.MagicMock()
+        self.device.parse_current_response.return_value = 2 * amperes
+        constructor = mock.MagicMock()
+        constructor.open_serial.return_value = self.device
+        self.adapter = Cryomagnetics4G(constructor, ConnectionRegistry())
+
+    def test_cached(self):
+        self.device.response_cache.peek.return_value = "2.0000A"
+        self.assertEqual(2 * amperes, self.adapter.cached_upper_sweep_current)
+        self.device.response_cache.peek.assert_called_once_with("ULIM?")
+
+    def test_not_cached(self):
+        self.device.response_cache.peek.return_value = None
+        self.assertIs(
+            Cryomagnetics4G.null_value,
+            self.adapter.cached_lower_sweep_current
+        )
@@ -91,3 +91,63 @@ class TestMeasurementDeadlockManagement(TestCryomagneticsLM510):
         self.assertTrue(
             self.instrument.channel_measurement_lock.release.called
         )
+
+
+class TestStatusByteSnapshot(TestCryomagneticsLM510):
+    """
+    Tests that channel readiness checks share a reading of the status byte
+    """
+    def setUp(self):
+        self.instrument = CryomagneticsLM510.open_test()
+        self.instrument.read = mock.MagicMock(return_value="*STB?\r\n5\r\n")
+        self.instrument.write = mock.MagicMock()
+
+    def _status_byte_queries(self):
+        return [
+            call for call in self.instrument.write.call_args_list
+            if call == mock.call("*STB?\r")
+        ]
+
+    def test_checks_share_reading(self):
+        self.assertTrue(self.instrument[0].data_ready)
+        self.assertTrue(self.instrument[1].data_ready)
+        self.assertEqual(1, len(self._status_byte_queries()))
+
+    def test_other_channel_keeps_reading(self):
+        self.instrument.read.return_value = "MEAS 1\r\n"
+        self.instrument.query("MEAS 1")
+        self.instrument.read.return_value = "*STB?\r\n5\r\n"
+        self.assertTrue(self.instrument[0].data_ready)
+        self.instrument.read.return_value = "MEAS? 1\r\n1.0 cm\r\n"
+        self.instrument.query("MEAS? 1")
+        self.assertTrue(self.instrument[1].data_ready)
+        self.assertEqual(1, len(self._status_byte_queries()))
+
+    def test_measured_channel_reads_again(self):
+        self.assertTrue(self.instrument[1].data_ready)
+        self.instrument.read.return_value = "MEAS 2\r\n"
+        self.instrument.query("MEAS 2")
+        self.instrument.read.return_value = "*STB?\r\n5\r\n"
+        self.assertTrue(self.instrument[0].data_ready)
+        self.assertEqual(1, len(self._status_byte_queries()))
+        self.assertTrue(self.instrument[1].data_ready)
+        self.assertEqual(2, len(self._status_byte_queries()))
+
+    def test_invalidate_takes_lock(self):
+        self.instrument._status_byte_lock = mock.MagicMock()
+        self.instrument.invalidate_status_byte()
+        self.assertTrue(self.instrument._status_byte_lock.__enter__.called)
+
+    def test_measurement_invalidates(self):
+        _ = self.instrument.status_byte
+        self.instrument.read.return_value = "MEAS 1\r\n"
+        self.instrument.query("MEAS 1")
+        self.instrument.read.return_value = "*STB?\r\n0\r\n"
+        self.assertFalse(self.instrument[0].data_ready)
+        self.assertEqual(2, len(self._status_byte_queries()))
+
+    def test_snapshot_expires(self):
+        self.instrument.status_byte_freshness = 0
+        _ = self.instrument.status_byte
+        _ = self.instrument.status_byte
+        self.assertEqual(2, len(self._status_byte_queries()))
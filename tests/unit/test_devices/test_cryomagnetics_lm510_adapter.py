@@ -18,6 +18,7 @@ class TestAdapter(unittest.TestCase):
         self.instrument._constructor = self.constructor
 
     def tearDown(self):
+        self.instrument.close()
         self.constructor.reset_mock()
 
 
@@ -87,3 +88,14 @@ class TestChannelMeasurements(TestAdapter):
             mock.call(1),
             self.instrument._measurement.call_args
         )
+
+
+class TestSingleFlight(TestAdapter):
+    def test_channels_counted_apart(self):
+        self.instrument._read_measurement = mock.MagicMock()
+        _ = self.instrument.channel_1_measurement
+        _ = self.instrument.channel_2_measurement
+        self.assertEqual(
+            {"channel_1_measurement", "channel_2_measurement"},
+            set(self.instrument.single_flight.summary())
+        )
@@ -15,6 +15,7 @@ class TestLakeshore475(unittest.TestCase):
         self.instrument._constructor = self.constructor
 
     def tearDown(self):
+        self.instrument.close()
         self.constructor.reset_mock()
 
 
@@ -73,3 +74,13 @@ class TestField(TestLakeshore475):
         self.assertAlmostEqual(
             -100000.0 * pq.gauss, field
         )
+
+    def test_field_read_through_single_flight(self):
+        _ = self.instrument.field
+        self.assertEqual(1, self.instrument.single_flight.misses["field"])
+
+    def test_single_flight_can_be_disabled(self):
+        instrument = Lakeshore475(self.constructor, single_flight=False)
+        _ = instrument.field
+        self.assertEqual({}, instrument.single_flight.summary())
+        instrument.close()
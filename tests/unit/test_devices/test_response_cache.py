@@ -0,0 +1,60 @@
+# -*- coding: utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.devices.response_cache`
+"""
+import unittest
+from mr_freeze.devices.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    """
+    Base class for unit tests of the response cache
+    """
+    time_to_live = {"ULIM?": 10.0}
+
+    def setUp(self):
+        self.time = 0.0
+        self.cache = ResponseCache(self.time_to_live, clock=lambda: self.time)
+
+
+class TestGet(TestResponseCache):
+    def test_miss(self):
+        self.assertIsNone(self.cache.get("ULIM?"))
+        self.assertEqual(1, self.cache.misses["ULIM?"])
+
+    def test_hit(self):
+        self.cache.put("ULIM?", "1.0A")
+        self.assertEqual("1.0A", self.cache.get("ULIM?"))
+        self.assertEqual(1, self.cache.hits["ULIM?"])
+
+    def test_expired(self):
+        self.cache.put("ULIM?", "1.0A")
+        self.time = 10.0
+        self.assertIsNone(self.cache.get("ULIM?"))
+        self.assertEqual(1, self.cache.misses["ULIM?"])
+
+    def test_command_not_cached(self):
+        self.cache.put("IOUT?", "1.0A")
+        self.assertIsNone(self.cache.get("IOUT?"))
+        self.assertEqual(0, self.cache.misses["IOUT?"])
+
+
+class TestPeek(TestResponseCache):
+    def test_peek_not_counted(self):
+        self.cache.put("ULIM?", "1.0A")
+        self.assertEqual("1.0A", self.cache.peek("ULIM?"))
+        self.assertEqual(0, self.cache.hits["ULIM?"])
+
+
+class TestInvalidate(TestResponseCache):
+    def setUp(self):
+        TestResponseCache.setUp(self)
+        self.cache.put("ULIM?", "1.0A")
+
+    def test_invalidate_command(self):
+        self.cache.invalidate("ULIM?")
+        self.assertIsNone(self.cache.peek("ULIM?"))
+
+    def test_invalidate_all(self):
+        self.cache.invalidate()
+        self.assertIsNone(self.cache.peek("ULIM?"))
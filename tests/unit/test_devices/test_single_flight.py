@@ -0,0 +1,114 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.devices.single_flight`
+"""
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import sleep
+from mr_freeze.deadlines import deadline_scope, watchdog
+from mr_freeze.devices.single_flight import SingleFlight
+from mr_freeze.exceptions import TaskTimeoutError
+
+
+class TestSingleFlight(unittest.TestCase):
+    """
+    Makes one caller hold a call open while other callers ask for it
+    """
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.executor = ThreadPoolExecutor(4)
+        self.started = Event()
+        self.release = Event()
+        self.calls = 0
+
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown()
+
+    def slow_read(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(1)
+        return self.calls
+
+    def lead(self):
+        leader = self.executor.submit(self.flights.do, "read", self.slow_read)
+        self.started.wait(1)
+        return leader
+
+
+class TestSharing(TestSingleFlight):
+    def test_waiting_callers_share_result(self):
+        leader = self.lead()
+        followers = [
+            self.executor.submit(self.flights.do, "read", self.slow_read)
+            for _ in range(2)
+        ]
+        sleep(0.05)
+        self.release.set()
+
+        self.assertEqual(
+            [1, 1, 1],
+            [future.result(1) for future in [leader] + followers]
+        )
+        self.assertEqual(1, self.calls)
+        self.assertEqual(
+            {"read": {"hits": 2, "misses": 1}}, self.flights.summary()
+        )
+
+    def test_later_call_not_shared(self):
+        self.release.set()
+        self.flights.do("read", self.slow_read)
+        self.assertEqual(2, self.flights.do("read", self.slow_read))
+
+    def test_keys_kept_apart(self):
+        self.lead()
+        self.assertEqual("other", self.flights.do("other", lambda: "other"))
+
+    def test_disabled(self):
+        self.flights.enabled = False
+        self.lead()
+        self.release.set()
+        self.assertEqual(2, self.flights.do("read", self.slow_read))
+        self.assertEqual({}, self.flights.summary())
+
+
+class TestErrors(TestSingleFlight):
+    def test_error_shared(self):
+        def failing_read():
+            self.started.set()
+            self.release.wait(1)
+            raise IOError("No reply")
+
+        leader = self.executor.submit(self.flights.do, "read", failing_read)
+        self.started.wait(1)
+        follower = self.executor.submit(self.flights.do, "read", failing_read)
+        sleep(0.05)
+        self.release.set()
+
+        for future in (leader, follower):
+            with self.assertRaises(IOError):
+                future.result(1)
+
+    def test_leader_timeout_not_shared(self):
+        def late_read():
+            self.started.set()
+            self.release.wait(1)
+            raise TaskTimeoutError("late")
+
+        self.executor.submit(self.flights.do, "read", late_read)
+        self.started.wait(1)
+        follower = self.executor.submit(
+            self.flights.do, "read", lambda: "own read"
+        )
+        sleep(0.05)
+        self.release.set()
+
+        self.assertEqual("own read", follower.result(1))
+
+    def test_wait_ends_at_deadline(self):
+        self.lead()
+        with deadline_scope(watchdog.clock() + 0.01):
+            with self.assertRaises(TaskTimeoutError):
+                self.flights.do("read", self.slow_read)
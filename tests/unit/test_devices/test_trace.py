@@ -0,0 +1,149 @@
+# -*- coding: utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.devices.trace`
+"""
+import io
+import unittest
+import unittest.mock as mock
+import quantities as pq
+from mr_freeze.devices.connection_registry import ConnectionRegistry
+from mr_freeze.devices.cryomagnetics_lm510 import \
+    CryomagneticsLM510 as _CryomagneticsLM510
+from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
+from mr_freeze.devices.trace import ExchangeKind, TraceEvent, TraceWriter, \
+    read_trace, RecordingCommunicator, ReplayCommunicator, \
+    RecordingConstructor, ReplayConstructor, NO_DELAY
+from mr_freeze.exceptions import TraceMismatchError
+from mr_freeze.simulators.cryomagnetics import CryomagneticsLM510Simulator
+
+EVENTS = [
+    TraceEvent(ExchangeKind.WRITE, 0.0, 0.001, b"CHAN?\r", b""),
+    TraceEvent(ExchangeKind.READ, 0.001, 0.002, b"6", b"CHAN?\r"),
+    TraceEvent(ExchangeKind.READ, 0.003, 0.004, b"1", b"\n1\r\n"),
+    TraceEvent(ExchangeKind.QUERY, 1.0, 0.5, b"RDGFIELD?", b"1.5"),
+    TraceEvent(ExchangeKind.QUERY, 2.0, 0.25, b"UNIT?", b"1")
+]
+
+
+class TestTraceFile(unittest.TestCase):
+    def test_round_trip(self):
+        stream = io.BytesIO()
+        writer = TraceWriter(stream)
+        for event in EVENTS:
+            writer.write(event)
+
+        stream.seek(0)
+        self.assertEqual(EVENTS, list(read_trace(stream)))
+
+    def test_not_a_trace(self):
+        with self.assertRaises(ValueError):
+            list(read_trace(io.BytesIO(b"something else")))
+
+
+class TestRecordingCommunicator(unittest.TestCase):
+    def setUp(self):
+        self.stream = io.BytesIO()
+        self.communicator = mock.MagicMock()
+        self.clock = mock.MagicMock(side_effect=[10.0, 11.0, 11.5])
+        self.recorder = RecordingCommunicator(
+            self.communicator, TraceWriter(self.stream), clock=self.clock
+        )
+
+    def events(self):
+        self.stream.seek(0)
+        return list(read_trace(self.stream))
+
+    def test_query(self):
+        self.communicator.query.return_value = "1.5"
+        self.assertEqual("1.5", self.recorder.query("RDGFIELD?"))
+        self.assertEqual(
+            [TraceEvent(ExchangeKind.QUERY, 1.0, 0.5, b"RDGFIELD?", b"1.5")],
+            self.events()
+        )
+
+    def test_read_and_write(self):
+        self.clock.side_effect = [11.0, 12.0, 13.0, 15.0]
+        self.communicator.read_raw.return_value = b"CHAN?\r\n"
+        self.recorder.write("CHAN?\r")
+        self.assertEqual("CHAN?\r\n", self.recorder.read(7))
+
+        self.assertEqual([
+            TraceEvent(ExchangeKind.WRITE, 1.0, 1.0, b"CHAN?\r", b""),
+            TraceEvent(ExchangeKind.READ, 3.0, 2.0, b"7", b"CHAN?\r\n")
+        ], self.events())
+
+    def test_pass_through(self):
+        self.recorder.timeout = 3
+        self.assertEqual(3, self.communicator.timeout)
+        self.recorder.close()
+        self.assertTrue(self.communicator.close.called)
+
+
+class TestReplayCommunicator(unittest.TestCase):
+    def setUp(self):
+        self.sleep = mock.MagicMock()
+        self.replay = ReplayCommunicator(EVENTS, speed=2.0, sleep=self.sleep)
+
+    def test_query(self):
+        self.assertEqual("1.5", self.replay.query("RDGFIELD?"))
+        self.sleep.assert_called_once_with(0.25)
+
+    def test_skips_unmatched_events(self):
+        self.assertEqual("1", self.replay.query("UNIT?"))
+        self.assertEqual(0, self.replay.events_remaining)
+
+    def test_mismatch(self):
+        self.replay.query("UNIT?")
+        with self.assertRaises(TraceMismatchError):
+            self.replay.query("RDGFIELD?")
+
+    def test_reads_are_a_stream(self):
+        self.replay.write("CHAN?\r")
+        self.assertEqual("CHAN?\r\n", self.replay.read(7))
+        self.assertEqual("1\r\n", self.replay.read(-1))
+        self.assertEqual("", self.replay.read(1))
+        self.assertEqual(
+            [mock.call(0.0005), mock.call(0.003)],
+            self.sleep.call_args_list
+        )
+
+    def test_no_delay(self):
+        self.replay.speed = NO_DELAY
+        self.replay.query("RDGFIELD?")
+        self.assertFalse(self.sleep.called)
+
+
+class TestRecordAndReplay(unittest.TestCase):
+    """
+    Records the traffic of a level meter adapter talking to a simulator, and
+    replays it through a second adapter after the simulator has stopped
+    """
+    def test_level_meter(self):
+        stream = io.BytesIO()
+
+        with CryomagneticsLM510Simulator(
+                helium_level=60.0, nitrogen_level=25.0, helium_boil_off=0.5
+        ) as simulator:
+            recording = CryomagneticsLM510(
+                constructor=RecordingConstructor(_CryomagneticsLM510, stream),
+                registry=ConnectionRegistry()
+            )
+            recording.port_name = simulator.port_name
+            try:
+                recorded = (recording.channel_1_measurement,
+                            recording.channel_2_measurement)
+            finally:
+                recording.close()
+
+        stream.seek(0)
+        replaying = CryomagneticsLM510(
+            constructor=ReplayConstructor(
+                _CryomagneticsLM510, stream, speed=NO_DELAY
+            ),
+            registry=ConnectionRegistry()
+        )
+        replayed = (replaying.channel_1_measurement,
+                    replaying.channel_2_measurement)
+
+        self.assertEqual((59.5 * pq.cm, 25.0 * pq.cm), recorded)
+        self.assertEqual(recorded, replayed)
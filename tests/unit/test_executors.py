@@ -0,0 +1,197 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.executors`
+"""
+import unittest
+from threading import Event, Lock
+from time import monotonic, sleep
+from mr_freeze.exceptions import TaskDroppedError
+from mr_freeze.executors import InstrumentAffineExecutor, Priority
+
+
+class Instrument(object):
+    minimum_command_gap = 0.0
+
+    def __init__(self, port_name=None, address=None):
+        self.port_name = port_name
+        self.address = address
+
+
+class PacedInstrument(Instrument):
+    minimum_command_gap = 0.1
+
+
+class TestInstrumentAffineExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = InstrumentAffineExecutor()
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+
+class TestSubmit(TestInstrumentAffineExecutor):
+    def test_submit(self):
+        self.assertEqual(2, self.executor.submit(lambda: 2).result())
+
+    def test_submit_to(self):
+        future = self.executor.submit_to(Instrument("port"), max, 1, 3)
+        self.assertEqual(3, future.result())
+
+    def test_error_does_not_block_lane(self):
+        instrument = Instrument("port")
+        failed = self.executor.submit_to(instrument, int, "not a number")
+        succeeded = self.executor.submit_to(instrument, int, "3")
+
+        with self.assertRaises(ValueError):
+            failed.result()
+        self.assertEqual(3, succeeded.result())
+
+
+class TestLanes(TestInstrumentAffineExecutor):
+    def test_same_instrument_runs_in_order(self):
+        instrument = Instrument("port")
+        order = []
+        running = Lock()
+        overlapped = []
+
+        def work(index):
+            if not running.acquire(blocking=False):
+                overlapped.append(index)
+                return
+            sleep(0.01)
+            order.append(index)
+            running.release()
+
+        futures = [
+            self.executor.submit_to(instrument, work, index)
+            for index in range(5)
+        ]
+        for future in futures:
+            future.result()
+
+        self.assertEqual([0, 1, 2, 3, 4], order)
+        self.assertEqual([], overlapped)
+
+    def test_different_instruments_run_in_parallel(self):
+        started = Event()
+
+        first = self.executor.submit_to(
+            Instrument("first"), lambda: started.wait(1)
+        )
+        self.executor.submit_to(Instrument("second"), started.set)
+
+        self.assertTrue(first.result())
+
+    def test_lanes_keyed_by_port_and_address(self):
+        self.executor.submit_to(Instrument("port", 12), int).result()
+        self.executor.submit_to(Instrument("port", 12), int).result()
+        self.executor.submit_to(Instrument("port", 13), int).result()
+        self.assertEqual(2, self.executor.lane_count)
+
+    def test_objects_without_port_have_own_lane(self):
+        instruments = (object(), object())
+        for instrument in instruments:
+            self.executor.submit_to(instrument, int).result()
+        self.assertEqual(2, self.executor.lane_count)
+
+    def test_submit_after_shutdown(self):
+        self.executor.shutdown()
+        with self.assertRaises(RuntimeError):
+            self.executor.submit_to(Instrument("port"), int)
+
+
+class TestPriority(TestInstrumentAffineExecutor):
+    def setUp(self):
+        TestInstrumentAffineExecutor.setUp(self)
+        self.instrument = Instrument("port")
+        self.release = Event()
+        self.order = []
+        self.executor.submit_to(self.instrument, self.release.wait, 1)
+
+    def submit(self, name, priority=Priority.MEASUREMENT):
+        return self.executor.submit_to(
+            self.instrument, self.order.append, name, priority=priority
+        )
+
+    def test_control_runs_before_queued_measurements(self):
+        self.submit("first read")
+        self.submit("second read")
+        self.submit("pause", Priority.CONTROL)
+        last = self.submit("third read")
+        self.release.set()
+        last.result(1)
+
+        self.assertEqual(
+            ["pause", "first read", "second read", "third read"], self.order
+        )
+
+    def test_same_priority_in_order(self):
+        self.submit("first", Priority.CONTROL)
+        last = self.submit("second", Priority.CONTROL)
+        self.release.set()
+        last.result(1)
+
+        self.assertEqual(["first", "second"], self.order)
+
+    def test_queue_latency_by_priority(self):
+        self.submit("pause", Priority.CONTROL)
+        sleep(0.02)
+        self.release.set()
+        self.submit("read").result(1)
+
+        latency = self.executor.queue_latency()
+        self.assertEqual(1, latency["CONTROL"]["count"])
+        self.assertGreaterEqual(latency["CONTROL"]["max"], 0.02)
+        self.assertEqual(2, latency["MEASUREMENT"]["count"])
+
+
+class TestMinimumCommandGap(unittest.TestCase):
+    def setUp(self):
+        self.executor = InstrumentAffineExecutor(workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_gap_between_tasks(self):
+        instrument = PacedInstrument("port")
+        first = self.executor.submit_to(instrument, monotonic)
+        second = self.executor.submit_to(instrument, monotonic)
+
+        self.assertGreaterEqual(
+            second.result() - first.result(),
+            PacedInstrument.minimum_command_gap
+        )
+
+    def test_gap_does_not_hold_worker(self):
+        paced = PacedInstrument("paced")
+        self.executor.submit_to(paced, int).result()
+        waiting = self.executor.submit_to(paced, monotonic)
+        other = self.executor.submit_to(Instrument("other"), monotonic)
+
+        self.assertLess(other.result(), waiting.result())
+
+    def test_dropped_task_does_not_start_gap(self):
+        instrument = PacedInstrument("port")
+        self.executor.submit_to(instrument, int).result()
+
+        def dropped():
+            raise TaskDroppedError("Still queued at its deadline")
+
+        self.executor.submit_to(instrument, dropped)
+        started_at = monotonic()
+        self.executor.submit_to(instrument, int).result()
+        self.assertLess(
+            monotonic() - started_at, 2 * PacedInstrument.minimum_command_gap
+        )
+
+    def test_cancelled_task_does_not_start_gap(self):
+        instrument = PacedInstrument("port")
+        self.executor.submit_to(instrument, int).result()
+        cancelled = self.executor.submit_to(instrument, int)
+        self.assertTrue(cancelled.cancel())
+
+        started_at = monotonic()
+        self.executor.submit_to(instrument, int).result()
+        self.assertLess(
+            monotonic() - started_at, 2 * PacedInstrument.minimum_command_gap
+        )
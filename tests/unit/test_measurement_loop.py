@@ -4,13 +4,24 @@ Contains unit tests for :mod:`mr_freeze.measurement_loop`
 """
 import unittest
 import unittest.mock as mock
-import schedule
-from concurrent.futures import Executor
+from concurrent.futures import Executor, Future
+from mr_freeze.adaptive_sampling import AdaptiveSampling
 from mr_freeze.measurement_loop import MeasurementLoop
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
 from mr_freeze.devices.lakeshore_475 import Lakeshore475
-from mr_freeze.resources.application_state import Store
+from mr_freeze.resources.application_state import Store, Current, \
+    MagneticField, LiquidHeliumLevel, LiquidNitrogenLevel
+from mr_freeze.overrun import OverrunGuard, OverrunPolicy
+from mr_freeze.samples import Reading, SampleRecord, SampleStream
+from mr_freeze.scheduler import Scheduler
+from quantities import amperes
+
+
+def finished_future(*readings: Reading) -> Future:
+    future = Future()
+    future.set_result(readings)
+    return future
 
 
 class TestMeasurementLoop(unittest.TestCase):
@@ -30,7 +41,7 @@ class TestMeasurementLoop(unittest.TestCase):
         self.store = dict()  # type: Store
         self.executor = mock.MagicMock(spec=Executor)  # type: Executor
         self.sample_interval = 10
-        self.scheduler = mock.MagicMock(spec=schedule)
+        self.scheduler = mock.MagicMock(spec=Scheduler)
 
         self.loop = MeasurementLoop(
             self.power_supply, self.level_meter, self.gaussmeter,
@@ -44,10 +55,9 @@ class TestRun(TestMeasurementLoop):
     """
     def test_run(self):
         self.loop.run()
-        self.assertEqual(
-            mock.call(self.loop.__repr__()),
-            self.scheduler.every(self.sample_interval).seconds.do(
-                self.loop.run_single_iteration).tag.call_args
+        self.scheduler.every.assert_called_once_with(
+            self.sample_interval, self.loop.run_due_measurements,
+            tag=self.loop.__repr__()
         )
 
 
@@ -58,3 +68,145 @@ class TestRunSingleIteration(TestMeasurementLoop):
     def test_run_single_iteration(self):
         self.loop.run_single_iteration()
         self.assertTrue(self.executor.submit.called)
+
+
+class TestMultiRate(TestMeasurementLoop):
+    """
+    Contains unit tests for measuring variables at different rates
+    """
+    def setUp(self):
+        TestMeasurementLoop.setUp(self)
+        self.loop = MeasurementLoop(
+            self.power_supply, self.level_meter, self.gaussmeter,
+            self.store, self.executor, 60, self.scheduler,
+            {Current: 1, MagneticField: 0.5, LiquidHeliumLevel: 300}
+        )
+
+    def test_default_interval(self):
+        self.assertEqual(60, self.loop.sample_intervals[LiquidNitrogenLevel])
+
+    def test_tick(self):
+        self.assertEqual(0.5, self.loop.tick)
+
+    def test_all_due_on_first_tick(self):
+        self.assertEqual(
+            set(self.loop.sample_intervals), set(self.loop.due_variables(0))
+        )
+
+    def test_due_variables(self):
+        self.assertEqual([MagneticField], self.loop.due_variables(1))
+        self.assertEqual(
+            {Current, MagneticField}, set(self.loop.due_variables(2))
+        )
+        self.assertEqual(
+            {Current, MagneticField, LiquidNitrogenLevel},
+            set(self.loop.due_variables(120))
+        )
+
+    def test_run_due_measurements(self):
+        self.executor.submit.side_effect = lambda *_: finished_future()
+        self.loop.run_due_measurements()
+        self.loop.run_due_measurements()
+        self.assertEqual(4, self.executor.submit.call_count)
+
+    def test_busy_instrument_skipped(self):
+        self.loop.run_due_measurements()
+        self.loop.run_due_measurements()
+        self.assertEqual(3, self.executor.submit.call_count)
+        self.assertEqual(1, self.loop.overrun_guard.skipped)
+
+
+class TestSamples(TestMeasurementLoop):
+    """
+    Contains unit tests for publishing the records of measurements
+    """
+    def setUp(self):
+        TestMeasurementLoop.setUp(self)
+        self.samples = SampleStream()
+        self.subscription = self.samples.subscribe()
+        self.futures = []
+        self.executor.submit.side_effect = self._submit
+
+        self.loop = MeasurementLoop(
+            self.power_supply, self.level_meter, self.gaussmeter,
+            self.store, self.executor, self.sample_interval, self.scheduler,
+            overrun_guard=OverrunGuard(OverrunPolicy.QUEUE),
+            samples=self.samples
+        )
+
+    def _submit(self, *_):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+    def test_one_record_per_tick(self):
+        self.loop.run_single_iteration()
+        self.assertEqual(0, len(self.subscription))
+
+        self.futures[0].set_result((Reading.now(LiquidNitrogenLevel, 1),))
+        self.futures[1].set_result((Reading.now(Current, 2),))
+        self.futures[2].set_exception(IOError("No reply"))
+
+        record, = self.subscription.take()
+        self.assertEqual(1, record.value(LiquidNitrogenLevel))
+        self.assertEqual(2, record.value(Current))
+        self.assertFalse(record.reading(MagneticField).ok)
+
+    def test_late_visit_published_alone(self):
+        self.loop.run_single_iteration()
+        self.loop.run_single_iteration()
+        for future in self.futures[:3]:
+            future.set_result(())
+
+        self.assertEqual(6, len(self.futures))
+        self.assertEqual(1, len(self.subscription.take()))
+
+        self.futures[3].set_result((Reading.now(LiquidNitrogenLevel, 2),))
+        record, = self.subscription.take()
+        self.assertEqual((LiquidNitrogenLevel,), record.variables)
+
+
+class TestAdaptiveSampling(TestMeasurementLoop):
+    """
+    Contains unit tests for sampling the current and the field quickly while
+    the magnet sweeps
+    """
+    def setUp(self):
+        TestMeasurementLoop.setUp(self)
+        self.power_supply.minimum_command_gap = 0.3
+        self.gaussmeter.minimum_command_gap = 0.3
+        self.time = 0.0
+        self.sampling = AdaptiveSampling(
+            fast_interval=1.0, clock=lambda: self.time
+        )
+        self.loop = MeasurementLoop(
+            self.power_supply, self.level_meter, self.gaussmeter,
+            self.store, self.executor, 60, self.scheduler,
+            samples=SampleStream(), sampling=self.sampling
+        )
+
+    def test_tick_divides_fast_interval(self):
+        self.assertEqual(1.0, self.loop.tick)
+
+    def test_fast_interval_not_below_command_gap(self):
+        self.sampling.fast_interval = 0.1
+        self.assertEqual(0.3, self.loop.tick)
+
+    def test_holding(self):
+        self.assertEqual([], self.loop.due_variables(1))
+
+    def test_sweeping(self):
+        self.sampling.sweep_started()
+        self.assertEqual(
+            {Current, MagneticField}, set(self.loop.due_variables(1))
+        )
+
+    def test_readings_observed(self):
+        for when, value in ((0.0, 1.0), (1.0, 2.0)):
+            self.loop.samples.publish(SampleRecord(
+                (Reading(Current, value * amperes, when, None, None),)
+            ))
+        self.assertEqual(60, self.loop.intervals[Current])
+
+        self.loop.run_due_measurements()
+        self.assertEqual(1.0, self.loop.intervals[Current])
@@ -0,0 +1,86 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.metrics`
+"""
+import unittest
+from mr_freeze.metrics import LatencyHistogram, CommandMetrics
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def setUp(self):
+        self.histogram = LatencyHistogram(resolution=1e-3)
+
+
+class TestRecord(TestLatencyHistogram):
+    def test_empty(self):
+        self.assertEqual(0, self.histogram.count)
+        self.assertIsNone(self.histogram.mean)
+        self.assertIsNone(self.histogram.percentile(50))
+
+    def test_record(self):
+        for duration in (0.001, 0.002, 0.003):
+            self.histogram.record(duration)
+
+        self.assertEqual(3, self.histogram.count)
+        self.assertAlmostEqual(0.002, self.histogram.mean)
+        self.assertEqual(0.003, self.histogram.maximum)
+
+    def test_reset(self):
+        self.histogram.record(1.0)
+        self.histogram.reset()
+        self.assertEqual(0, self.histogram.count)
+
+
+class TestPercentile(TestLatencyHistogram):
+    def test_percentiles_within_precision(self):
+        for milliseconds in range(1, 1001):
+            self.histogram.record(milliseconds * 1e-3)
+
+        for percent, expected in ((50, 0.5), (90, 0.9), (99, 0.99)):
+            self.assertAlmostEqual(
+                expected, self.histogram.percentile(percent),
+                delta=expected / 16
+            )
+
+    def test_summary(self):
+        self.histogram.record(0.01)
+        self.assertEqual(1, self.histogram.summary()["count"])
+
+
+class TestCommandMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = CommandMetrics()
+
+    def test_command_key(self):
+        self.assertEqual("ULIM <n>", CommandMetrics.command_key("ULIM 2.0000"))
+        self.assertEqual("LLIM <n>", CommandMetrics.command_key("LLIM -1.5A"))
+        self.assertEqual("MEAS? 1", CommandMetrics.command_key("MEAS? 1"))
+
+    def test_record(self):
+        self.metrics.record("MEAS? 1", 0.02, bytes_out=8, bytes_in=20)
+        self.metrics.record("MEAS? 1", 0.04, bytes_out=8, bytes_in=20)
+
+        summary = self.metrics.summary()["MEAS? 1"]
+        self.assertEqual(2, summary["latency"]["count"])
+        self.assertAlmostEqual(0.06, summary["latency"]["total"])
+        self.assertEqual(16, summary["bytes_out"])
+        self.assertEqual(40, summary["bytes_in"])
+
+    def test_setters_share_a_histogram(self):
+        self.metrics.record("ULIM 1.0000", 0.1)
+        self.metrics.record("ULIM 2.0000", 0.1)
+        self.assertEqual(["ULIM <n>"], list(self.metrics.summary()))
+
+    def test_errors_by_type(self):
+        self.metrics.record_error("*STB?", IOError())
+        self.metrics.record_error("*STB?", IOError())
+        self.metrics.record_error("*STB?", ValueError())
+
+        summary = self.metrics.summary()["*STB?"]
+        self.assertIsNone(summary["latency"])
+        self.assertEqual({"OSError": 2, "ValueError": 1}, summary["errors"])
+
+    def test_reset(self):
+        self.metrics.record("IOUT?", 0.1)
+        self.metrics.reset()
+        self.assertEqual({}, self.metrics.summary())
@@ -0,0 +1,90 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.overrun`
+"""
+import unittest
+from concurrent.futures import Future
+from mr_freeze.overrun import OverrunGuard, OverrunPolicy
+
+
+class TestOverrunGuard(unittest.TestCase):
+    """
+    Launches measurements whose futures are only finished by the test
+    """
+    policy = OverrunPolicy.SKIP
+
+    def setUp(self):
+        self.guard = OverrunGuard(self.policy, max_in_flight=1, max_queued=2)
+        self.instrument = object()
+        self.launched = []
+
+    def launch(self, variables):
+        future = Future()
+        self.launched.append((variables, future))
+        return future
+
+    def finish(self, index=0):
+        self.launched[index][1].set_result(None)
+
+
+class TestLimits(TestOverrunGuard):
+    def test_launch_when_idle(self):
+        self.guard.offer(self.instrument, ("a",), self.launch)
+        self.assertEqual([("a",)], [item[0] for item in self.launched])
+        self.assertEqual(1, self.guard.in_flight(self.instrument))
+
+    def test_slot_freed_when_finished(self):
+        self.guard.offer(self.instrument, ("a",), self.launch)
+        self.finish()
+        self.assertEqual(0, self.guard.in_flight(self.instrument))
+
+    def test_instruments_limited_separately(self):
+        self.guard.offer(self.instrument, ("a",), self.launch)
+        self.guard.offer(object(), ("b",), self.launch)
+        self.assertEqual(2, len(self.launched))
+
+    def test_bad_limit(self):
+        with self.assertRaises(ValueError):
+            OverrunGuard(max_in_flight=0)
+
+
+class TestSkip(TestOverrunGuard):
+    def test_busy_measurement_skipped(self):
+        self.guard.offer(self.instrument, ("a",), self.launch)
+        self.guard.offer(self.instrument, ("b",), self.launch)
+        self.finish()
+
+        self.assertEqual(1, len(self.launched))
+        self.assertEqual({"skipped": 1, "late": 0}, self.guard.summary())
+
+
+class TestCoalesce(TestOverrunGuard):
+    policy = OverrunPolicy.COALESCE
+
+    def test_waiting_measurements_merged(self):
+        self.guard.offer(self.instrument, ("a",), self.launch)
+        self.guard.offer(self.instrument, ("b",), self.launch)
+        self.guard.offer(self.instrument, ("a", "c"), self.launch)
+        self.assertEqual(1, self.guard.waiting(self.instrument))
+
+        self.finish()
+
+        self.assertEqual(("b", "a", "c"), self.launched[1][0])
+        self.assertEqual({"skipped": 1, "late": 1}, self.guard.summary())
+
+
+class TestQueue(TestOverrunGuard):
+    policy = OverrunPolicy.QUEUE
+
+    def test_oldest_dropped_when_full(self):
+        for variable in ("a", "b", "c", "d"):
+            self.guard.offer(self.instrument, (variable,), self.launch)
+        self.assertEqual(2, self.guard.waiting(self.instrument))
+
+        self.finish(0)
+        self.finish(1)
+
+        self.assertEqual(
+            [("a",), ("c",), ("d",)], [item[0] for item in self.launched]
+        )
+        self.assertEqual({"skipped": 1, "late": 2}, self.guard.summary())
@@ -0,0 +1,110 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.samples`
+"""
+import unittest
+from concurrent.futures import Future
+from threading import Timer
+from mr_freeze.samples import Reading, SampleRecord, SampleStream, collect
+
+
+class TestReading(unittest.TestCase):
+    def test_now(self):
+        reading = Reading.now(int, 1)
+        self.assertTrue(reading.ok)
+        self.assertEqual(1, reading.value)
+
+    def test_failed(self):
+        reading = Reading.failed(int, IOError("No reply"))
+        self.assertFalse(reading.ok)
+        self.assertIsNone(reading.value)
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            Reading.now(int, 1).value = 2
+
+
+class TestSampleRecord(unittest.TestCase):
+    def setUp(self):
+        self.first = Reading.now(int, 1)
+        self.failed = Reading.failed(str, IOError("No reply"))
+        self.record = SampleRecord((self.first, self.failed))
+
+    def test_value(self):
+        self.assertEqual(1, self.record.value(int))
+        self.assertEqual("missing", self.record.value(str, "missing"))
+        self.assertIsNone(self.record.value(float))
+
+    def test_errors(self):
+        self.assertEqual((self.failed,), self.record.errors)
+
+    def test_timestamps_of_last_reading(self):
+        self.assertEqual(self.failed.monotonic, self.record.monotonic)
+        self.assertEqual(self.failed.wall_clock, self.record.wall_clock)
+
+    def test_empty_record(self):
+        self.assertIsNone(SampleRecord().wall_clock)
+
+    def test_merge_keeps_newest(self):
+        newer = Reading.now(int, 2)
+        merged = SampleRecord.merge((self.record, SampleRecord((newer,))))
+        self.assertEqual(2, merged.value(int))
+        self.assertEqual({int, str}, set(merged.variables))
+
+
+class TestCollect(unittest.TestCase):
+    def test_record_after_all_parts(self):
+        first, second = Future(), Future()
+        record = collect([((int,), first), ((str,), second)])
+
+        first.set_result((Reading.now(int, 1),))
+        self.assertFalse(record.done())
+        second.set_exception(IOError("No reply"))
+
+        self.assertEqual(1, record.result().value(int))
+        self.assertEqual((str,), tuple(
+            reading.variable for reading in record.result().errors
+        ))
+
+    def test_no_parts(self):
+        self.assertEqual((), collect([]).result().readings)
+
+
+class TestSampleStream(unittest.TestCase):
+    def setUp(self):
+        self.stream = SampleStream()
+        self.subscription = self.stream.subscribe(maxlen=2)
+        self.records = [SampleRecord((Reading.now(int, value),))
+                        for value in range(3)]
+
+    def test_take_batch(self):
+        for record in self.records[:2]:
+            self.stream.publish(record)
+        self.assertEqual(self.records[:2], self.subscription.take())
+        self.assertEqual([], self.subscription.take())
+
+    def test_take_at_most(self):
+        for record in self.records[:2]:
+            self.stream.publish(record)
+        self.assertEqual(self.records[:1], self.subscription.take(1))
+
+    def test_oldest_dropped_when_full(self):
+        for record in self.records:
+            self.stream.publish(record)
+        self.assertEqual(self.records[1:], self.subscription.take())
+        self.assertEqual(1, self.subscription.dropped)
+
+    def test_take_waits_for_record(self):
+        Timer(0.01, self.stream.publish, (self.records[0],)).start()
+        self.assertEqual(self.records[:1], self.subscription.take(timeout=1))
+
+    def test_closed_subscription_not_sent_records(self):
+        self.subscription.close()
+        self.stream.publish(self.records[0])
+        self.assertEqual(0, len(self.subscription))
+
+    def test_publish_when_done(self):
+        future = Future()
+        self.stream.publish_when_done(future)
+        future.set_result(self.records[0])
+        self.assertEqual(self.records[:1], self.subscription.take())
@@ -0,0 +1,117 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.scheduler`
+"""
+import unittest
+import unittest.mock as mock
+from threading import Event
+from mr_freeze.scheduler import Scheduler
+from mr_freeze.timers import TimerQueue
+
+
+class TestScheduler(unittest.TestCase):
+    """
+    Runs the scheduler against a timer queue that never fires, so that jobs
+    are run by calling the scheduler directly
+    """
+    def setUp(self):
+        self.now = 100.0
+        self.timers = mock.MagicMock(spec=TimerQueue)
+        self.timers.clock = lambda: self.now
+        self.scheduler = Scheduler(self.timers)
+        self.callback = mock.MagicMock()
+
+
+class TestEvery(TestScheduler):
+    def test_first_run_one_interval_away(self):
+        job = self.scheduler.every(0.5, self.callback, tag="job")
+        self.assertEqual(100.5, job.next_run)
+        self.timers.call_at.assert_called_once_with(
+            100.5, self.scheduler._run, job
+        )
+
+    def test_interval_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.scheduler.every(0, self.callback)
+
+
+class TestRun(TestScheduler):
+    def setUp(self):
+        TestScheduler.setUp(self)
+        self.job = self.scheduler.every(1, self.callback, "argument")
+
+    def test_callback_called(self):
+        self.now = 101.0
+        self.scheduler._run(self.job)
+        self.callback.assert_called_once_with("argument")
+
+    def test_next_run_from_due_time(self):
+        self.now = 101.25
+        self.scheduler._run(self.job)
+        self.assertEqual(102, self.job.next_run)
+        self.assertAlmostEqual(0.25, self.job.lateness.maximum)
+
+    def test_missed_runs_skipped(self):
+        def slow_job(_):
+            self.now = 103.5
+
+        self.callback.side_effect = slow_job
+        self.now = 101
+        self.scheduler._run(self.job)
+
+        self.assertEqual(1, self.job.skipped)
+        self.assertEqual(103, self.job.next_run)
+
+    def test_error_does_not_stop_job(self):
+        self.callback.side_effect = ValueError("error")
+        self.now = 101
+        self.scheduler._run(self.job)
+        self.assertEqual(102, self.job.next_run)
+
+    def test_cancelled_job_not_run(self):
+        self.job.cancel()
+        self.scheduler._run(self.job)
+        self.assertFalse(self.callback.called)
+
+
+class TestClear(TestScheduler):
+    def test_clear_by_tag(self):
+        kept = self.scheduler.every(1, self.callback, tag="kept")
+        cleared = self.scheduler.every(1, self.callback, tag="cleared")
+
+        self.scheduler.clear("cleared")
+
+        self.assertEqual([kept], self.scheduler.jobs)
+        self.assertTrue(cleared.cancelled)
+
+    def test_clear_all(self):
+        self.scheduler.every(1, self.callback, tag="first")
+        self.scheduler.every(1, self.callback, tag="second")
+        self.scheduler.clear()
+        self.assertEqual([], self.scheduler.jobs)
+
+
+class TestLateness(TestScheduler):
+    def test_lateness_keyed_by_tag(self):
+        job = self.scheduler.every(1, self.callback, tag="job")
+        self.now = 101.5
+        self.scheduler._run(job)
+
+        lateness = self.scheduler.lateness()
+        self.assertEqual(1, lateness["job"]["count"])
+        self.assertEqual(0, lateness["job"]["skipped"])
+
+
+class TestWithTimerQueue(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = Scheduler()
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_sub_second_interval(self):
+        done = Event()
+        job = self.scheduler.every(
+            0.01, lambda: job.runs >= 3 and done.set()
+        )
+        self.assertTrue(done.wait(1))
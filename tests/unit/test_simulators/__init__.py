@@ -0,0 +1,3 @@
+"""
+Contains unit tests for the instrument simulators
+"""
@@ -0,0 +1,155 @@
+"""
+Contains unit tests for the Cryomagnetics simulators
+"""
+import unittest
+import quantities as pq
+from mr_freeze.devices.connection_registry import ConnectionRegistry
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
+from mr_freeze.simulators.cryomagnetics import Cryomagnetics4GSimulator, \
+    CryomagneticsLM510Simulator
+
+
+class Clock(object):
+    def __init__(self):
+        self.time = 0.0
+
+    def __call__(self):
+        return self.time
+
+
+class TestCryomagnetics4GSimulator(unittest.TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.simulator = Cryomagnetics4GSimulator(
+            sweep_rate=1.0, clock=self.clock
+        )
+
+    def tearDown(self):
+        self.simulator.stop()
+
+
+class TestEchoProtocol(TestCryomagnetics4GSimulator):
+    def test_query_is_echoed_and_answered(self):
+        self.assertEqual(
+            "IOUT?\r\n0.0000A\r\n", self.simulator.respond("IOUT?")
+        )
+
+    def test_command_is_echoed(self):
+        self.assertEqual("REMOTE\r\n", self.simulator.respond("REMOTE"))
+        self.assertTrue(self.simulator.remote)
+
+    def test_unknown_command_is_echoed(self):
+        self.assertEqual("BOGUS?\r\n", self.simulator.respond("BOGUS?"))
+
+    def test_malformed_command_is_echoed(self):
+        self.assertEqual("ULIM x\r\n", self.simulator.respond("ULIM x"))
+
+
+class TestCurrentRamp(TestCryomagnetics4GSimulator):
+    def setUp(self):
+        super().setUp()
+        self.simulator.respond("ULIM 2.0000")
+        self.simulator.respond("LLIM -1.0000")
+
+    def test_limits(self):
+        self.assertEqual(
+            "ULIM?\r\n2.0000A\r\n", self.simulator.respond("ULIM?")
+        )
+        self.assertEqual(
+            "LLIM?\r\n-1.0000A\r\n", self.simulator.respond("LLIM?")
+        )
+
+    def test_sweep_up_stops_at_upper_limit(self):
+        self.simulator.respond("SWEEP UP")
+        self.clock.time = 1.5
+        self.assertAlmostEqual(1.5, self.simulator.current)
+        self.clock.time = 10.0
+        self.assertAlmostEqual(2.0, self.simulator.current)
+
+    def test_fast_sweep_down(self):
+        self.simulator.respond("SWEEP DOWN FAST")
+        self.clock.time = 0.05
+        self.assertAlmostEqual(-0.5, self.simulator.current)
+        self.assertIn("Sweep Down", self.simulator.respond("SWEEP?"))
+
+    def test_pause(self):
+        self.simulator.respond("SWEEP UP")
+        self.clock.time = 1.0
+        self.simulator.respond("SWEEP PAUSE")
+        self.clock.time = 5.0
+        self.assertAlmostEqual(1.0, self.simulator.current)
+
+    def test_current_in_gauss(self):
+        self.simulator.respond("SWEEP UP")
+        self.clock.time = 1.0
+        self.simulator.respond("UNITS G")
+        self.assertEqual(
+            "IOUT?\r\n1000.0000G\r\n", self.simulator.respond("IOUT?")
+        )
+
+
+class TestCryomagneticsLM510Simulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = CryomagneticsLM510Simulator(
+            helium_level=50.0, nitrogen_level=20.0, helium_boil_off=0.5
+        )
+
+    def tearDown(self):
+        self.simulator.stop()
+
+    def test_helium_data_ready_after_measurement(self):
+        self.assertEqual("*STB?\r\n4\r\n", self.simulator.respond("*STB?"))
+        self.assertEqual("MEAS 1\r\n", self.simulator.respond("MEAS 1"))
+        self.assertEqual("*STB?\r\n5\r\n", self.simulator.respond("*STB?"))
+
+    def test_helium_boils_off(self):
+        self.simulator.respond("MEAS 1")
+        self.assertEqual(
+            "MEAS? 1\r\n49.5 cm\r\n", self.simulator.respond("MEAS? 1")
+        )
+
+    def test_nitrogen_level(self):
+        self.assertEqual(
+            "MEAS? 2\r\n20.0 cm\r\n", self.simulator.respond("MEAS? 2")
+        )
+
+    def test_reset(self):
+        self.simulator.respond("CHAN 2")
+        self.simulator.respond("*RST")
+        self.assertEqual("CHAN?\r\n1\r\n", self.simulator.respond("CHAN?"))
+
+
+class TestAdapters(unittest.TestCase):
+    """
+    Checks that the adapters talk to the simulators over the pseudo-terminal
+    without modification
+    """
+    def setUp(self):
+        self.registry = ConnectionRegistry()
+
+    def test_power_supply(self):
+        with Cryomagnetics4GSimulator() as simulator:
+            adapter = Cryomagnetics4G(registry=self.registry)
+            adapter.port_name = simulator.port_name
+            adapter.open().instrument_measurement_timeout = 0
+            try:
+                adapter.upper_sweep_current = 1.5 * pq.A
+                self.assertEqual(1.5 * pq.A, adapter.upper_sweep_current)
+                self.assertEqual(0.0 * pq.A, adapter.current)
+            finally:
+                adapter.close()
+
+    def test_level_meter(self):
+        with CryomagneticsLM510Simulator(
+                helium_level=42.0, helium_boil_off=0.5
+        ) as simulator:
+            adapter = CryomagneticsLM510(registry=self.registry)
+            adapter.port_name = simulator.port_name
+            try:
+                self.assertEqual(
+                    41.5 * pq.cm, adapter.channel_1_measurement
+                )
+                self.assertEqual(30.0 * pq.cm, adapter.channel_2_measurement)
+            finally:
+                adapter.close()
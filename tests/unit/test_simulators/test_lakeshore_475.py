@@ -0,0 +1,63 @@
+"""
+Contains unit tests for the Lakeshore 475 simulator
+"""
+import unittest
+import quantities as pq
+from mr_freeze.devices.connection_registry import ConnectionRegistry
+from mr_freeze.devices.lakeshore_475 import Lakeshore475
+from mr_freeze.simulators.lakeshore_475 import Lakeshore475Simulator
+
+
+class TestLakeshore475Simulator(unittest.TestCase):
+    def setUp(self):
+        self.simulator = Lakeshore475Simulator(gpib_address=12, field=3.0)
+
+    def tearDown(self):
+        self.simulator.stop()
+
+
+class TestAdapterCommands(TestLakeshore475Simulator):
+    def test_version(self):
+        self.assertEqual("4\r", self.simulator.respond("+ver"))
+
+    def test_address(self):
+        self.assertEqual("", self.simulator.respond("+a:12"))
+        self.assertEqual(12, self.simulator.selected_address)
+
+    def test_other_address_is_ignored(self):
+        self.simulator.respond("+a:3")
+        self.assertEqual("", self.simulator.respond("RDGFIELD?"))
+
+
+class TestInstrumentCommands(TestLakeshore475Simulator):
+    def setUp(self):
+        super().setUp()
+        self.simulator.respond("+a:12")
+
+    def test_field(self):
+        self.assertEqual("3.0000\r", self.simulator.respond("RDGFIELD?"))
+
+    def test_field_source(self):
+        self.simulator.field_source = lambda: 7.5
+        self.assertEqual("7.5000\r", self.simulator.respond("RDGFIELD?"))
+
+    def test_unit_is_gauss(self):
+        self.assertEqual("1\r", self.simulator.respond("UNIT?"))
+
+
+class TestAdapter(unittest.TestCase):
+    """
+    Checks that the adapter talks to the simulator over the pseudo-terminal
+    without modification
+    """
+    def test_field(self):
+        with Lakeshore475Simulator(field=12.5) as simulator:
+            adapter = Lakeshore475(registry=ConnectionRegistry())
+            adapter.port_name = simulator.port_name
+            try:
+                self.assertEqual(12.5 * pq.gauss, adapter.field)
+                self.assertIn(
+                    "RDGFIELD?", adapter.open().command_metrics.summary()
+                )
+            finally:
+                adapter.close()
@@ -0,0 +1,92 @@
+"""
+Contains unit tests for the pseudo-terminal simulator base class
+"""
+import os
+import select
+import unittest
+from time import monotonic
+from mr_freeze.simulators.pseudo_terminal import PseudoTerminalSimulator, \
+    Fault
+
+
+class EchoSimulator(PseudoTerminalSimulator):
+    """
+    Answers each command with the command itself
+    """
+    def respond(self, command):
+        return command + "\r\n"
+
+
+class TestPseudoTerminalSimulator(unittest.TestCase):
+    simulator_arguments = {}
+
+    def setUp(self):
+        self.simulator = EchoSimulator(seed=0, **self.simulator_arguments)
+        self.simulator.start()
+        self.port = os.open(self.simulator.port_name, os.O_RDWR)
+
+    def tearDown(self):
+        os.close(self.port)
+        self.simulator.stop()
+
+    def send(self, data, expected_size):
+        os.write(self.port, data)
+        received = b""
+        while len(received) < expected_size:
+            readable, _, _ = select.select([self.port], [], [], 2)
+            if not readable:
+                break
+            received += os.read(self.port, expected_size - len(received))
+        return received
+
+
+class TestRespond(TestPseudoTerminalSimulator):
+    def test_reply(self):
+        self.assertEqual(b"*IDN?\r\n", self.send(b"*IDN?\n", 7))
+        self.assertEqual(1, self.simulator.commands_received)
+
+    def test_commands_split_on_either_terminator(self):
+        self.assertEqual(b"A\r\nB\r\n", self.send(b"A\rB\n", 6))
+        self.assertEqual(2, self.simulator.commands_received)
+
+    def test_partial_command_waits_for_terminator(self):
+        self.assertEqual(b"", self.send(b"AB", 1))
+        self.assertEqual(b"ABC\r\n", self.send(b"C\r", 5))
+
+
+class TestFaults(TestPseudoTerminalSimulator):
+    def test_drop(self):
+        self.simulator.inject_fault(Fault.DROP)
+        self.assertEqual(b"", self.send(b"A\n", 1))
+        self.assertEqual(b"B\r\n", self.send(b"B\n", 3))
+
+    def test_truncate(self):
+        self.simulator.inject_fault(Fault.TRUNCATE)
+        self.assertEqual(b"ABC", self.send(b"ABCDE\n", 3))
+
+    def test_garble(self):
+        self.simulator.inject_fault(Fault.GARBLE)
+        reply = self.send(b"ABCDE\n", 7)
+        self.assertEqual(7, len(reply))
+        self.assertNotEqual(b"ABCDE\r\n", reply)
+
+
+class TestRandomFaults(TestPseudoTerminalSimulator):
+    simulator_arguments = {
+        "fault_probability": 1.0, "faults": (Fault.TRUNCATE,)
+    }
+
+    def test_every_reply_is_faulty(self):
+        self.assertEqual(b"ABC", self.send(b"ABCD\n", 3))
+        self.assertEqual(b"ABC", self.send(b"ABCD\n", 3))
+
+
+class TestLatency(TestPseudoTerminalSimulator):
+    simulator_arguments = {
+        "per_command_latency": 0.05, "per_byte_latency": 0.01
+    }
+
+    def test_latency(self):
+        started_at = monotonic()
+        self.assertEqual(b"AB\r\n", self.send(b"AB\n", 4))
+        self.assertGreaterEqual(monotonic() - started_at, 0.09)
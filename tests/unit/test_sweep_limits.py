@@ -0,0 +1,123 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.sweep_limits`
+"""
+import unittest
+import unittest.mock as mock
+from concurrent.futures import Executor, Future
+from quantities import amperes
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.exceptions import TaskTimeoutError
+from mr_freeze.sweep_limits import SweepLimitWriter
+
+
+class TestSweepLimitWriter(unittest.TestCase):
+    def setUp(self):
+        self.power_supply = mock.MagicMock(spec=Cryomagnetics4G)
+        self.executor = mock.MagicMock(spec=Executor)
+        self.writes = []
+        self.executor.submit.side_effect = self._submit
+        self.writer = SweepLimitWriter(self.power_supply, self.executor)
+
+    def _submit(self, function, *args):
+        future = Future()
+        self.writes.append((function, args, future))
+        return future
+
+    def _run(self) -> None:
+        function, args, future = self.writes.pop(0)
+        try:
+            future.set_result(function(*args))
+        except Exception as error:
+            future.set_exception(error)
+
+
+class TestCoalesce(TestSweepLimitWriter):
+    def test_one_write_queued(self):
+        self.writer.set_upper(1 * amperes)
+        self.writer.set_upper(2 * amperes)
+        self.writer.set_lower(0.5 * amperes)
+        self.assertEqual(1, len(self.writes))
+
+    def test_latest_values_written_together(self):
+        first = self.writer.set_upper(1 * amperes)
+        second = self.writer.set_upper(2 * amperes)
+        lower = self.writer.set_lower(0.5 * amperes)
+        self._run()
+
+        self.power_supply.set_sweep_limits.assert_called_once_with(
+            upper=2 * amperes, lower=0.5 * amperes
+        )
+        for future in (first, second, lower):
+            self.assertIsNone(future.result(0))
+        self.assertEqual(2, self.writer.writes)
+        self.assertEqual(1, self.writer.skipped)
+
+    def test_change_after_write_started_queued_again(self):
+        self.writer.set_upper(1 * amperes)
+        self._run()
+        self.writer.set_upper(2 * amperes)
+        self.assertEqual(1, len(self.writes))
+
+
+class TestConfirmed(TestSweepLimitWriter):
+    def test_unchanged_value_skipped(self):
+        self.writer.set_upper(1 * amperes)
+        self._run()
+        future = self.writer.set_upper(1 * amperes)
+        self._run()
+
+        self.assertEqual(1, self.power_supply.set_sweep_limits.call_count)
+        self.assertIsNone(future.result(0))
+        self.assertEqual(1, self.writer.skipped)
+
+    def test_only_changed_limit_written(self):
+        self.writer.set_upper(1 * amperes)
+        self.writer.set_lower(0 * amperes)
+        self._run()
+        self.writer.set_upper(1 * amperes)
+        self.writer.set_lower(0.5 * amperes)
+        self._run()
+
+        self.assertEqual(
+            mock.call(upper=None, lower=0.5 * amperes),
+            self.power_supply.set_sweep_limits.call_args
+        )
+
+
+class TestFailures(TestSweepLimitWriter):
+    def test_failed_write(self):
+        self.power_supply.set_sweep_limits.side_effect = IOError("No reply")
+        future = self.writer.set_upper(1 * amperes)
+        self._run()
+        self.assertIsInstance(future.exception(0), IOError)
+
+        self.power_supply.set_sweep_limits.side_effect = None
+        self.writer.set_upper(1 * amperes)
+        self._run()
+        self.assertEqual(2, self.power_supply.set_sweep_limits.call_count)
+
+    def test_dropped_write_submitted_again(self):
+        future = self.writer.set_lower(1 * amperes)
+        self.writes.pop(0)[2].set_exception(TaskTimeoutError("Dropped"))
+        self.assertFalse(future.done())
+        self.assertEqual(1, len(self.writes))
+
+        self._run()
+        self.power_supply.set_sweep_limits.assert_called_once_with(
+            upper=None, lower=1 * amperes
+        )
+        self.assertIsNone(future.result(0))
+
+    def test_dropped_write_given_up(self):
+        future = self.writer.set_lower(1 * amperes)
+        for _ in range(self.writer.max_attempts):
+            self.writes.pop(0)[2].set_exception(TaskTimeoutError("Dropped"))
+        self.assertEqual([], self.writes)
+        self.assertIsInstance(future.exception(0), TaskTimeoutError)
+
+        self.writer.set_upper(2 * amperes)
+        self._run()
+        self.power_supply.set_sweep_limits.assert_called_once_with(
+            upper=2 * amperes, lower=None
+        )
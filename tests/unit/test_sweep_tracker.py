@@ -0,0 +1,204 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.sweep_tracker`
+"""
+import unittest
+import unittest.mock as mock
+from concurrent.futures import Executor, Future
+from quantities import A, gauss
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.executors import instrument_key
+from mr_freeze.resources.application_state import Current
+from mr_freeze.samples import Reading, SampleRecord, SampleStream
+from mr_freeze.sweep_tracker import SweepResult, SweepTracker
+
+
+class FakeTimers(object):
+    """
+    Keeps the timers that the tracker sets, so that the tests can fire them
+    """
+    def __init__(self) -> None:
+        self.time = 100.0
+        self.timers = []
+
+    def clock(self) -> float:
+        return self.time
+
+    def call_later(self, delay, callback, *args):
+        timer = mock.MagicMock()
+        timer.delay = delay
+        self.timers.append((timer, callback, args))
+        return timer
+
+    def fire(self) -> float:
+        timer, callback, args = self.timers.pop(0)
+        while timer.cancel.called:
+            timer, callback, args = self.timers.pop(0)
+        self.time += timer.delay
+        callback(*args)
+        return timer.delay
+
+
+def reading(value, when: float, source=None) -> SampleRecord:
+    return SampleRecord((Reading(Current, value, when, None, None, source),))
+
+
+class TestSweepTracker(unittest.TestCase):
+    def setUp(self):
+        self.timers = FakeTimers()
+        self.samples = SampleStream()
+        self.power_supply = mock.MagicMock(spec=Cryomagnetics4G)
+        self.power_supply.minimum_command_gap = 0.3
+        self.executor = mock.MagicMock(spec=Executor)
+        self.reads = []
+        self.executor.submit.side_effect = self._submit
+
+        self.tracker = SweepTracker(
+            self.timers, self.samples, initial_interval=1.0,
+            maximum_interval=10.0
+        )
+
+    def _submit(self, function, *args):
+        future = Future()
+        self.reads.append((function, args, future))
+        return future
+
+    def _reading(self, value, when: float) -> SampleRecord:
+        return reading(value, when, instrument_key(self.power_supply))
+
+    def _answer(self, current) -> None:
+        future = self.reads.pop(0)[2]
+        future.set_result(Reading(
+            Current, current, self.timers.time, None, None,
+            instrument_key(self.power_supply)
+        ))
+
+
+class TestTrack(TestSweepTracker):
+    def test_reached(self):
+        future = self.tracker.track(
+            self.power_supply, 2 * A, self.executor
+        )
+        self.assertEqual(1.0, self.timers.fire())
+        self._answer(1.0 * A)
+        self.assertFalse(future.done())
+
+        self.timers.fire()
+        self._answer(2.0 * A)
+        self.assertEqual(SweepResult(2 * A, 2 * A, True), future.result(0))
+        self.assertFalse(self.tracker.sweeping(self.power_supply))
+
+    def test_interval_follows_rate(self):
+        self.tracker.track(self.power_supply, 10 * A, self.executor)
+        self.timers.fire()
+        self._answer(0.0 * A)
+        self.assertEqual(1.0, self.timers.fire())
+        self._answer(1.0 * A)
+        self.assertEqual(4.5, self.timers.timers[0][0].delay)
+
+    def test_interval_not_below_command_gap(self):
+        self.tracker.track(self.power_supply, 1.05 * A, self.executor)
+        self.timers.fire()
+        self._answer(0.0 * A)
+        self.timers.fire()
+        self._answer(1.0 * A)
+        self.assertEqual(0.3, self.timers.timers[0][0].delay)
+
+    def test_unknown_target(self):
+        future = self.tracker.track(
+            self.power_supply, Cryomagnetics4G.null_value, self.executor
+        )
+        self.assertFalse(future.result(0).reached)
+        self.assertEqual([], self.timers.timers)
+
+    def test_replaced(self):
+        first = self.tracker.track(self.power_supply, 2 * A, self.executor)
+        second = self.tracker.track(self.power_supply, 0 * A, self.executor)
+        self.assertFalse(first.result(0).reached)
+        self.assertFalse(second.done())
+
+
+class TestPause(TestSweepTracker):
+    def test_pause(self):
+        future = self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.tracker.pause(self.power_supply)
+        self.assertFalse(future.result(0).reached)
+        self.assertTrue(self.timers.timers[0][0].cancel.called)
+
+
+class TestTimeout(TestSweepTracker):
+    def test_stuck_sweep_not_reached(self):
+        self.tracker.max_duration = 15.0
+        future = self.tracker.track(self.power_supply, 2 * A, self.executor)
+        for _ in range(3):
+            self.timers.fire()
+            self._answer(1.0 * A)
+        self.assertEqual(3.0, self.timers.timers[0][0].delay)
+
+        self.timers.fire()
+        self.assertEqual([], self.reads)
+        self.assertEqual(
+            SweepResult(2 * A, 1 * A, False), future.result(0)
+        )
+        self.assertFalse(self.tracker.sweeping(self.power_supply))
+
+
+class TestSharedReadings(TestSweepTracker):
+    def test_shared_reading_replaces_poll(self):
+        self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.samples.publish(self._reading(1.0 * A, 100.5))
+        self.timers.fire()
+        self.assertEqual([], self.reads)
+        self.assertAlmostEqual(0.5, self.timers.timers[0][0].delay)
+
+    def test_shared_reading_resolves(self):
+        future = self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.samples.publish(self._reading(2.0 * A, 100.5))
+        self.timers.fire()
+        self.assertTrue(future.result(0).reached)
+
+    def test_readings_before_sweep_ignored(self):
+        self.tracker.track(self.power_supply, 0 * A, self.executor)
+        self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.samples.publish(self._reading(2.0 * A, 99.0))
+        self.timers.fire()
+        self.assertEqual(1, len(self.reads))
+
+    def test_other_power_supply_ignored(self):
+        future = self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.samples.publish(reading(2.0 * A, 100.5, ("/dev/ttyUSB3", None)))
+        self.timers.fire()
+        self.assertFalse(future.done())
+        self.assertEqual(1, len(self.reads))
+
+    def test_own_readings_published(self):
+        subscription = self.samples.subscribe()
+        self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.timers.fire()
+        self._answer(1.0 * A)
+        record, = subscription.take()
+        self.assertEqual(1.0 * A, record.value(Current))
+
+
+class TestReadSweepCurrent(TestSweepTracker):
+    def test_reads_current(self):
+        self.tracker.track(self.power_supply, 2 * A, self.executor)
+        self.timers.fire()
+        function, args, future = self.reads.pop(0)
+        self.power_supply.current = 1.0 * A
+        self.assertEqual(1.0 * A, function(*args).value)
+
+
+class TestFailures(TestSweepTracker):
+    def test_fails_after_repeated_errors(self):
+        future = self.tracker.track(self.power_supply, 2 * A, self.executor)
+        for _ in range(3):
+            self.timers.fire()
+            self.reads.pop(0)[2].set_exception(IOError("No reply"))
+        self.assertIsInstance(future.exception(0), IOError)
+
+    def test_bad_reading_ignored(self):
+        future = self.tracker.track(self.power_supply, 0 * A, self.executor)
+        self.timers.fire()
+        self._answer(0 * gauss)
+        self.assertFalse(future.done())
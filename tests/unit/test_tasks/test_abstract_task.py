@@ -1,6 +1,10 @@
 import unittest
 import unittest.mock as mock
 from concurrent.futures import Executor, ThreadPoolExecutor
+from threading import Event
+from time import sleep
+from mr_freeze.exceptions import TaskDroppedError, TaskTimeoutError
+from mr_freeze.executors import InstrumentAffineExecutor, Priority
 from mr_freeze.tasks.abstract_task import AbstractTask
 
 
@@ -78,4 +82,141 @@ class TestCallWithRealExecutor(TestAbstractTask):
 
             :param executor: The executor
             """
-            raise ValueError("Kaboom")
\ No newline at end of file
+            raise ValueError("Kaboom")
+
+class TestCallWithInstrumentAffineExecutor(TestAbstractTask):
+    """
+    Tests that tasks naming an instrument run in that instrument's lane
+    """
+    def setUp(self):
+        TestAbstractTask.setUp(self)
+        self.executor = mock.MagicMock(spec=InstrumentAffineExecutor)
+
+    def test_task_without_instrument(self):
+        self.task(self.executor)
+        self.assertTrue(self.executor.submit.called)
+        self.assertFalse(self.executor.submit_to.called)
+
+    def test_task_with_instrument(self):
+        self.task.instrument = mock.MagicMock()
+        self.task(self.executor)
+        self.assertEqual(
+            self.task.instrument, self.executor.submit_to.call_args[0][0]
+        )
+
+    def test_priority_passed_to_lane(self):
+        self.task.instrument = mock.MagicMock()
+        self.task.priority = Priority.CONTROL
+        self.task(self.executor)
+        self.assertEqual(
+            Priority.CONTROL,
+            self.executor.submit_to.call_args[1]["priority"]
+        )
+
+
+class TestDeadline(TestAbstractTask):
+    """
+    Tests that tasks are held to their deadlines
+    """
+    def setUp(self):
+        TestAbstractTask.setUp(self)
+        self.executor = InstrumentAffineExecutor(workers=1)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_task_in_time(self):
+        self.task.timeout = 60
+        self.assertEqual(1, self.task(self.executor).result())
+
+    def test_queued_past_deadline_dropped(self):
+        started = Event()
+        release = Event()
+
+        class BlockingTask(AbstractTask):
+            def task(self, executor: Executor) -> None:
+                started.set()
+                release.wait(1)
+
+        BlockingTask()(self.executor)
+        started.wait(1)
+
+        late = self.ConcreteCountingTask()
+        late.timeout = 0.01
+        future = late(self.executor)
+        sleep(0.02)
+        release.set()
+
+        with self.assertRaises(TaskDroppedError):
+            future.result()
+        self.assertEqual(0, late.runs)
+
+    def test_running_task_interrupted(self):
+        interrupted = Event()
+        instrument = mock.MagicMock()
+        instrument.interrupt.side_effect = interrupted.set
+
+        class HangingTask(AbstractTask):
+            timeout = 0.01
+
+            def task(self, executor: Executor) -> None:
+                if interrupted.wait(1):
+                    raise IOError("Read cancelled")
+
+        hanging = HangingTask()
+        hanging.instrument = instrument
+
+        with self.assertRaises(TaskTimeoutError):
+            hanging(self.executor).result()
+
+    @mock.patch("mr_freeze.tasks.abstract_task.watchdog.call_at")
+    def test_not_interrupted_after_return(self, call_at):
+        instrument = mock.MagicMock()
+        self.task.instrument = instrument
+        self.task.timeout = 60
+
+        self.assertEqual(1, self.task(self.executor).result())
+        deadline, interrupt = call_at.call_args[0]
+        interrupt()
+
+        self.assertFalse(instrument.interrupt.called)
+
+    @mock.patch("mr_freeze.tasks.abstract_task.watchdog.call_at")
+    def test_interrupted_while_running(self, call_at):
+        instrument = mock.MagicMock()
+
+        class InterruptedTask(AbstractTask):
+            timeout = 60
+
+            def task(self, executor: Executor) -> None:
+                call_at.call_args[0][1]()
+
+        interrupted = InterruptedTask()
+        interrupted.instrument = instrument
+        interrupted(self.executor).result()
+
+        self.assertTrue(instrument.interrupt.called)
+
+    def test_executor_timeout_used(self):
+        self.executor.task_timeout = 0.01
+
+        class SlowTask(AbstractTask):
+            def task(self, executor: Executor) -> None:
+                sleep(0.02)
+                raise IOError("Too late")
+
+        with self.assertRaises(TaskTimeoutError):
+            SlowTask()(self.executor).result()
+
+    def test_error_before_deadline_not_timeout(self):
+        self.task.timeout = 60
+        with self.assertRaises(ValueError):
+            TestCallWithRealExecutor.ConcreteFaultyTask()(
+                self.executor
+            ).result()
+
+    class ConcreteCountingTask(AbstractTask):
+        runs = 0
+
+        def task(self, executor: Executor) -> None:
+            self.runs += 1
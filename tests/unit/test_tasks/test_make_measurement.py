@@ -4,7 +4,7 @@ Contains unit tests for :mod:`mr_freeze.tasks.make_measurement`
 """
 import unittest
 import unittest.mock as mock
-from concurrent.futures import Executor
+from concurrent.futures import Executor, Future
 from mr_freeze.tasks.make_measurement import MakeMeasurement
 from mr_freeze.devices.lakeshore_475 import Lakeshore475
 from mr_freeze.devices.cryomagnetics_lm510_adapter import CryomagneticsLM510
@@ -13,7 +13,9 @@ from mr_freeze.tasks.report_magnetic_field import ReportMagneticField
 from mr_freeze.tasks.report_current import ReportCurrent
 from mr_freeze.tasks.report_liquid_nitrogen_level \
     import ReportLiquidNitrogenLevel
-from mr_freeze.resources.application_state import Store
+from mr_freeze.resources.application_state import Store, Current, \
+    LiquidHeliumLevel
+from mr_freeze.samples import SampleRecord
 
 
 class TestMakeMeasurement(unittest.TestCase):
@@ -46,6 +48,55 @@ class TestTask(TestMakeMeasurement):
     def test_task(self):
         self.task.task(self.executor)
         self.assertEqual(
-            4,
+            3,
             self.executor.submit.call_count
         )
+
+    def test_record_when_visits_finish(self):
+        futures = []
+
+        def submit(*_):
+            futures.append(Future())
+            return futures[-1]
+
+        self.executor.submit.side_effect = submit
+        record = self.task(self.executor)
+
+        for future in futures[:-1]:
+            future.set_result(())
+        self.assertFalse(record.done())
+
+        futures[-1].set_exception(IOError("No reply"))
+        self.assertIsInstance(record.result(), SampleRecord)
+        self.assertEqual(
+            set(self.task.visits[-1].variables),
+            {reading.variable for reading in record.result().errors}
+        )
+
+
+class TestVisits(TestMakeMeasurement):
+    def test_level_meter_reads_share_visit(self):
+        visits = self.task.visits
+        self.assertEqual(3, len(visits))
+        self.assertEqual(
+            (self.task.ln2_task, self.task.report_helium_task),
+            visits[0].report_tasks
+        )
+
+    def test_only_given_variables_measured(self):
+        task = MakeMeasurement(
+            self.ln2_gauge, self.power_supply, self.magnetometer,
+            self.store, (LiquidHeliumLevel, Current)
+        )
+        self.assertEqual(
+            [(task.report_helium_task,), (task.current_task,)],
+            [visit.report_tasks for visit in task.visits]
+        )
+
+    def test_no_variables(self):
+        task = MakeMeasurement(
+            self.ln2_gauge, self.power_supply, self.magnetometer,
+            self.store, ()
+        )
+        task.task(self.executor)
+        self.assertFalse(self.executor.submit.called)
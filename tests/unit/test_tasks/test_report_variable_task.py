@@ -47,3 +47,9 @@ class TestTask(TestReportVariableToStoreTask):
             self.task.variable,
             self.store[self.task.variable_type].value
         )
+
+    def test_reading_returned(self):
+        reading = self.task.task(self.executor)
+        self.assertEqual(int, reading.variable)
+        self.assertEqual(2, reading.value)
+        self.assertTrue(reading.ok)
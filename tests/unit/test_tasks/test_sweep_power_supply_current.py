@@ -4,7 +4,11 @@ Contains unit tests to test the power supply sweep
 """
 import unittest
 import unittest.mock as mock
-from concurrent.futures import Executor
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from quantities import A
+from mr_freeze.adaptive_sampling import AdaptiveSampling
+from mr_freeze.sweep_limits import SweepLimitWriter
+from mr_freeze.sweep_tracker import SweepResult, SweepTracker
 from mr_freeze.tasks.sweep_power_supply_current import SweepPowerSupply
 from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
 
@@ -15,12 +19,16 @@ class TestSweepPowerSupply(unittest.TestCase):
         self.power_supply = mock.MagicMock(spec=Cryomagnetics4G)
         self.fast_sweep = mock.MagicMock(spec=bool)
         self.executor = mock.MagicMock(spec=Executor)
+        self.tracker = mock.MagicMock(spec=SweepTracker)
 
 
 class TestTask(TestSweepPowerSupply):
     def test_up(self):
         direction = SweepPowerSupply.Direction.UP
-        task = SweepPowerSupply(direction, self.power_supply, self.fast_sweep)
+        task = SweepPowerSupply(
+            direction, self.power_supply, self.fast_sweep,
+            tracker=self.tracker
+        )
         task.task(self.executor)
 
         self.assertEqual(
@@ -30,7 +38,10 @@ class TestTask(TestSweepPowerSupply):
 
     def test_down(self):
         direction = SweepPowerSupply.Direction.DOWN
-        task = SweepPowerSupply(direction, self.power_supply, self.fast_sweep)
+        task = SweepPowerSupply(
+            direction, self.power_supply, self.fast_sweep,
+            tracker=self.tracker
+        )
         task.task(self.executor)
 
         self.assertEqual(
@@ -40,7 +51,10 @@ class TestTask(TestSweepPowerSupply):
 
     def test_zero(self):
         direction = SweepPowerSupply.Direction.ZERO
-        task = SweepPowerSupply(direction, self.power_supply, self.fast_sweep)
+        task = SweepPowerSupply(
+            direction, self.power_supply, self.fast_sweep,
+            tracker=self.tracker
+        )
         task.task(self.executor)
 
         self.assertEqual(
@@ -50,7 +64,10 @@ class TestTask(TestSweepPowerSupply):
 
     def test_pause(self):
         direction = SweepPowerSupply.Direction.PAUSE
-        task = SweepPowerSupply(direction, self.power_supply, self.fast_sweep)
+        task = SweepPowerSupply(
+            direction, self.power_supply, self.fast_sweep,
+            tracker=self.tracker
+        )
         task.task(self.executor)
 
         self.assertTrue(
@@ -59,7 +76,146 @@ class TestTask(TestSweepPowerSupply):
 
     def test_error(self):
         direction = self.direction
-        task = SweepPowerSupply(direction, self.power_supply, self.fast_sweep)
+        task = SweepPowerSupply(
+            direction, self.power_supply, self.fast_sweep,
+            tracker=self.tracker
+        )
 
         with self.assertRaises(RuntimeError):
-            task.task(self.executor)
\ No newline at end of file
+            task.task(self.executor)
+
+
+class TestSampling(TestSweepPowerSupply):
+    def setUp(self):
+        TestSweepPowerSupply.setUp(self)
+        self.sampling = mock.MagicMock(spec=AdaptiveSampling)
+
+    def test_sweep_started(self):
+        task = SweepPowerSupply(
+            SweepPowerSupply.Direction.UP, self.power_supply,
+            self.fast_sweep, self.sampling, self.tracker
+        )
+        task.task(self.executor)
+        self.assertTrue(self.sampling.sweep_started.called)
+
+    def test_pause_not_reported(self):
+        task = SweepPowerSupply(
+            SweepPowerSupply.Direction.PAUSE, self.power_supply,
+            self.fast_sweep, self.sampling, self.tracker
+        )
+        task.task(self.executor)
+        self.assertFalse(self.sampling.sweep_started.called)
+
+    def test_failed_sweep_not_reported(self):
+        self.power_supply.sweep_down.side_effect = IOError("No reply")
+        task = SweepPowerSupply(
+            SweepPowerSupply.Direction.DOWN, self.power_supply,
+            self.fast_sweep, self.sampling, self.tracker
+        )
+        with self.assertRaises(IOError):
+            task.task(self.executor)
+        self.assertFalse(self.sampling.sweep_started.called)
+
+
+class TestTracking(TestSweepPowerSupply):
+    def test_up_tracked_to_upper_limit(self):
+        task = SweepPowerSupply(
+            SweepPowerSupply.Direction.UP, self.power_supply,
+            self.fast_sweep, None, self.tracker
+        )
+        self.assertEqual(
+            self.tracker.track.return_value, task.task(self.executor)
+        )
+        self.tracker.track.assert_called_once_with(
+            self.power_supply, self.power_supply.cached_upper_sweep_current,
+            self.executor
+        )
+
+    def test_zero_tracked_to_zero(self):
+        task = SweepPowerSupply(
+            SweepPowerSupply.Direction.ZERO, self.power_supply,
+            self.fast_sweep, None, self.tracker
+        )
+        task.task(self.executor)
+        self.assertEqual(0 * A, self.tracker.track.call_args[0][1])
+
+    def test_pause_resolves_sweep(self):
+        task = SweepPowerSupply(
+            SweepPowerSupply.Direction.PAUSE, self.power_supply,
+            self.fast_sweep, None, self.tracker
+        )
+        self.assertIsNone(task.task(self.executor))
+        self.tracker.pause.assert_called_once_with(self.power_supply)
+
+
+class TestSweepLimit(TestSweepPowerSupply):
+    def setUp(self):
+        TestSweepPowerSupply.setUp(self)
+        self.limit = mock.PropertyMock(return_value=1 * A)
+        type(self.power_supply).lower_sweep_current = self.limit
+        self.power_supply.cached_lower_sweep_current = \
+            Cryomagnetics4G.null_value
+        self.limits = mock.MagicMock(spec=SweepLimitWriter)
+        self.limits.confirmed.return_value = None
+
+    def _sweep_down(self):
+        SweepPowerSupply(
+            SweepPowerSupply.Direction.DOWN, self.power_supply,
+            self.fast_sweep, None, self.tracker, self.limits
+        ).task(self.executor)
+        return self.tracker.track.call_args[0][1]
+
+    def test_cached_limit_used(self):
+        self.power_supply.cached_lower_sweep_current = 2 * A
+        self.assertEqual(2 * A, self._sweep_down())
+        self.assertFalse(self.limit.called)
+
+    def test_written_limit_used(self):
+        self.limits.confirmed.return_value = 3 * A
+        self.assertEqual(3 * A, self._sweep_down())
+        self.limits.confirmed.assert_called_once_with(
+            SweepLimitWriter.LOWER
+        )
+        self.assertFalse(self.limit.called)
+
+    def test_limit_read_if_unknown(self):
+        self.assertEqual(1 * A, self._sweep_down())
+
+
+class TestFuture(TestSweepPowerSupply):
+    def setUp(self):
+        TestSweepPowerSupply.setUp(self)
+        self.pool = ThreadPoolExecutor(1)
+        self.tracked = Future()
+        self.tracker.track.return_value = self.tracked
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def _submit(self, direction):
+        return SweepPowerSupply(
+            direction, self.power_supply, self.fast_sweep, None,
+            self.tracker
+        )(self.pool)
+
+    def test_resolves_to_result(self):
+        sweep = self._submit(SweepPowerSupply.Direction.ZERO)
+        result = SweepResult(0 * A, 0 * A, True)
+        self.pool.submit(lambda: None).result(1)
+        self.tracked.set_result(result)
+        self.assertEqual(result, sweep.result(1))
+
+    def test_pause_resolves_to_none(self):
+        sweep = self._submit(SweepPowerSupply.Direction.PAUSE)
+        self.assertIsNone(sweep.result(1))
+
+    def test_error_raised(self):
+        self.power_supply.sweep_zero.side_effect = IOError("No reply")
+        sweep = self._submit(SweepPowerSupply.Direction.ZERO)
+        self.assertIsInstance(sweep.exception(1), IOError)
+
+    def test_cancel_stops_tracking(self):
+        sweep = self._submit(SweepPowerSupply.Direction.ZERO)
+        self.pool.submit(lambda: None).result(1)
+        self.assertTrue(sweep.cancel())
+        self.assertTrue(self.tracked.cancelled())
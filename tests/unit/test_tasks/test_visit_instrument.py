@@ -0,0 +1,91 @@
+# -*- coding: utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.tasks.visit_instrument`
+"""
+import unittest
+import unittest.mock as mock
+from concurrent.futures import Executor
+from mr_freeze.deadlines import deadline_scope, watchdog
+from mr_freeze.exceptions import TaskTimeoutError
+from mr_freeze.tasks.report_variable_task import ReportVariableTask
+from mr_freeze.tasks.visit_instrument import VisitInstrument
+
+
+class TestVisitInstrument(unittest.TestCase):
+    def setUp(self):
+        self.instrument = mock.MagicMock()
+        self.instrument.minimum_command_gap = 0
+        self.first = mock.MagicMock(spec=ReportVariableTask)
+        self.first.instrument = self.instrument
+        self.second = mock.MagicMock(spec=ReportVariableTask)
+        self.second.instrument = self.instrument
+        self.executor = mock.MagicMock(spec=Executor)  # type: Executor
+
+        self.visit = VisitInstrument((self.first, self.second))
+
+
+class TestInstrument(TestVisitInstrument):
+    def test_instrument(self):
+        self.assertIs(self.instrument, self.visit.instrument)
+
+
+class TestTask(TestVisitInstrument):
+    def test_all_tasks_run(self):
+        self.visit.task(self.executor)
+        self.first.task.assert_called_once_with(self.executor)
+        self.second.task.assert_called_once_with(self.executor)
+
+    def test_error_does_not_stop_later_tasks(self):
+        self.first.task.side_effect = RuntimeError("error")
+        self.visit.task(self.executor)
+        self.assertTrue(self.second.task.called)
+
+    def test_readings_returned(self):
+        self.assertEqual(
+            (self.first.task.return_value, self.second.task.return_value),
+            self.visit.task(self.executor)
+        )
+
+    def test_failed_reading_for_error(self):
+        self.first.task.side_effect = RuntimeError("error")
+        failed, _ = self.visit.task(self.executor)
+        self.assertIs(self.first.variable_type, failed.variable)
+        self.assertEqual(repr(RuntimeError("error")), failed.error)
+
+    def test_timeout_stops_visit(self):
+        self.first.task.side_effect = TaskTimeoutError("late")
+        with self.assertRaises(TaskTimeoutError):
+            self.visit.task(self.executor)
+        self.assertFalse(self.second.task.called)
+
+    def test_error_after_deadline_stops_visit(self):
+        self.first.task.side_effect = IOError("Read cancelled")
+        with deadline_scope(watchdog.clock() - 1):
+            with self.assertRaises(TaskTimeoutError):
+                self.visit.task(self.executor)
+        self.assertFalse(self.second.task.called)
+
+
+@mock.patch("mr_freeze.tasks.visit_instrument.sleep")
+class TestCommandGap(TestVisitInstrument):
+    def setUp(self):
+        TestVisitInstrument.setUp(self)
+        self.instrument.minimum_command_gap = 0.3
+
+    def test_rest_between_reads(self, sleep):
+        calls = mock.MagicMock()
+        calls.attach_mock(self.first.task, 'first')
+        calls.attach_mock(sleep, 'sleep')
+        calls.attach_mock(self.second.task, 'second')
+
+        self.visit.task(self.executor)
+
+        self.assertEqual(
+            ['first', 'sleep', 'second'],
+            [call[0] for call in calls.mock_calls]
+        )
+        sleep.assert_called_once_with(0.3)
+
+    def test_no_rest_after_last_read(self, sleep):
+        VisitInstrument((self.first,)).task(self.executor)
+        self.assertFalse(sleep.called)
@@ -0,0 +1,73 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.timers`
+"""
+import unittest
+from threading import Event
+from mr_freeze.timers import TimerQueue
+
+
+class TestTimerQueue(unittest.TestCase):
+    def setUp(self):
+        self.timers = TimerQueue()
+
+    def tearDown(self):
+        self.timers.stop()
+
+
+class TestCallLater(TestTimerQueue):
+    def test_callback_runs(self):
+        fired = Event()
+        self.timers.call_later(0.01, fired.set)
+        self.assertTrue(fired.wait(1))
+
+    def test_callbacks_run_in_order_due(self):
+        order = []
+        done = Event()
+
+        self.timers.call_later(0.05, order.append, "late")
+        self.timers.call_later(0.01, order.append, "early")
+        self.timers.call_later(0.1, done.set)
+
+        self.assertTrue(done.wait(1))
+        self.assertEqual(["early", "late"], order)
+
+    def test_cancel(self):
+        fired = Event()
+        done = Event()
+
+        self.timers.call_later(0.01, fired.set).cancel()
+        self.timers.call_later(0.02, done.set)
+
+        self.assertTrue(done.wait(1))
+        self.assertFalse(fired.is_set())
+
+    def test_error_does_not_stop_queue(self):
+        done = Event()
+        self.timers.call_later(0, int, "not a number")
+        self.timers.call_later(0.01, done.set)
+        self.assertTrue(done.wait(1))
+
+
+class TestLen(TestTimerQueue):
+    def test_pending_timers_counted(self):
+        self.timers.call_later(10, int)
+        self.timers.call_later(10, int).cancel()
+        self.assertEqual(1, len(self.timers))
+
+
+class TestStop(TestTimerQueue):
+    def test_pending_timers_dropped(self):
+        fired = Event()
+        self.timers.call_later(0.05, fired.set)
+        self.timers.stop()
+        self.assertFalse(fired.wait(0.1))
+
+    def test_add_after_stop(self):
+        self.timers.stop()
+        with self.assertRaises(RuntimeError):
+            self.timers.call_later(0, int)
+
+    def test_stop_without_timers(self):
+        self.timers.stop()
+        self.assertEqual(0, len(self.timers))
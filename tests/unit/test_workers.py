@@ -0,0 +1,293 @@
+# coding=utf-8
+"""
+Contains unit tests for :mod:`mr_freeze.workers`
+"""
+import multiprocessing
+import os
+import unittest
+import unittest.mock as mock
+from threading import Thread
+from time import monotonic, sleep, time
+from quantities import amperes, mA
+from mr_freeze.deadlines import deadline_scope
+from mr_freeze.devices.cryomagnetics_4g_adapter import Cryomagnetics4G
+from mr_freeze.devices.lakeshore_475 import Lakeshore475
+from mr_freeze.exceptions import InstrumentWorkerError, TaskTimeoutError
+from mr_freeze.resources.application_state import Current, MagneticField
+from mr_freeze.samples import SampleStream
+from mr_freeze.tasks.report_current import ReportCurrent
+from mr_freeze.workers import InstrumentWorker, RemoteAdapter, SampleRing, \
+    VARIABLES, WorkerSpec, WorkerSupervisor, adapter_settings, \
+    read_into_ring, run_worker
+
+
+class FakePowerSupply(object):
+    """
+    Stands in for the power supply adapter in a worker process
+    """
+    minimum_command_gap = 0.3
+    connection_settings = ('port_name',)
+
+    def __init__(self):
+        self._port_name = None
+        self._limit = 1 * amperes
+
+    @property
+    def port_name(self):
+        return self._port_name
+
+    @port_name.setter
+    def port_name(self, new_port_name):
+        self._port_name = new_port_name
+
+    @property
+    def current(self):
+        return 1500 * mA
+
+    @property
+    def upper_sweep_current(self):
+        return self._limit
+
+    @upper_sweep_current.setter
+    def upper_sweep_current(self, new_current):
+        self._limit = new_current
+
+    def crash(self):
+        os._exit(1)
+
+    def fail(self):
+        raise ValueError("Bad command")
+
+    def slow(self, seconds):
+        sleep(seconds)
+        return "slow"
+
+    def close(self):
+        pass
+
+
+SPEC = WorkerSpec(
+    "power supply", FakePowerSupply, {"port_name": "/dev/null"},
+    ((ReportCurrent, {}, 0.01),)
+)
+
+
+class TestSampleRing(unittest.TestCase):
+    def setUp(self):
+        self.ring = SampleRing(capacity=2)
+
+    def test_take_in_order(self):
+        self.ring.put(0, 1.0, 2.0, 3.0)
+        self.ring.put(1, 4.0, 5.0, 6.0, failed=True)
+        self.assertEqual(
+            [(0, 0, 1.0, 2.0, 3.0), (1, 1, 4.0, 5.0, 6.0)], self.ring.take()
+        )
+        self.assertEqual([], self.ring.take())
+
+    def test_full_ring_drops_new_records(self):
+        for value in range(3):
+            self.ring.put(0, value, 0, 0)
+        self.assertEqual(1, self.ring.dropped)
+        self.assertEqual([0.0, 1.0], [
+            record[2] for record in self.ring.take()
+        ])
+
+    def test_wraps_around(self):
+        for value in range(5):
+            self.ring.put(0, value, 0, 0)
+            self.assertEqual(value, self.ring.take()[0][2])
+
+    def test_reading_in_variable_units(self):
+        read_into_ring(ReportCurrent(FakePowerSupply(), None), self.ring)
+        (index, failed, value, _, _), = self.ring.take()
+        self.assertIs(Current, VARIABLES[index])
+        self.assertEqual((0, 1.5), (failed, value))
+
+
+class TestAdapterSettings(unittest.TestCase):
+    def test_connection_settings(self):
+        power_supply = Cryomagnetics4G()
+        power_supply.port_name = "/dev/ttyUSB1"
+        power_supply.baud_rate = 19200
+        self.assertEqual(
+            {"port_name": "/dev/ttyUSB1", "baud_rate": 19200},
+            adapter_settings(power_supply)
+        )
+
+    def test_gpib_address(self):
+        gaussmeter = Lakeshore475()
+        gaussmeter.address = 3
+        self.assertEqual(3, adapter_settings(gaussmeter)["address"])
+
+
+class TestRemoteAdapter(unittest.TestCase):
+    def setUp(self):
+        self.worker = mock.MagicMock(spec=InstrumentWorker)
+        self.worker.spec = SPEC._replace(settings=dict(SPEC.settings))
+        self.adapter = RemoteAdapter(self.worker)
+
+    def test_property_set_in_worker(self):
+        self.adapter.upper_sweep_current = 2 * amperes
+        self.worker.call.assert_called_once_with(
+            'set', 'upper_sweep_current', 2 * amperes
+        )
+        self.assertEqual("/dev/null", self.worker.spec.settings["port_name"])
+
+    def test_other_attribute_kept_locally(self):
+        self.adapter.note = "bookkeeping"
+        self.assertFalse(self.worker.call.called)
+        self.assertEqual("bookkeeping", self.adapter.note)
+
+
+class TestSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.worker = mock.MagicMock(spec=InstrumentWorker)
+        self.worker.spec = SPEC
+        self.worker.ring = SampleRing()
+        self.store = {Current: mock.MagicMock()}
+        self.samples = SampleStream()
+        self.subscription = self.samples.subscribe()
+        self.supervisor = WorkerSupervisor(
+            [self.worker], self.store, self.samples, restart_interval=0
+        )
+
+    def test_drain_writes_store_and_publishes(self):
+        index = VARIABLES.index(Current)
+        self.worker.ring.put(index, 2.0, monotonic(), time())
+
+        record, = self.supervisor.drain()
+
+        self.assertEqual(2.0 * amperes, self.store[Current].value)
+        self.assertEqual([record], self.subscription.take())
+
+    def test_readings_name_their_instrument(self):
+        index = VARIABLES.index(Current)
+        self.worker.ring.put(index, 2.0, monotonic(), time())
+
+        record, = self.supervisor.drain()
+
+        self.assertEqual(
+            ("/dev/null", None), record.reading(Current).source
+        )
+
+    def test_failed_reading_not_stored(self):
+        index = VARIABLES.index(MagneticField)
+        self.worker.ring.put(index, 0, monotonic(), time(), failed=True)
+
+        record, = self.supervisor.drain()
+
+        self.assertEqual((MagneticField,), tuple(
+            reading.variable for reading in record.errors
+        ))
+
+    def test_crashed_worker_restarted(self):
+        self.worker.is_alive = False
+        self.supervisor.check_workers()
+        self.assertTrue(self.worker.restart.called)
+
+    def test_restarts_spaced_out(self):
+        self.supervisor.restart_interval = 60
+        self.supervisor._last_started[self.worker] = monotonic()
+        self.worker.is_alive = False
+        self.supervisor.check_workers()
+        self.assertFalse(self.worker.restart.called)
+
+
+class PacedPowerSupply(FakePowerSupply):
+    """
+    Records the time of each exchange with the power supply
+    """
+    minimum_command_gap = 0.05
+    exchanges = []
+
+    @property
+    def current(self):
+        self.exchanges.append(monotonic())
+        return 1500 * mA
+
+    def ping(self):
+        self.exchanges.append(monotonic())
+
+
+class TestRunWorker(unittest.TestCase):
+    """
+    Runs the worker's main function on a thread
+    """
+    def setUp(self):
+        PacedPowerSupply.exchanges = []
+        self.commands, worker_end = multiprocessing.Pipe()
+        spec = WorkerSpec(
+            "power supply", PacedPowerSupply, {},
+            ((ReportCurrent, {}, 60), (ReportCurrent, {}, 60))
+        )
+        self.thread = Thread(
+            target=run_worker, args=(spec, SampleRing(), worker_end)
+        )
+        self.thread.start()
+
+    def tearDown(self):
+        self.commands.send(None)
+        self.thread.join(10)
+
+    def test_exchanges_spaced_by_gap(self):
+        self.commands.send((0, 'call', 'ping', ()))
+        self.assertTrue(self.commands.poll(10))
+        self.commands.recv()
+
+        first, second, command = PacedPowerSupply.exchanges
+        self.assertGreaterEqual(second - first, 0.05)
+        self.assertGreaterEqual(command - second, 0.05)
+
+
+class TestInstrumentWorker(unittest.TestCase):
+    """
+    Runs a worker process for a fake power supply
+    """
+    def setUp(self):
+        self.worker = InstrumentWorker(SPEC._replace(settings=dict(
+            SPEC.settings
+        )))
+        self.adapter = RemoteAdapter(self.worker)
+        self.worker.start()
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def test_readings_written_to_ring(self):
+        deadline = monotonic() + 10
+        while not len(self.worker.ring) and monotonic() < deadline:
+            sleep(0.01)
+        (index, failed, value, _, _) = self.worker.ring.take()[0]
+        self.assertEqual((Current, 0, 1.5), (VARIABLES[index], failed, value))
+
+    def test_commands_carried_out_by_worker(self):
+        self.adapter.upper_sweep_current = 2 * amperes
+        self.assertEqual(2 * amperes, self.adapter.upper_sweep_current)
+        self.assertEqual("/dev/null", self.adapter.port_name)
+        self.assertEqual(0.3, self.adapter.minimum_command_gap)
+
+        with self.assertRaises(ValueError):
+            self.adapter.fail()
+
+    def test_late_reply_thrown_away(self):
+        with deadline_scope(monotonic() + 0.2):
+            with self.assertRaises(TaskTimeoutError):
+                self.adapter.slow(0.5)
+        sleep(0.5)
+        self.assertEqual(1 * amperes, self.adapter.upper_sweep_current)
+
+    def test_setting_kept_for_restart(self):
+        self.adapter.port_name = "/dev/zero"
+        self.assertEqual("/dev/zero", self.worker.call('get', 'port_name'))
+        self.assertEqual("/dev/zero", self.worker.spec.settings["port_name"])
+
+    def test_crash_and_restart(self):
+        with self.assertRaises(InstrumentWorkerError):
+            self.adapter.crash()
+        self.worker._process.join(10)
+        self.assertFalse(self.worker.is_alive)
+
+        self.worker.restart()
+        self.assertEqual(1, self.worker.restarts)
+        self.assertEqual("/dev/null", self.adapter.port_name)
+        self.assertEqual(1 * amperes, self.adapter.upper_sweep_current)